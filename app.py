@@ -8,6 +8,7 @@ from flask_mail import Mail
 from dotenv import load_dotenv
 
 from extensions import db, migrate
+from services.page_cache import page_cache
 
 # =============================
 # LOAD ENV VARIABLES
@@ -74,6 +75,9 @@ app.secret_key = os.getenv("SECRET_KEY")
 
 app.config["UPLOAD_FOLDER"] = "static/uploads/news"
 
+# Rendered blog/news pages kept in memory per worker
+app.config["PAGE_CACHE_MAX_BYTES"] = int(os.getenv("PAGE_CACHE_MAX_BYTES", 32 * 1024 * 1024))
+
 # Ensure upload folder exists
 
 # =============================
@@ -83,6 +87,7 @@ app.config["UPLOAD_FOLDER"] = "static/uploads/news"
 db.init_app(app)
 mail = Mail(app)
 migrate.init_app(app, db)
+page_cache.init_app(app)
 
 # =============================
 # CREATE DATABASE TABLES
@@ -174,6 +179,176 @@ def create_admin(username, password):
     db.session.commit()
 
     print("Admin created successfully!")
+
+
+@app.cli.command("rebuild-revenue-rollups")
+def rebuild_revenue_rollups_command():
+    from services.revenue_service import rebuild_revenue_rollups
+
+    buckets = rebuild_revenue_rollups()
+    print(f"Revenue rollups rebuilt ({buckets} buckets)")
+
+
+@app.cli.command("rebuild-search-index")
+@click.option("--index", "index_name", default=None, help="content_search or job_search (default: all)")
+def rebuild_search_index_command(index_name):
+    from services.search_service import SEARCH_INDEXES, rebuild_search_index
+
+    names = [index_name] if index_name else list(SEARCH_INDEXES)
+    for name in names:
+        if name not in SEARCH_INDEXES:
+            raise click.BadParameter(f"Unknown index: {name}")
+        rows = rebuild_search_index(SEARCH_INDEXES[name])
+        print(f"Search index {name} rebuilt ({rows} rows)")
+
+
+@app.cli.command("prerender-content")
+def prerender_content_command():
+    from services.content_renderer import prerender_all
+
+    contents, lessons = prerender_all()
+    print(f"Pre-rendered {contents} content rows and {lessons} lessons")
+
+
+@app.cli.command("rebuild-related-content")
+def rebuild_related_content_command():
+    from services.related_content_service import rebuild_related_content
+
+    articles = rebuild_related_content()
+    print(f"Related content rebuilt ({articles} articles)")
+
+
+@app.cli.command("publish-scheduled")
+@click.option("--interval", default=0, help="Keep running, checking every N seconds")
+def publish_scheduled_command(interval):
+    import time
+    from services.publishing_service import publish_due
+
+    while True:
+        published = publish_due()
+        print(f"Published {published} scheduled items")
+        if not interval:
+            break
+        time.sleep(interval)
+
+
+@app.cli.command("add-job-source")
+@click.argument("name")
+@click.argument("url")
+@click.option("--format", "feed_format", default="json", type=click.Choice(["json", "jsonl", "rss", "csv"]))
+@click.option("--items-key", default=None, help="Key of the job array in a JSON feed")
+@click.option("--draft", is_flag=True, help="Import jobs as drafts for review")
+@click.option("--ttl-days", default=None, type=int, help="Days jobs stay published (default: JOB_TTL_DAYS)")
+def add_job_source_command(name, url, feed_format, items_key, draft, ttl_days):
+    from models.job import JobSource
+
+    db.session.add(JobSource(
+        name=name, url=url, format=feed_format, items_key=items_key, auto_publish=not draft, ttl_days=ttl_days,
+    ))
+    db.session.commit()
+    print(f"Job source {name} added")
+
+
+@app.cli.command("ingest-jobs")
+@click.option("--source", "source_names", multiple=True, help="Only ingest these sources")
+@click.option("--workers", default=None, type=int, help="Concurrent fetches")
+def ingest_jobs_command(source_names, workers):
+    import time
+    from models.job import JobSource
+    from services.job_ingestion_service import INGEST_WORKERS, ingest_sources
+
+    sources = None
+    if source_names:
+        sources = JobSource.query.filter(JobSource.name.in_(source_names)).all()
+
+    started = time.monotonic()
+    reports = ingest_sources(sources, workers=workers or INGEST_WORKERS)
+    elapsed = time.monotonic() - started
+
+    for report in reports:
+        print(
+            f"{report['source']}: {report['status']} - {report['fetched']} fetched, "
+            f"{report['upserted']} upserted ({report['duplicates']} duplicates), "
+            f"{report['skipped']} skipped in {report['seconds']}s"
+            + (f" ({report['error']})" if report["error"] else "")
+        )
+    fetched = sum(report["fetched"] for report in reports)
+    print(f"Ingested {fetched} records from {len(reports)} sources in {elapsed:.2f}s "
+          f"({fetched / elapsed if elapsed else 0:.0f} records/s)")
+
+
+@app.cli.command("rebuild-job-dedup")
+def rebuild_job_dedup_command():
+    from services.job_dedup_service import rebuild_dedup_index
+
+    jobs, duplicates = rebuild_dedup_index()
+    print(f"Job dedup index rebuilt ({jobs} jobs, {duplicates} duplicates suppressed)")
+
+
+@app.cli.command("expire-jobs")
+@click.option("--interval", default=0, help="Keep running, sweeping every N seconds")
+@click.option("--batch-size", default=None, type=int, help="Jobs archived per transaction")
+def expire_jobs_command(interval, batch_size):
+    import time
+    from services.job_expiry_service import SWEEP_BATCH_SIZE, sweep_expired
+
+    while True:
+        archived = sweep_expired(batch_size=batch_size or SWEEP_BATCH_SIZE)
+        print(f"Archived {archived} expired jobs")
+        if not interval:
+            break
+        time.sleep(interval)
+
+
+@app.cli.command("process-webhooks")
+@click.option("--workers", default=None, type=int, help="Worker threads (default: WEBHOOK_WORKERS)")
+@click.option("--interval", default=0.0, help="Keep polling every N seconds; 0 drains the inbox and exits")
+def process_webhooks_command(workers, interval):
+    import time
+    from services.webhook_inbox_service import WORKERS, run_workers
+
+    started = time.monotonic()
+    totals = run_workers(app, workers=workers or WORKERS, interval=interval)
+    elapsed = time.monotonic() - started
+    processed = sum(totals.values())
+    print(f"Processed {processed} webhook events in {elapsed:.2f}s "
+          f"({totals['done']} done, {totals['pending']} to retry, {totals['failed']} failed)")
+
+
+@app.cli.command("reconcile-payments")
+@click.option("--days", default=None, type=int, help="Window of transactions to check (default: 7)")
+@click.option("--workers", default=None, type=int, help="Concurrent page fetches (default: RECONCILE_WORKERS)")
+@click.option("--per-page", default=100, help="Transactions per Paystack page")
+@click.option("--dry-run", is_flag=True, help="Report what would change without writing")
+@click.option("--no-email", is_flag=True, help="Don't send confirmations for orders that become paid")
+def reconcile_payments_command(days, workers, per_page, dry_run, no_email):
+    from datetime import datetime, timedelta
+    from services.reconciliation_service import DEFAULT_WINDOW_DAYS, RECONCILE_WORKERS, reconcile_payments
+
+    end = datetime.utcnow()
+    report = reconcile_payments(
+        start=end - timedelta(days=days or DEFAULT_WINDOW_DAYS), end=end,
+        workers=workers or RECONCILE_WORKERS, per_page=per_page,
+        notify=not no_email, dry_run=dry_run,
+    )
+    print(
+        f"{'Would reconcile' if dry_run else 'Reconciled'} {report['transactions']} transactions "
+        f"({report['pages']} pages) in {report['seconds']}s ({report['per_second']:.0f} transactions/s): "
+        f"{report['matched']} matched, {report['unknown']} unknown, {report['mismatched']} mismatched; "
+        f"{report['paid']} paid, {report['failed']} failed, {report['granted']} access grants, "
+        f"{report['emailed']} emails"
+    )
+    for error in report["errors"]:
+        print(f"  error: {error}")
+
+
+@app.cli.command("generate-sitemap")
+def generate_sitemap_command():
+    from services.sitemap_service import generate_sitemaps
+
+    manifest = generate_sitemaps()
+    print(f"Sitemap generated ({manifest['urls']} URLs in {len(manifest['shards'])} shards)")
+
 # =============================
 # RUN APP
 # =============================
@@ -186,4 +361,3 @@ if __name__ == "__main__":
         debug=debug,
         use_reloader=False
     )
-        )
\ No newline at end of file
@@ -0,0 +1,48 @@
+"""job ingestion
+
+Revision ID: 2d7b91e4c6f0
+Revises: e6a4c8b2f057
+Create Date: 2026-10-17 19:24:03.118734
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2d7b91e4c6f0'
+down_revision = 'e6a4c8b2f057'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('job_sources',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('url', sa.String(length=500), nullable=False),
+    sa.Column('format', sa.String(length=20), nullable=False),
+    sa.Column('items_key', sa.String(length=100), nullable=True),
+    sa.Column('auto_publish', sa.Boolean(), nullable=True),
+    sa.Column('enabled', sa.Boolean(), nullable=True),
+    sa.Column('etag', sa.String(length=255), nullable=True),
+    sa.Column('last_modified', sa.String(length=100), nullable=True),
+    sa.Column('last_fetched_at', sa.DateTime(), nullable=True),
+    sa.Column('last_status', sa.String(length=20), nullable=True),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('name')
+    )
+
+    with op.batch_alter_table('jobs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('external_id', sa.String(length=255), nullable=True))
+        batch_op.create_unique_constraint('uq_jobs_source_external_id', ['source', 'external_id'])
+
+
+def downgrade():
+    with op.batch_alter_table('jobs', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_jobs_source_external_id', type_='unique')
+        batch_op.drop_column('external_id')
+
+    op.drop_table('job_sources')
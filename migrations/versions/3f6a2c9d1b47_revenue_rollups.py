@@ -0,0 +1,53 @@
+"""revenue rollups
+
+Revision ID: 3f6a2c9d1b47
+Revises: ded3212adaf0
+Create Date: 2026-10-17 09:12:31.482113
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f6a2c9d1b47'
+down_revision = 'ded3212adaf0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('revenue_rollups',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('product_type', sa.String(length=50), nullable=False),
+    sa.Column('status', sa.String(length=50), nullable=False),
+    sa.Column('order_count', sa.Integer(), nullable=False),
+    sa.Column('revenue', sa.Float(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('day', 'product_type', 'status', name='uq_revenue_rollup_bucket')
+    )
+    with op.batch_alter_table('revenue_rollups', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_revenue_rollups_day'), ['day'], unique=False)
+
+    # Backfill from existing orders (same query as `flask rebuild-revenue-rollups`)
+    op.execute("""
+        INSERT INTO revenue_rollups (day, product_type, status, order_count, revenue, updated_at)
+        SELECT DATE(o.created_at),
+               COALESCE(p.product_type, 'other'),
+               COALESCE(o.status, 'pending'),
+               COUNT(o.id),
+               COALESCE(SUM(p.price), 0),
+               CURRENT_TIMESTAMP
+        FROM orders o
+        LEFT OUTER JOIN product p ON p.id = o.product_id
+        GROUP BY DATE(o.created_at), COALESCE(p.product_type, 'other'), COALESCE(o.status, 'pending')
+    """)
+
+
+def downgrade():
+    with op.batch_alter_table('revenue_rollups', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_revenue_rollups_day'))
+
+    op.drop_table('revenue_rollups')
@@ -0,0 +1,40 @@
+"""related content
+
+Revision ID: 4b8e2d6f9a31
+Revises: e19b4c7a0d26
+Create Date: 2026-10-17 16:20:44.917305
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4b8e2d6f9a31'
+down_revision = 'e19b4c7a0d26'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('related_content',
+    sa.Column('content_id', sa.Integer(), nullable=False),
+    sa.Column('rank', sa.Integer(), nullable=False),
+    sa.Column('related_id', sa.Integer(), nullable=False),
+    sa.Column('score', sa.Float(), nullable=False),
+    sa.Column('computed_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['content_id'], ['content.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['related_id'], ['content.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('content_id', 'rank')
+    )
+    with op.batch_alter_table('related_content', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_related_content_related_id'), ['related_id'], unique=False)
+
+    # Populated by `flask rebuild-related-content`
+
+
+def downgrade():
+    with op.batch_alter_table('related_content', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_related_content_related_id'))
+
+    op.drop_table('related_content')
@@ -0,0 +1,47 @@
+"""content search index
+
+Revision ID: 5d90ab3e8c61
+Revises: c42d7e9a5f13
+Create Date: 2026-10-17 12:48:19.204377
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5d90ab3e8c61'
+down_revision = 'c42d7e9a5f13'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute("""
+            CREATE TABLE content_search (
+                id INTEGER PRIMARY KEY REFERENCES content(id) ON DELETE CASCADE,
+                document TSVECTOR NOT NULL
+            )
+        """)
+        op.execute("CREATE INDEX ix_content_search_document ON content_search USING GIN (document)")
+        op.execute("""
+            INSERT INTO content_search (id, document)
+            SELECT id,
+                   setweight(to_tsvector('english', coalesce(title, '')), 'A')
+                   || setweight(to_tsvector('english', coalesce(summary, '')), 'B')
+                   || setweight(to_tsvector('english', coalesce(content, '')), 'C')
+            FROM content
+        """)
+    else:
+        op.execute(
+            "CREATE VIRTUAL TABLE content_search USING fts5(title, summary, content, tokenize = 'porter unicode61')"
+        )
+        op.execute("""
+            INSERT INTO content_search (rowid, title, summary, content)
+            SELECT id, coalesce(title, ''), coalesce(summary, ''), coalesce(content, '') FROM content
+        """)
+
+
+def downgrade():
+    op.execute("DROP TABLE IF EXISTS content_search")
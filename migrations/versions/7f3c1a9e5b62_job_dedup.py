@@ -0,0 +1,54 @@
+"""job dedup
+
+Revision ID: 7f3c1a9e5b62
+Revises: 2d7b91e4c6f0
+Create Date: 2026-10-17 20:41:37.520916
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7f3c1a9e5b62'
+down_revision = '2d7b91e4c6f0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('job_signatures',
+    sa.Column('job_id', sa.Integer(), nullable=False),
+    sa.Column('signature', sa.LargeBinary(), nullable=False),
+    sa.Column('computed_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['job_id'], ['jobs.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('job_id')
+    )
+    op.create_table('job_lsh_buckets',
+    sa.Column('bucket', sa.BigInteger(), nullable=False),
+    sa.Column('job_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['job_id'], ['jobs.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('bucket', 'job_id')
+    )
+    with op.batch_alter_table('job_lsh_buckets', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_job_lsh_buckets_job_id'), ['job_id'], unique=False)
+
+    with op.batch_alter_table('jobs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('duplicate_of_id', sa.Integer(), nullable=True))
+        batch_op.create_index(batch_op.f('ix_jobs_duplicate_of_id'), ['duplicate_of_id'], unique=False)
+        batch_op.create_foreign_key('fk_jobs_duplicate_of_id_jobs', 'jobs', ['duplicate_of_id'], ['id'], ondelete='SET NULL')
+
+    # Populated by `flask rebuild-job-dedup`
+
+
+def downgrade():
+    with op.batch_alter_table('jobs', schema=None) as batch_op:
+        batch_op.drop_constraint('fk_jobs_duplicate_of_id_jobs', type_='foreignkey')
+        batch_op.drop_index(batch_op.f('ix_jobs_duplicate_of_id'))
+        batch_op.drop_column('duplicate_of_id')
+
+    with op.batch_alter_table('job_lsh_buckets', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_job_lsh_buckets_job_id'))
+
+    op.drop_table('job_lsh_buckets')
+    op.drop_table('job_signatures')
@@ -0,0 +1,50 @@
+"""keyset pagination indexes
+
+Revision ID: 8b1e5d03c7a2
+Revises: 3f6a2c9d1b47
+Create Date: 2026-10-17 10:04:52.119874
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8b1e5d03c7a2'
+down_revision = '3f6a2c9d1b47'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('orders', schema=None) as batch_op:
+        batch_op.create_index('ix_orders_created_at_id', ['created_at', 'id'], unique=False)
+
+    with op.batch_alter_table('content', schema=None) as batch_op:
+        batch_op.create_index('ix_content_created_at_id', ['created_at', 'id'], unique=False)
+
+    with op.batch_alter_table('affiliate_partners', schema=None) as batch_op:
+        batch_op.create_index('ix_affiliate_partners_created_at_id', ['created_at', 'id'], unique=False)
+
+    with op.batch_alter_table('freelance_applications', schema=None) as batch_op:
+        batch_op.create_index('ix_freelance_applications_created_at_id', ['created_at', 'id'], unique=False)
+
+    with op.batch_alter_table('course_resources', schema=None) as batch_op:
+        batch_op.create_index('ix_course_resources_course_created_at_id', ['course_id', 'created_at', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('course_resources', schema=None) as batch_op:
+        batch_op.drop_index('ix_course_resources_course_created_at_id')
+
+    with op.batch_alter_table('freelance_applications', schema=None) as batch_op:
+        batch_op.drop_index('ix_freelance_applications_created_at_id')
+
+    with op.batch_alter_table('affiliate_partners', schema=None) as batch_op:
+        batch_op.drop_index('ix_affiliate_partners_created_at_id')
+
+    with op.batch_alter_table('content', schema=None) as batch_op:
+        batch_op.drop_index('ix_content_created_at_id')
+
+    with op.batch_alter_table('orders', schema=None) as batch_op:
+        batch_op.drop_index('ix_orders_created_at_id')
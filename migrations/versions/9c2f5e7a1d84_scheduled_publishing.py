@@ -0,0 +1,36 @@
+"""scheduled publishing
+
+Revision ID: 9c2f5e7a1d84
+Revises: 4b8e2d6f9a31
+Create Date: 2026-10-17 17:41:09.226518
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9c2f5e7a1d84'
+down_revision = '4b8e2d6f9a31'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('content', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('publish_at', sa.DateTime(), nullable=True))
+        batch_op.create_index('ix_content_status_publish_at', ['status', 'publish_at'], unique=False)
+
+    with op.batch_alter_table('jobs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('publish_at', sa.DateTime(), nullable=True))
+        batch_op.create_index('ix_jobs_status_publish_at', ['status', 'publish_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('jobs', schema=None) as batch_op:
+        batch_op.drop_index('ix_jobs_status_publish_at')
+        batch_op.drop_column('publish_at')
+
+    with op.batch_alter_table('content', schema=None) as batch_op:
+        batch_op.drop_index('ix_content_status_publish_at')
+        batch_op.drop_column('publish_at')
@@ -0,0 +1,44 @@
+"""prerendered content columns
+
+Revision ID: a7c3f19e2d58
+Revises: 5d90ab3e8c61
+Create Date: 2026-10-17 14:02:44.917350
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7c3f19e2d58'
+down_revision = '5d90ab3e8c61'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Existing rows are filled by `flask prerender-content`; until then
+    # templates fall back to the raw body
+    with op.batch_alter_table('content', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('content_html', sa.Text(), nullable=True))
+        batch_op.add_column(sa.Column('toc', sa.Text(), nullable=True))
+        batch_op.add_column(sa.Column('reading_time', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('excerpt', sa.String(length=300), nullable=True))
+
+    with op.batch_alter_table('course_lessons', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('content_html', sa.Text(), nullable=True))
+        batch_op.add_column(sa.Column('toc', sa.Text(), nullable=True))
+        batch_op.add_column(sa.Column('reading_time', sa.Integer(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('course_lessons', schema=None) as batch_op:
+        batch_op.drop_column('reading_time')
+        batch_op.drop_column('toc')
+        batch_op.drop_column('content_html')
+
+    with op.batch_alter_table('content', schema=None) as batch_op:
+        batch_op.drop_column('excerpt')
+        batch_op.drop_column('reading_time')
+        batch_op.drop_column('toc')
+        batch_op.drop_column('content_html')
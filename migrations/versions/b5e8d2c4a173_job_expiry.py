@@ -0,0 +1,53 @@
+"""job expiry
+
+Revision ID: b5e8d2c4a173
+Revises: 7f3c1a9e5b62
+Create Date: 2026-10-17 21:52:10.284467
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b5e8d2c4a173'
+down_revision = '7f3c1a9e5b62'
+branch_labels = None
+depends_on = None
+
+PUBLISHED = sa.text("status = 'published'")
+DEFAULT_TTL_DAYS = 60
+
+
+def upgrade():
+    with op.batch_alter_table('job_sources', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('ttl_days', sa.Integer(), nullable=True))
+
+    with op.batch_alter_table('jobs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('expires_at', sa.DateTime(), nullable=True))
+
+    op.create_index('ix_jobs_published_created_at', 'jobs', ['created_at'], unique=False,
+                    postgresql_where=PUBLISHED, sqlite_where=PUBLISHED)
+    op.create_index('ix_jobs_published_job_type_created_at', 'jobs', ['job_type', 'created_at'], unique=False,
+                    postgresql_where=PUBLISHED, sqlite_where=PUBLISHED)
+    op.create_index('ix_jobs_published_expires_at', 'jobs', ['expires_at'], unique=False,
+                    postgresql_where=PUBLISHED, sqlite_where=PUBLISHED)
+
+    # Live jobs get the default lifetime from when they were published
+    if op.get_bind().dialect.name == 'postgresql':
+        expires = f"COALESCE(published_at, created_at) + interval '{DEFAULT_TTL_DAYS} days'"
+    else:
+        expires = f"datetime(COALESCE(published_at, created_at), '+{DEFAULT_TTL_DAYS} days')"
+    op.execute(f"UPDATE jobs SET expires_at = {expires} WHERE status = 'published' AND expires_at IS NULL")
+
+
+def downgrade():
+    op.drop_index('ix_jobs_published_expires_at', table_name='jobs')
+    op.drop_index('ix_jobs_published_job_type_created_at', table_name='jobs')
+    op.drop_index('ix_jobs_published_created_at', table_name='jobs')
+
+    with op.batch_alter_table('jobs', schema=None) as batch_op:
+        batch_op.drop_column('expires_at')
+
+    with op.batch_alter_table('job_sources', schema=None) as batch_op:
+        batch_op.drop_column('ttl_days')
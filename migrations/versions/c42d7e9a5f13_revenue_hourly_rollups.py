@@ -0,0 +1,58 @@
+"""revenue hourly rollups
+
+Revision ID: c42d7e9a5f13
+Revises: 8b1e5d03c7a2
+Create Date: 2026-10-17 11:27:05.630512
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c42d7e9a5f13'
+down_revision = '8b1e5d03c7a2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('revenue_hourly_rollups',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('hour', sa.DateTime(), nullable=False),
+    sa.Column('product_type', sa.String(length=50), nullable=False),
+    sa.Column('status', sa.String(length=50), nullable=False),
+    sa.Column('order_count', sa.Integer(), nullable=False),
+    sa.Column('revenue', sa.Float(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('hour', 'product_type', 'status', name='uq_revenue_hourly_rollup_bucket')
+    )
+    with op.batch_alter_table('revenue_hourly_rollups', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_revenue_hourly_rollups_hour'), ['hour'], unique=False)
+
+    if op.get_bind().dialect.name == "sqlite":
+        hour = "strftime('%Y-%m-%d %H:00:00.000000', o.created_at)"
+    else:
+        hour = "date_trunc('hour', o.created_at)"
+
+    # Backfill from existing orders (same query as `flask rebuild-revenue-rollups`)
+    op.execute(f"""
+        INSERT INTO revenue_hourly_rollups (hour, product_type, status, order_count, revenue, updated_at)
+        SELECT {hour},
+               COALESCE(p.product_type, 'other'),
+               COALESCE(o.status, 'pending'),
+               COUNT(o.id),
+               COALESCE(SUM(p.price), 0),
+               CURRENT_TIMESTAMP
+        FROM orders o
+        LEFT OUTER JOIN product p ON p.id = o.product_id
+        GROUP BY {hour}, COALESCE(p.product_type, 'other'), COALESCE(o.status, 'pending')
+    """)
+
+
+def downgrade():
+    with op.batch_alter_table('revenue_hourly_rollups', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_revenue_hourly_rollups_hour'))
+
+    op.drop_table('revenue_hourly_rollups')
@@ -0,0 +1,44 @@
+"""webhook inbox
+
+Revision ID: c83f6a1d2e95
+Revises: b5e8d2c4a173
+Create Date: 2026-10-17 22:38:51.604128
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c83f6a1d2e95'
+down_revision = 'b5e8d2c4a173'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('webhook_inbox',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('event', sa.String(length=100), nullable=False),
+    sa.Column('reference', sa.String(length=200), nullable=True),
+    sa.Column('payload', sa.Text(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('available_at', sa.DateTime(), nullable=False),
+    sa.Column('locked_until', sa.DateTime(), nullable=True),
+    sa.Column('received_at', sa.DateTime(), nullable=True),
+    sa.Column('processed_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('webhook_inbox', schema=None) as batch_op:
+        batch_op.create_index('ix_webhook_inbox_status_available_at', ['status', 'available_at'], unique=False)
+        batch_op.create_index('ix_webhook_inbox_reference_id', ['reference', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('webhook_inbox', schema=None) as batch_op:
+        batch_op.drop_index('ix_webhook_inbox_reference_id')
+        batch_op.drop_index('ix_webhook_inbox_status_available_at')
+
+    op.drop_table('webhook_inbox')
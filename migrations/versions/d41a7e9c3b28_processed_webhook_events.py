@@ -0,0 +1,31 @@
+"""processed webhook events
+
+Revision ID: d41a7e9c3b28
+Revises: c83f6a1d2e95
+Create Date: 2026-10-17 23:15:27.340981
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd41a7e9c3b28'
+down_revision = 'c83f6a1d2e95'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('processed_webhook_events',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('event', sa.String(length=100), nullable=False),
+    sa.Column('reference', sa.String(length=200), nullable=False),
+    sa.Column('received_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('event', 'reference', name='uq_processed_webhook_events_event_reference')
+    )
+
+
+def downgrade():
+    op.drop_table('processed_webhook_events')
@@ -0,0 +1,26 @@
+"""content listing index
+
+Revision ID: e19b4c7a0d26
+Revises: a7c3f19e2d58
+Create Date: 2026-10-17 14:55:10.308441
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e19b4c7a0d26'
+down_revision = 'a7c3f19e2d58'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('content', schema=None) as batch_op:
+        batch_op.create_index('ix_content_type_status_created_at', ['content_type', 'status', 'created_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('content', schema=None) as batch_op:
+        batch_op.drop_index('ix_content_type_status_created_at')
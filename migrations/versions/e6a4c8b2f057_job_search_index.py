@@ -0,0 +1,47 @@
+"""job search index
+
+Revision ID: e6a4c8b2f057
+Revises: 9c2f5e7a1d84
+Create Date: 2026-10-17 18:32:57.610842
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e6a4c8b2f057'
+down_revision = '9c2f5e7a1d84'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute("""
+            CREATE TABLE job_search (
+                id INTEGER PRIMARY KEY REFERENCES jobs(id) ON DELETE CASCADE,
+                document TSVECTOR NOT NULL
+            )
+        """)
+        op.execute("CREATE INDEX ix_job_search_document ON job_search USING GIN (document)")
+        op.execute("""
+            INSERT INTO job_search (id, document)
+            SELECT id,
+                   setweight(to_tsvector('english', coalesce(title, '')), 'A')
+                   || setweight(to_tsvector('english', coalesce(company, '')), 'B')
+                   || setweight(to_tsvector('english', coalesce(description, '')), 'C')
+            FROM jobs
+        """)
+    else:
+        op.execute(
+            "CREATE VIRTUAL TABLE job_search USING fts5(title, company, description, tokenize = 'porter unicode61')"
+        )
+        op.execute("""
+            INSERT INTO job_search (rowid, title, company, description)
+            SELECT id, coalesce(title, ''), coalesce(company, ''), coalesce(description, '') FROM jobs
+        """)
+
+
+def downgrade():
+    op.execute("DROP TABLE IF EXISTS job_search")
@@ -0,0 +1,35 @@
+"""order amount snapshot
+
+Revision ID: f2b7c4e81a09
+Revises: d41a7e9c3b28
+Create Date: 2026-10-18 10:42:08.117305
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2b7c4e81a09'
+down_revision = 'd41a7e9c3b28'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('orders', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('amount', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('product_type', sa.String(length=50), nullable=True))
+
+    # Existing orders were rolled up at their product's current price and type
+    op.execute(
+        "UPDATE orders SET "
+        "amount = (SELECT price FROM product WHERE product.id = orders.product_id), "
+        "product_type = (SELECT product_type FROM product WHERE product.id = orders.product_id)"
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('orders', schema=None) as batch_op:
+        batch_op.drop_column('product_type')
+        batch_op.drop_column('amount')
@@ -6,9 +6,13 @@ from models.content import Content
 from .newsletter import Subscriber
 from .freelance import FreelanceApplication
 from .affiliate import AffiliatePartner, AffiliateReferral
-from .job import Job
+from .job import Job, JobSource
 from .user_dashboard import UserCourseProgress, SavedResource, UserSubscription
 from .course_content import CourseModule, CourseLesson, CourseResource
+from .revenue import RevenueRollup, RevenueHourlyRollup
+from .related_content import RelatedContent
+from .job_dedup import JobSignature, JobLshBucket
+from .webhook_event import WebhookEvent, ProcessedWebhookEvent
 
 __all__ = [
     "User",
@@ -21,10 +25,18 @@ __all__ = [
     "AffiliatePartner",
     "AffiliateReferral",
     "Job",
+    "JobSource",
     "UserCourseProgress",
     "SavedResource",
     "UserSubscription",
     "CourseModule",
     "CourseLesson",
     "CourseResource",
+    "RevenueRollup",
+    "RevenueHourlyRollup",
+    "RelatedContent",
+    "JobSignature",
+    "JobLshBucket",
+    "WebhookEvent",
+    "ProcessedWebhookEvent",
 ]
\ No newline at end of file
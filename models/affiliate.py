@@ -21,6 +21,10 @@ class AffiliatePartner(db.Model):
     total_referrals = db.Column(db.Integer, default=0)
     total_commission = db.Column(db.Float, default=0.0)
 
+    __table_args__ = (
+        db.Index("ix_affiliate_partners_created_at_id", "created_at", "id"),
+    )
+
     def __repr__(self):
         return f"<AffiliatePartner {self.name}>"
 
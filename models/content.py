@@ -1,5 +1,7 @@
 from datetime import datetime
+import json
 from extensions import db
+from sqlalchemy.orm import load_only
 
 class Content(db.Model):
     __tablename__ = "content"
@@ -11,9 +13,41 @@ class Content(db.Model):
     content = db.Column(db.Text, nullable=False)
     content_type = db.Column(db.String(20), nullable=False, index=True)  # blog or news
     image = db.Column(db.String(300))
-    status = db.Column(db.String(20), default="draft", index=True)
+    status = db.Column(db.String(20), default="draft", index=True)  # draft, scheduled, published
+    publish_at = db.Column(db.DateTime)  # when a scheduled item goes live (UTC)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, onupdate=datetime.utcnow)
 
+    # Rendered at save time by services.content_renderer
+    content_html = db.Column(db.Text)
+    toc = db.Column(db.Text)  # JSON list of {id, name, level}
+    reading_time = db.Column(db.Integer)  # minutes
+    excerpt = db.Column(db.String(300))
+
+    __table_args__ = (
+        db.Index("ix_content_created_at_id", "created_at", "id"),
+        # Seek index for the public blog/news listings
+        db.Index("ix_content_type_status_created_at", "content_type", "status", "created_at"),
+        # Due-item scan of the publishing runner
+        db.Index("ix_content_status_publish_at", "status", "publish_at"),
+    )
+
+    # Columns listing cards need; the body columns are never loaded for them
+    LISTING_COLUMNS = (
+        "id", "title", "slug", "summary", "excerpt", "image",
+        "content_type", "status", "created_at", "updated_at",
+    )
+
     def __repr__(self):
-        return f"<Content {self.title}>"
\ No newline at end of file
+        return f"<Content {self.title}>"
+
+    @classmethod
+    def published_listing(cls, content_type):
+        """Published rows of one type, loading only LISTING_COLUMNS"""
+        return cls.query.filter_by(content_type=content_type, status="published").options(
+            load_only(*[getattr(cls, name) for name in cls.LISTING_COLUMNS])
+        )
+
+    @property
+    def toc_entries(self):
+        return json.loads(self.toc) if self.toc else []
\ No newline at end of file
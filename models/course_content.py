@@ -31,6 +31,9 @@ class CourseLesson(db.Model):
     content_url = db.Column(db.String(500))  # URL to video, PDF, or external link
     document_url = db.Column(db.String(500))  # URL to downloadable document
     content = db.Column(db.Text)  # For text-based content
+    content_html = db.Column(db.Text)  # Rendered at save time by services.content_renderer
+    toc = db.Column(db.Text)  # JSON list of {id, name, level}
+    reading_time = db.Column(db.Integer)  # minutes
     duration_minutes = db.Column(db.Integer)  # For video content
     order = db.Column(db.Integer, default=0)  # Display order
     is_preview = db.Column(db.Boolean, default=False)  # Free preview
@@ -64,5 +67,9 @@ class CourseResource(db.Model):
     download_count = db.Column(db.Integer, default=0)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        db.Index("ix_course_resources_course_created_at_id", "course_id", "created_at", "id"),
+    )
+
     def __repr__(self):
         return f"<CourseResource {self.title}>"
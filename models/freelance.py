@@ -17,5 +17,9 @@ class FreelanceApplication(db.Model):
     reviewed_at = db.Column(db.DateTime)
     reviewed_by = db.Column(db.Integer, db.ForeignKey("user.id"))
 
+    __table_args__ = (
+        db.Index("ix_freelance_applications_created_at_id", "created_at", "id"),
+    )
+
     def __repr__(self):
         return f"<FreelanceApplication {self.name}>"
@@ -15,12 +15,38 @@ class Job(db.Model):
     description = db.Column(db.Text)
     application_link = db.Column(db.String(500))  # External apply URL
     image = db.Column(db.String(255))  # Company logo/image
-    source = db.Column(db.String(100))  # manual, scraper, api, etc.
+    source = db.Column(db.String(100))  # manual, scraper, api, etc. (JobSource.name for ingested jobs)
+    external_id = db.Column(db.String(255))  # the source's own id; NULL for manual jobs
     slug = db.Column(db.String(255), unique=True, index=True)
-    status = db.Column(db.String(20), default="draft")  # draft, published, archived
+    status = db.Column(db.String(20), default="draft")  # draft, scheduled, published, archived, duplicate
+    # Set when ingestion suppresses this job as a near-copy of an older one
+    duplicate_of_id = db.Column(db.Integer, db.ForeignKey("jobs.id", ondelete="SET NULL"), index=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     published_at = db.Column(db.DateTime)
+    publish_at = db.Column(db.DateTime)  # when a scheduled job goes live (UTC)
+    expires_at = db.Column(db.DateTime)  # archived by the expiry sweeper after this (UTC)
+
+    __table_args__ = (
+        # Due-item scan of the publishing runner
+        db.Index("ix_jobs_status_publish_at", "status", "publish_at"),
+        # Conflict target of the ingestion upsert
+        db.UniqueConstraint("source", "external_id", name="uq_jobs_source_external_id"),
+        # Partial indexes over live rows only: archived jobs pile up, listings never read them
+        db.Index(
+            "ix_jobs_published_created_at", "created_at",
+            postgresql_where=db.text("status = 'published'"), sqlite_where=db.text("status = 'published'"),
+        ),
+        db.Index(
+            "ix_jobs_published_job_type_created_at", "job_type", "created_at",
+            postgresql_where=db.text("status = 'published'"), sqlite_where=db.text("status = 'published'"),
+        ),
+        # Due-job scan of the expiry sweeper
+        db.Index(
+            "ix_jobs_published_expires_at", "expires_at",
+            postgresql_where=db.text("status = 'published'"), sqlite_where=db.text("status = 'published'"),
+        ),
+    )
 
     def __repr__(self):
         return f"<Job {self.title}>"
@@ -38,3 +64,29 @@ class Job(db.Model):
             'status': self.status,
             'created_at': self.created_at.isoformat(),
         }
+
+
+class JobSource(db.Model):
+    """An external job feed pulled by services.job_ingestion_service"""
+    __tablename__ = "job_sources"
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), unique=True, nullable=False)  # stored as Job.source
+    url = db.Column(db.String(500), nullable=False)
+    format = db.Column(db.String(20), nullable=False)  # json, jsonl, rss, csv
+    items_key = db.Column(db.String(100))  # JSON: key of the job array in a top-level object
+    auto_publish = db.Column(db.Boolean, default=True)
+    ttl_days = db.Column(db.Integer)  # days a job stays published; NULL uses the default
+    enabled = db.Column(db.Boolean, default=True)
+
+    # Conditional-request validators from the last successful fetch
+    etag = db.Column(db.String(255))
+    last_modified = db.Column(db.String(100))
+
+    last_fetched_at = db.Column(db.DateTime)
+    last_status = db.Column(db.String(20))  # ok, not_modified, error
+    last_error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<JobSource {self.name}>"
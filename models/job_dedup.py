@@ -0,0 +1,25 @@
+from extensions import db
+from datetime import datetime
+
+
+class JobSignature(db.Model):
+    """MinHash signature of a job's title, company and description"""
+    __tablename__ = "job_signatures"
+
+    job_id = db.Column(db.Integer, db.ForeignKey("jobs.id", ondelete="CASCADE"), primary_key=True)
+    signature = db.Column(db.LargeBinary, nullable=False)  # NUM_PERM little-endian uint32 values
+    computed_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<JobSignature {self.job_id}>"
+
+
+class JobLshBucket(db.Model):
+    """One LSH band of a job's signature, hashed; jobs sharing a bucket are candidates"""
+    __tablename__ = "job_lsh_buckets"
+
+    bucket = db.Column(db.BigInteger, primary_key=True)
+    job_id = db.Column(db.Integer, db.ForeignKey("jobs.id", ondelete="CASCADE"), primary_key=True, index=True)
+
+    def __repr__(self):
+        return f"<JobLshBucket {self.bucket} -> {self.job_id}>"
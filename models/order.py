@@ -1,5 +1,6 @@
 from datetime import datetime
 from extensions import db
+from sqlalchemy.orm import column_property
 
 
 class Order(db.Model):
@@ -17,16 +18,33 @@ class Order(db.Model):
 
     product = db.relationship("Product")
 
+    # Snapshot of the product at checkout (see models.revenue): what the
+    # customer is charged and what the revenue rollups count, even if the
+    # product's price or type changes later
+    amount = db.Column(db.Float)
+
+    product_type = db.Column(db.String(50))
+
     payment_reference = db.Column(
         db.String(200),
         unique=True,
         index=True
     )
 
-    status = db.Column(
-        db.String(50),
-        default="pending",
-        index=True
+    # active_history so status transitions are visible to the revenue
+    # rollup listeners even when the old value was expired by a commit
+    status = column_property(
+        db.Column(
+            db.String(50),
+            default="pending",
+            index=True
+        ),
+        active_history=True
     )
 
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
\ No newline at end of file
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    # Seek index for keyset pagination of admin lists
+    __table_args__ = (
+        db.Index("ix_orders_created_at_id", "created_at", "id"),
+    )
\ No newline at end of file
@@ -0,0 +1,16 @@
+from extensions import db
+from datetime import datetime
+
+
+class RelatedContent(db.Model):
+    """Top-k most similar published articles for each article, best first"""
+    __tablename__ = "related_content"
+
+    content_id = db.Column(db.Integer, db.ForeignKey("content.id", ondelete="CASCADE"), primary_key=True)
+    rank = db.Column(db.Integer, primary_key=True)
+    related_id = db.Column(db.Integer, db.ForeignKey("content.id", ondelete="CASCADE"), nullable=False, index=True)
+    score = db.Column(db.Float, nullable=False)
+    computed_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<RelatedContent {self.content_id} -> {self.related_id} ({self.score:.3f})>"
@@ -0,0 +1,195 @@
+from extensions import db
+from datetime import datetime
+from sqlalchemy import event, select, update
+
+from models.order import Order
+from models.product import Product
+from utils.db import dialect_insert, supports_on_conflict
+
+
+UNCATEGORIZED = "other"
+
+
+class RevenueRollup(db.Model):
+    """Daily order counts and revenue per product type and order status"""
+    __tablename__ = "revenue_rollups"
+
+    id = db.Column(db.Integer, primary_key=True)
+    day = db.Column(db.Date, nullable=False, index=True)
+    product_type = db.Column(db.String(50), nullable=False, default=UNCATEGORIZED)
+    status = db.Column(db.String(50), nullable=False)
+    order_count = db.Column(db.Integer, nullable=False, default=0)
+    revenue = db.Column(db.Float, nullable=False, default=0.0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        db.UniqueConstraint("day", "product_type", "status", name="uq_revenue_rollup_bucket"),
+    )
+
+    def __repr__(self):
+        return f"<RevenueRollup {self.day} {self.product_type}/{self.status}>"
+
+
+class RevenueHourlyRollup(db.Model):
+    """Hourly order counts and revenue, for short-range revenue charts"""
+    __tablename__ = "revenue_hourly_rollups"
+
+    id = db.Column(db.Integer, primary_key=True)
+    hour = db.Column(db.DateTime, nullable=False, index=True)
+    product_type = db.Column(db.String(50), nullable=False, default=UNCATEGORIZED)
+    status = db.Column(db.String(50), nullable=False)
+    order_count = db.Column(db.Integer, nullable=False, default=0)
+    revenue = db.Column(db.Float, nullable=False, default=0.0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        db.UniqueConstraint("hour", "product_type", "status", name="uq_revenue_hourly_rollup_bucket"),
+    )
+
+    def __repr__(self):
+        return f"<RevenueHourlyRollup {self.hour} {self.product_type}/{self.status}>"
+
+
+# =============================
+# Incremental maintenance
+# =============================
+# Orders are rolled up inside the same flush that writes them, so the
+# rollup tables can never drift from `orders` on a committed transaction.
+# Every delta uses the amount and product type snapshotted on the order
+# when it was created, so a later price change can't move a different
+# amount out of a bucket than went into it.
+
+def _product_bucket(connection, product_id):
+    row = connection.execute(
+        select(Product.product_type, Product.price).where(Product.id == product_id)
+    ).first()
+
+    if not row:
+        return None, 0.0
+
+    return row.product_type, row.price or 0.0
+
+
+def _order_bucket(connection, order):
+    """(product_type, amount) an order is rolled up under"""
+    product_type, amount = order.product_type, order.amount
+    if amount is None:
+        # Inserted around the ORM, before the snapshot existed
+        product_type, amount = _product_bucket(connection, order.product_id)
+    return product_type or UNCATEGORIZED, amount or 0.0
+
+def _upsert_bucket(connection, table, key, count, revenue, now):
+    if supports_on_conflict(connection):
+        stmt = dialect_insert(connection, table).values(
+            **key,
+            order_count=count,
+            revenue=revenue,
+            updated_at=now,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(key),
+            set_={
+                "order_count": table.c.order_count + stmt.excluded.order_count,
+                "revenue": table.c.revenue + stmt.excluded.revenue,
+                "updated_at": now,
+            },
+        )
+        connection.execute(stmt)
+        return
+
+    result = connection.execute(
+        update(table)
+        .where(*[table.c[name] == value for name, value in key.items()])
+        .values(
+            order_count=table.c.order_count + count,
+            revenue=table.c.revenue + revenue,
+            updated_at=now,
+        )
+    )
+    if result.rowcount == 0:
+        connection.execute(
+            table.insert().values(**key, order_count=count, revenue=revenue, updated_at=now)
+        )
+
+
+def apply_rollup_delta(connection, created_at, product_type, status, count, revenue):
+    """
+    Add `count` orders and `revenue` to the daily and hourly buckets that
+    an order created at `created_at` falls into.
+    """
+    now = datetime.utcnow()
+    created_at = created_at or now
+    hour = created_at.replace(minute=0, second=0, microsecond=0)
+
+    _upsert_bucket(
+        connection, RevenueRollup.__table__,
+        {"day": created_at.date(), "product_type": product_type, "status": status},
+        count, revenue, now,
+    )
+    _upsert_bucket(
+        connection, RevenueHourlyRollup.__table__,
+        {"hour": hour, "product_type": product_type, "status": status},
+        count, revenue, now,
+    )
+
+
+def apply_status_transition(connection, orders, old_status, new_status):
+    """
+    Move rolled-up counts and revenue of `orders` (rows with product_id,
+    amount, product_type and created_at) from old_status to new_status, one
+    delta per bucket. For status changes made with core UPDATEs, which
+    these listeners never see.
+    """
+    buckets = {}
+    for order in orders:
+        product_type, amount = _order_bucket(connection, order)
+        hour = (order.created_at or datetime.utcnow()).replace(minute=0, second=0, microsecond=0)
+        count, revenue = buckets.get((hour, product_type), (0, 0.0))
+        buckets[(hour, product_type)] = (count + 1, revenue + amount)
+
+    for (hour, product_type), (count, revenue) in buckets.items():
+        apply_rollup_delta(connection, hour, product_type, old_status, -count, -revenue)
+        apply_rollup_delta(connection, hour, product_type, new_status, count, revenue)
+
+
+@event.listens_for(Order, "before_insert")
+def snapshot_order_product(mapper, connection, target):
+    if target.amount is None or target.product_type is None:
+        product_type, price = _product_bucket(connection, target.product_id)
+        if target.amount is None:
+            target.amount = price
+        if target.product_type is None:
+            target.product_type = product_type
+
+
+@event.listens_for(Order, "after_insert")
+def rollup_new_order(mapper, connection, target):
+    product_type, price = _order_bucket(connection, target)
+    apply_rollup_delta(
+        connection, target.created_at, product_type, target.status or "pending", 1, price
+    )
+
+
+@event.listens_for(Order, "after_update")
+def rollup_order_status_change(mapper, connection, target):
+    history = db.inspect(target).attrs.status.history
+    if not history.has_changes() or not history.deleted:
+        return
+
+    old_status = history.deleted[0] or "pending"
+    new_status = target.status or "pending"
+    if old_status == new_status:
+        return
+
+    product_type, price = _order_bucket(connection, target)
+    created_at = target.created_at
+    apply_rollup_delta(connection, created_at, product_type, old_status, -1, -price)
+    apply_rollup_delta(connection, created_at, product_type, new_status, 1, price)
+
+
+@event.listens_for(Order, "after_delete")
+def rollup_deleted_order(mapper, connection, target):
+    product_type, price = _order_bucket(connection, target)
+    apply_rollup_delta(
+        connection, target.created_at, product_type, target.status or "pending", -1, -price
+    )
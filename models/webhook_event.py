@@ -0,0 +1,48 @@
+from extensions import db
+from datetime import datetime
+
+
+class WebhookEvent(db.Model):
+    """A received webhook, stored raw before it is processed by services.webhook_inbox_service"""
+    __tablename__ = "webhook_inbox"
+
+    id = db.Column(db.Integer, primary_key=True)
+    event = db.Column(db.String(100), nullable=False)  # e.g. charge.success
+    reference = db.Column(db.String(200))  # payment reference; events per reference run in id order
+    payload = db.Column(db.Text, nullable=False)  # raw request body
+
+    status = db.Column(db.String(20), nullable=False, default="pending")  # pending, processing, done, failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    last_error = db.Column(db.Text)
+    available_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)  # next attempt not before
+    locked_until = db.Column(db.DateTime)  # lease of the worker processing it
+
+    received_at = db.Column(db.DateTime, default=datetime.utcnow)
+    processed_at = db.Column(db.DateTime)
+
+    __table_args__ = (
+        # Claim scan: due events by status
+        db.Index("ix_webhook_inbox_status_available_at", "status", "available_at"),
+        # Per-reference ordering check
+        db.Index("ix_webhook_inbox_reference_id", "reference", "id"),
+    )
+
+    def __repr__(self):
+        return f"<WebhookEvent {self.id} {self.event} {self.reference} ({self.status})>"
+
+
+class ProcessedWebhookEvent(db.Model):
+    """Idempotency key of an accepted webhook; the unique constraint rejects redeliveries"""
+    __tablename__ = "processed_webhook_events"
+
+    id = db.Column(db.Integer, primary_key=True)
+    event = db.Column(db.String(100), nullable=False)
+    reference = db.Column(db.String(200), nullable=False)
+    received_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.UniqueConstraint("event", "reference", name="uq_processed_webhook_events_event_reference"),
+    )
+
+    def __repr__(self):
+        return f"<ProcessedWebhookEvent {self.event} {self.reference}>"
@@ -6,8 +6,18 @@ from models.content import Content
 from utils.auth import admin_required
 from utils.decorators import rate_limit, login_rate_limit
 from services.fulfillment import fulfill_order
-import os, re, time
-from utils.slug import generate_slug
+from services.revenue_service import get_revenue_summary, get_revenue_series
+from services.content_stats_service import get_content_stats, invalidate_content_stats
+from services.search_service import search_content
+from services.page_cache import invalidate_content
+from services.content_renderer import prerender_content
+from services.related_content_service import refresh_related_content
+from services.publishing_service import SCHEDULED, parse_publish_at, schedule
+from utils.pagination import keyset_paginate, KeysetPage
+from sqlalchemy.orm import joinedload
+import os
+from datetime import datetime
+from utils.slug import allocate_slug, SlugAllocationError
 
 
 admin_bp = Blueprint("admin_bp", __name__, url_prefix="/control-panel")
@@ -20,25 +30,6 @@ ALLOWED_EXTENSIONS = {"png", "jpg", "jpeg", "webp"}
 def allowed_file(filename):
     return "." in filename and filename.rsplit(".", 1)[1].lower() in ALLOWED_EXTENSIONS
 
-def generate_slug(title):
-    slug = re.sub(r"[^a-z0-9]+", "-", title.lower()).strip("-")
-    return slug
-
-def ensure_unique_slug(model, slug):
-    existing = model.query.filter_by(slug=slug).first()
-    if existing:
-        slug = f"{slug}-{int(time.time())}"
-    return slug
-
-# -------------------------------
-# Content Stats Helper (fixed)
-# -------------------------------
-def get_content_stats():
-    total_content = Content.query.count()
-    published_content = Content.query.filter_by(status="published").count()
-    draft_content = Content.query.filter_by(status="draft").count()
-    return total_content, published_content, draft_content
-
 # -------------------------------
 # Admin Login
 # -------------------------------
@@ -77,45 +68,70 @@ def admin_dashboard():
     if email_filter:
         query = query.filter(Order.customer_email.ilike(f"%{email_filter}%"))
 
-    orders = query.order_by(Order.created_at.desc()).all()
-    all_orders = Order.query.all()
-
-    total_orders = len(all_orders)
-    paid_orders = sum(1 for o in all_orders if o.status == "paid")
-    pending_orders = sum(1 for o in all_orders if o.status == "pending")
-    total_revenue = sum(o.product.price for o in all_orders if o.status == "paid" and o.product)
+    orders = keyset_paginate(
+        query, Order,
+        cursor=request.args.get("cursor"),
+        options=[joinedload(Order.product)],
+    )
 
-    revenue_by_type = {}
-    revenue_by_status = {}
-    for order in all_orders:
-        if not order.product:
-            continue
-        revenue_by_status[order.status] = revenue_by_status.get(order.status, 0) + order.product.price
-        if order.status == "paid":
-            ptype = order.product.product_type
-            revenue_by_type[ptype] = revenue_by_type.get(ptype, 0) + order.product.price
+    # Totals come from the rollup table, not from loading every order
+    revenue = get_revenue_summary()
 
     recent_access = UserAccess.query.order_by(UserAccess.granted_at.desc()).limit(10).all()
 
-    # ✅ Get content stats safely inside the route
-    total_content, published_content, draft_content = get_content_stats()
+    content_stats = get_content_stats()
 
     return render_template(
         "admin/dashboard.html",
         orders=orders,
-        total_orders=total_orders,
-        paid_orders=paid_orders,
-        pending_orders=pending_orders,
-        total_revenue=total_revenue,
-        revenue_by_type=revenue_by_type,
-        revenue_by_status=revenue_by_status,
+        total_orders=revenue["total_orders"],
+        paid_orders=revenue["paid_orders"],
+        pending_orders=revenue["pending_orders"],
+        total_revenue=revenue["total_revenue"],
+        revenue_by_type=revenue["revenue_by_type"],
+        revenue_by_status=revenue["revenue_by_status"],
         recent_access=recent_access,
-        total_content=total_content,
-        published_content=published_content,
-        draft_content=draft_content
+        total_content=content_stats["total"],
+        published_content=content_stats["published"],
+        draft_content=content_stats["draft"],
+        content_by_type=content_stats["by_type"]
     )
 
 
+@admin_bp.route("/api/revenue")
+@admin_required
+def revenue_api():
+    """
+    Revenue time series for dashboard charts.
+
+    Query args: granularity (hour|day|week|month), start, end (ISO dates),
+    status (default "paid", "all" for every status), product_type, points.
+    """
+    try:
+        start = request.args.get("start")
+        end = request.args.get("end")
+        status = request.args.get("status", "paid")
+
+        series = get_revenue_series(
+            granularity=request.args.get("granularity", "day"),
+            start=datetime.fromisoformat(start) if start else None,
+            end=datetime.fromisoformat(end) if end else None,
+            status=None if status == "all" else status,
+            product_type=request.args.get("product_type") or None,
+            max_points=request.args.get("points", type=int),
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    return jsonify(series)
+
+
+@admin_bp.route("/api/content-stats")
+@admin_required
+def content_stats_api():
+    return jsonify(get_content_stats())
+
+
 # -------------------------------
 # Content Manager
 # -------------------------------
@@ -125,14 +141,19 @@ def content_manager():
     search = request.args.get("search")
     ctype = request.args.get("type")
 
-    query = Content.query
     if search:
-        query = query.filter(Content.title.ilike(f"%{search}%"))
+        # Ranked full-text search over title, summary and body
+        results = search_content(search, content_type=ctype)
+        contents = KeysetPage([content for content, _ in results], None)
+        snippets = {content.id: result.snippet for content, result in results}
+        return render_template("admin/content_manager.html", contents=contents, snippets=snippets)
+
+    query = Content.query
     if ctype:
         query = query.filter_by(content_type=ctype)
 
-    contents = query.order_by(Content.created_at.desc()).all()
-    return render_template("admin/content_manager.html", contents=contents)
+    contents = keyset_paginate(query, Content, cursor=request.args.get("cursor"))
+    return render_template("admin/content_manager.html", contents=contents, snippets={})
 
 # -------------------------------
 # Create Content
@@ -147,6 +168,14 @@ def create_content():
         content_body = request.form.get("content")
         status = request.form.get("status") or "draft"
 
+        publish_at = None
+        if status == SCHEDULED:
+            try:
+                publish_at = parse_publish_at(request.form.get("publish_at"))
+            except ValueError as e:
+                flash(f"Invalid publish time: {e}", "danger")
+                return redirect(url_for("admin_bp.create_content"))
+
         image = request.files.get("image")
         image_filename = None
 
@@ -161,21 +190,28 @@ def create_content():
             image.save(image_path)
             image_filename = filename
 
-        # Ensure slug is unique
-        slug = generate_unique_slug(title)
-
         new_content = Content(
             title=title,
-            slug=slug,
             summary=summary,
             content=content_body,
             content_type=content_type,
             image=image_filename,
-            status=status
+            status=status,
+            publish_at=publish_at
         )
-
-        db.session.add(new_content)
+        prerender_content(new_content)
+
+        # Inserts the row, retrying with a suffixed slug if the title is taken
+        try:
+            allocate_slug(new_content, title, salt=content_type)
+        except SlugAllocationError:
+            db.session.rollback()
+            flash("Could not create a unique URL for this title, please change it", "danger")
+            return redirect(url_for("admin_bp.create_content"))
         db.session.commit()
+        invalidate_content_stats()
+        refresh_related_content()
+        invalidate_content(new_content.content_type, new_content.slug)
 
         flash(f"{content_type.capitalize()} created successfully!", "success")
         return redirect(url_for("admin_bp.content_manager"))
@@ -193,7 +229,17 @@ def edit_content(content_id):
         content.title = request.form.get("title")
         content.summary = request.form.get("summary")
         content.content = request.form.get("content")
-        content.status = request.form.get("status")
+        status = request.form.get("status")
+        if status == SCHEDULED:
+            try:
+                schedule(content, parse_publish_at(request.form.get("publish_at")))
+            except ValueError as e:
+                flash(f"Invalid publish time: {e}", "danger")
+                return redirect(url_for("admin_bp.edit_content", content_id=content.id))
+        else:
+            content.status = status
+            content.publish_at = None
+        prerender_content(content)
 
         image = request.files.get("image")
         if image and image.filename != "":
@@ -205,6 +251,9 @@ def edit_content(content_id):
             content.image = filename
 
         db.session.commit()
+        invalidate_content_stats()
+        refresh_related_content()
+        invalidate_content(content.content_type, content.slug)
         flash("Content updated successfully", "success")
         return redirect(url_for("admin_bp.content_manager"))
 
@@ -217,7 +266,11 @@ def edit_content(content_id):
 @admin_required
 def delete_content(content_id):
     content = Content.query.get_or_404(content_id)
+    content_type, slug = content.content_type, content.slug
     db.session.delete(content)
     db.session.commit()
+    invalidate_content_stats()
+    refresh_related_content()
+    invalidate_content(content_type, slug)
     flash("Content deleted", "info")
     return redirect(url_for("admin_bp.content_manager"))
\ No newline at end of file
@@ -3,6 +3,7 @@ from extensions import db
 from models.affiliate import AffiliatePartner, AffiliateReferral
 from utils.auth import admin_required
 from utils.validators import validate_email
+from utils.pagination import keyset_paginate
 import logging
 
 logger = logging.getLogger(__name__)
@@ -98,7 +99,7 @@ def manage_partners():
         query = query.filter(AffiliatePartner.name.ilike(f"%{search}%") |
                             AffiliatePartner.email.ilike(f"%{search}%"))
 
-    partners = query.order_by(AffiliatePartner.created_at.desc()).all()
+    partners = keyset_paginate(query, AffiliatePartner, cursor=request.args.get("cursor"))
     return render_template("admin/affiliate/partners.html", partners=partners, current_status=status)
 
 
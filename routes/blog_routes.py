@@ -1,6 +1,7 @@
-from flask import Blueprint, render_template, current_app
-from requests import post
+from flask import Blueprint, render_template, current_app, request, redirect, url_for
 from models.content import Content
+from utils.pagination import keyset_paginate
+from services.page_cache import page_cache, content_index_cursor, content_index_tag, content_index_validators
 
 blog_bp = Blueprint("blog", __name__)
 
@@ -10,22 +11,19 @@ blog_bp = Blueprint("blog", __name__)
 # SINGLE ARTICLE PAGE
 @blog_bp.route("/blog/<slug>")
 def blog_post(slug):
-
+    # Old /blog/blog/<slug> links; the canonical page (with related posts) is public_bp.blog_post
     current_app.logger.info(f"Blog post viewed: {slug}")
-
-    post=Content.query.filter_by(
-    content_type="blog",
-    status="published"
-    ).order_by(Content.created_at.desc()) \
-    .limit(5).all()
-    return render_template("blog/post.html", post=post)
+    return redirect(url_for("public_bp.blog_post", slug=slug), code=301)
 
 @blog_bp.route("/")
 def blog_home():
+    cursor, cacheable = content_index_cursor("blog", request.args.get("cursor"))
 
-    posts = Content.query.filter_by(
-        content_type="blog",
-        status="published"
-    ).order_by(Content.created_at.desc()).all()
+    def render():
+        posts = keyset_paginate(Content.published_listing("blog"), Content, cursor, per_page=12)
+        return render_template("blog/index.html", posts=posts)
 
-    return render_template("blog/index.html", posts=posts)
\ No newline at end of file
+    return page_cache.cached(
+        ("blog_home", cursor) if cacheable else None, [content_index_tag("blog")], render,
+        validate=lambda: content_index_validators("blog", cursor),
+    )
\ No newline at end of file
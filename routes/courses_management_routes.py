@@ -4,6 +4,8 @@ from extensions import db
 from models.course_content import CourseModule, CourseLesson, CourseResource
 from utils.auth import admin_required
 from services.storage_service import get_storage_service
+from utils.pagination import keyset_paginate
+from services.content_renderer import prerender_lesson
 from datetime import datetime
 import os
 import logging
@@ -148,6 +150,7 @@ def create_lesson(module_id):
             is_preview=is_preview,
             order=order
         )
+        prerender_lesson(lesson)
         
         db.session.add(lesson)
         db.session.commit()
@@ -177,6 +180,7 @@ def edit_lesson(lesson_id):
         lesson.is_preview = request.form.get("is_preview") == "on"
         lesson.order = request.form.get("order", lesson.order, type=int)
         lesson.updated_at = datetime.utcnow()
+        prerender_lesson(lesson)
         
         db.session.commit()
         logger.info(f"Updated lesson: {lesson.title}")
@@ -226,7 +230,11 @@ def reorder_lessons():
 @admin_required
 def manage_resources(course_id):
     """Manage course resources"""
-    resources = CourseResource.query.filter_by(course_id=course_id).all()
+    resources = keyset_paginate(
+        CourseResource.query.filter_by(course_id=course_id),
+        CourseResource,
+        cursor=request.args.get("cursor"),
+    )
     return render_template("admin/courses/resources.html", course_id=course_id, resources=resources)
 
 
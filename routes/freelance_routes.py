@@ -3,6 +3,7 @@ from extensions import db
 from models.freelance import FreelanceApplication
 from utils.auth import admin_required
 from utils.validators import validate_email
+from utils.pagination import keyset_paginate
 import logging
 
 logger = logging.getLogger(__name__)
@@ -77,7 +78,7 @@ def manage_applications():
         query = query.filter(FreelanceApplication.name.ilike(f"%{search}%") |
                            FreelanceApplication.email.ilike(f"%{search}%"))
 
-    applications = query.order_by(FreelanceApplication.created_at.desc()).all()
+    applications = keyset_paginate(query, FreelanceApplication, cursor=request.args.get("cursor"))
     return render_template("admin/freelance/applications.html", applications=applications, current_status=status)
 
 
@@ -1,9 +1,22 @@
 from flask import Blueprint, request, jsonify, render_template, flash, redirect, url_for, current_app
 from werkzeug.utils import secure_filename
+from sqlalchemy import false
 from extensions import db
 from models.job import Job
 from utils.auth import admin_required
-from utils.slug import generate_slug
+from utils.pagination import count_paginate, invalidate_counts
+from utils.slug import allocate_slug, SlugAllocationError
+from services.feed_service import feed_response
+from services.job_dedup_service import index_jobs, remove_job
+from services.job_expiry_service import set_expiry
+from services.job_facets_service import get_job_facets
+from services.http_cache import conditional
+from services.publishing_service import parse_publish_at, schedule
+from services.search_service import job_matches
+from services.page_cache import (
+    page_cache, invalidate_job, JOBS_INDEX_TAG, job_page_tag,
+    job_index_validators, job_page_validators,
+)
 import os
 from datetime import datetime
 
@@ -12,12 +25,27 @@ logger = __import__('logging').getLogger(__name__)
 job_bp = Blueprint("job_bp", __name__, url_prefix="/jobs")
 
 ALLOWED_EXTENSIONS = {"png", "jpg", "jpeg", "gif", "webp"}
+COUNT_NAMESPACE = "jobs"
 
 
 def allowed_file(filename):
     return "." in filename and filename.rsplit(".", 1)[1].lower() in ALLOWED_EXTENSIONS
 
 
+def _ranked(query, matches):
+    """Restrict `query` to the search `matches` subquery, best match first"""
+    if matches is None:
+        return query.filter(false())
+    return query.join(matches, matches.c.id == Job.id).order_by(matches.c.rank.desc(), Job.id.desc())
+
+
+@page_cache.on_invalidate
+def _drop_cached_counts(tags):
+    # Every job save invalidates the listing tag; other workers rely on the count TTL
+    if JOBS_INDEX_TAG in tags:
+        invalidate_counts(COUNT_NAMESPACE)
+
+
 # =============================
 # Public Routes
 # =============================
@@ -27,33 +55,68 @@ def jobs_list():
     """List all published jobs with filtering"""
     job_type = request.args.get("type")
     remote_only = request.args.get("remote", "false").lower() == "true"
+    location = request.args.get("location", "").strip()
+    source = request.args.get("source", "").strip()
     search = request.args.get("search", "").strip()
     page = request.args.get("page", 1, type=int)
 
+    # The query string selects the page/filters, so it is part of the ETag
+    validators = job_index_validators(request.query_string.decode())
+    return conditional(
+        validators, [JOBS_INDEX_TAG],
+        lambda: _render_jobs_list(job_type, remote_only, location, source, search, page),
+        public=page_cache.request_is_cacheable(),
+    )
+
+
+def _render_jobs_list(job_type, remote_only, location, source, search, page):
     query = Job.query.filter_by(status="published")
 
     if job_type:
         query = query.filter_by(job_type=job_type)
     if remote_only:
         query = query.filter_by(remote=True)
+    if location:
+        query = query.filter_by(location=location)
+    if source:
+        query = query.filter_by(source=source)
     if search:
-        query = query.filter(
-            (Job.title.ilike(f"%{search}%")) |
-            (Job.company.ilike(f"%{search}%")) |
-            (Job.description.ilike(f"%{search}%"))
-        )
+        # Best matches first, from the job search index
+        query = _ranked(query, job_matches(search))
+    else:
+        query = query.order_by(Job.created_at.desc())
+
+    jobs = count_paginate(
+        query, page, per_page=20,
+        namespace=COUNT_NAMESPACE, count_key=("published", job_type, remote_only, location, source, search),
+    )
+    facets = get_job_facets(job_type, remote_only, location, source, search)
+
+    return render_template(
+        "jobs/index.html", jobs=jobs, facets=facets, current_filter=job_type, remote_only=remote_only,
+        current_location=location, current_source=source, search=search,
+    )
 
-    jobs = query.order_by(Job.created_at.desc()).paginate(page=page, per_page=20)
-    
-    return render_template("jobs/index.html", jobs=jobs, current_filter=job_type, remote_only=remote_only, search=search)
+
+@job_bp.route("/feed.xml")
+def jobs_feed():
+    """Atom feed of the latest published jobs"""
+    return feed_response("jobs")
 
 
 @job_bp.route("/<slug>")
 def job_detail(slug):
     """View single job"""
-    job = Job.query.filter_by(slug=slug, status="published").first_or_404()
     current_app.logger.info(f"Job viewed: {slug}")
-    return render_template("jobs/detail.html", job=job)
+
+    def render():
+        job = Job.query.filter_by(slug=slug, status="published").first_or_404()
+        return render_template("jobs/detail.html", job=job)
+
+    return conditional(
+        job_page_validators(slug), [job_page_tag(slug)], render,
+        public=page_cache.request_is_cacheable(),
+    )
 
 
 # =============================
@@ -72,12 +135,12 @@ def admin_jobs_list():
     if status:
         query = query.filter_by(status=status)
     if search:
-        query = query.filter(
-            (Job.title.ilike(f"%{search}%")) |
-            (Job.company.ilike(f"%{search}%"))
-        )
+        query = _ranked(query, job_matches(search))
+    else:
+        query = query.order_by(Job.created_at.desc())
 
-    jobs = query.order_by(Job.created_at.desc()).paginate(page=page, per_page=50)
+    # Has-next probing only: admins page through every status, so no count is worth caching
+    jobs = count_paginate(query, page, per_page=50)
     return render_template("admin/jobs/list.html", jobs=jobs, current_status=status)
 
 
@@ -115,12 +178,6 @@ def create_job():
                 image.save(os.path.join(upload_folder, filename))
                 image_filename = filename
 
-        # Generate slug
-        slug = generate_slug(title)
-        existing = Job.query.filter_by(slug=slug).first()
-        if existing:
-            slug = f"{slug}-{int(datetime.utcnow().timestamp())}"
-
         # Create job
         job = Job(
             title=title,
@@ -131,13 +188,24 @@ def create_job():
             description=description,
             application_link=application_link,
             image=image_filename,
-            slug=slug,
             source="manual",
             status=status
         )
-
-        db.session.add(job)
+        if status == "published":
+            job.published_at = datetime.utcnow()
+            set_expiry(job)
+
+        # Inserts the row, retrying with a suffixed slug if the title is taken
+        try:
+            allocate_slug(job, title, salt=company)
+        except SlugAllocationError as e:
+            db.session.rollback()
+            logger.error(f"Creating job failed: {e}")
+            flash("Could not create a unique URL for this title, please change it", "danger")
+            return redirect(url_for("job_bp.create_job"))
+        index_jobs([job.id], suppress=False)
         db.session.commit()
+        invalidate_job(job.slug)
 
         logger.info(f"Created job: {title}")
         flash("Job created successfully", "success")
@@ -160,7 +228,13 @@ def edit_job(job_id):
         job.remote = request.form.get("remote") == "on"
         job.description = request.form.get("description", "").strip()
         job.application_link = request.form.get("application_link", "").strip()
+        was_published = job.status == "published"
         job.status = request.form.get("status", "draft")
+        if job.status == "published":
+            # Going (back) live, e.g. from archived: a fresh lifetime, as publish_job gives
+            if not was_published or job.published_at is None:
+                job.published_at = datetime.utcnow()
+            set_expiry(job)
 
         if "image" in request.files:
             image = request.files["image"]
@@ -172,7 +246,10 @@ def edit_job(job_id):
                 job.image = filename
 
         job.updated_at = datetime.utcnow()
+        db.session.flush()
+        index_jobs([job.id], suppress=False)
         db.session.commit()
+        invalidate_job(job.slug)
 
         logger.info(f"Updated job: {job.title}")
         flash("Job updated successfully", "success")
@@ -186,8 +263,13 @@ def edit_job(job_id):
 def delete_job(job_id):
     """Delete job"""
     job = Job.query.get_or_404(job_id)
+    slug = job.slug
+    promoted = remove_job(job)
     db.session.delete(job)
     db.session.commit()
+    invalidate_job(slug)
+    if promoted:
+        invalidate_job(promoted.slug)
     logger.info(f"Deleted job: {job.title}")
     return jsonify({"message": "Job deleted"}), 200
 
@@ -199,6 +281,26 @@ def publish_job(job_id):
     job = Job.query.get_or_404(job_id)
     job.status = "published"
     job.published_at = datetime.utcnow()
+    set_expiry(job)
     db.session.commit()
+    invalidate_job(job.slug)
     logger.info(f"Published job: {job.title}")
     return jsonify({"message": "Job published"}), 200
+
+
+@job_bp.route("/admin/schedule/<int:job_id>", methods=["POST"])
+@admin_required
+def schedule_job(job_id):
+    """Schedule job to be published at `publish_at` (UTC ISO datetime)"""
+    job = Job.query.get_or_404(job_id)
+    data = request.get_json(silent=True) or request.form
+    try:
+        schedule(job, parse_publish_at(data.get("publish_at")))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    db.session.commit()
+    # A published job going back to scheduled leaves the listings, feed and facets
+    invalidate_job(job.slug)
+    logger.info(f"Scheduled job: {job.title} at {job.publish_at}")
+    return jsonify({"message": "Job scheduled", "publish_at": job.publish_at.isoformat()}), 200
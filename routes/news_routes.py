@@ -1,5 +1,7 @@
-from flask import Blueprint, render_template, current_app
+from flask import Blueprint, render_template, current_app, request
 from models.content import Content
+from utils.pagination import keyset_paginate
+from services.page_cache import page_cache, content_index_cursor, content_index_tag, content_index_validators
 
 news_bp = Blueprint("news_bp", __name__, url_prefix="/news")
 
@@ -7,13 +9,17 @@ news_bp = Blueprint("news_bp", __name__, url_prefix="/news")
 # NEWS LIST PAGE
 @news_bp.route("/")
 def news_home():
-    articles = Content.query.filter_by(
-        content_type="news",
-        status="published"
-    ).order_by(Content.created_at.desc()).all()
-    
     current_app.logger.info("News page visited")
-    return render_template("news/index.html", posts=articles)
+    cursor, cacheable = content_index_cursor("news", request.args.get("cursor"))
+
+    def render():
+        articles = keyset_paginate(Content.published_listing("news"), Content, cursor, per_page=12)
+        return render_template("news/index.html", articles=articles)
+
+    return page_cache.cached(
+        ("news_home", cursor) if cacheable else None, [content_index_tag("news")], render,
+        validate=lambda: content_index_validators("news", cursor),
+    )
 
 
 # SINGLE NEWS ARTICLE
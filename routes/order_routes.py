@@ -1,14 +1,18 @@
 from flask import Blueprint, request, redirect, jsonify
+import logging
 import re
-import requests
 import os
+import secrets
 
 from extensions import db
 from models import Product, Order
+from services.payment_verification_service import remember_checkout
+from services.paystack_client import get_paystack_client, to_subunit, PaystackError, PaystackUnavailable
+
+logger = logging.getLogger(__name__)
 
 order_bp = Blueprint("order_bp", __name__)
 
-PAYSTACK_SECRET_KEY = os.getenv("PAYSTACK_SECRET_KEY")
 PUBLIC_URL = os.getenv("PUBLIC_URL", "http://127.0.0.1:5000")
 
 
@@ -16,53 +20,43 @@ PUBLIC_URL = os.getenv("PUBLIC_URL", "http://127.0.0.1:5000")
 def create_order(product_id):
 
     email = (request.form.get("email") or '').strip()
-    custom_amount = request.form.get("amount")
 
     product = Product.query.get_or_404(product_id)
 
     if not email or not re.match(r"^[^@\s]+@[^@\s]+\.[^@\s]+$", email):
         return "Invalid email address", 400
 
-    try:
-        amount_float = float(custom_amount) if custom_amount else product.price
-    except:
-        return "Invalid amount", 400
-
+    # Always the product's price: settlement checks Paystack's amount against it
     order = Order(
         customer_email=email,
         product_id=product.id,
+        amount=product.price,
+        product_type=product.product_type,
         status="pending"
     )
 
     db.session.add(order)
     db.session.commit()
 
-    amount = int(amount_float * 100)
+    # Unguessable, so a reference can't be found by counting order ids
+    reference = f"SMARTSORT_{order.id}_{secrets.token_hex(8)}"
 
-    headers = {
-        "Authorization": f"Bearer {PAYSTACK_SECRET_KEY}",
-        "Content-Type": "application/json"
-    }
-
-    data = {
-        "email": email,
-        "amount": amount,
-        "reference": f"SMARTSORT_{order.id}",
-        "callback_url": f"{PUBLIC_URL}/verify-payment"
-    }
-
-    response = requests.post(
-        "https://api.paystack.co/transaction/initialize",
-        json=data,
-        headers=headers
-    )
-
-    response_data = response.json()
-
-    if response_data["status"]:
-        order.payment_reference = data["reference"]
-        db.session.commit()
-
-        return redirect(response_data["data"]["authorization_url"])
+    try:
+        transaction = get_paystack_client().initialize_transaction(
+            email=email,
+            amount=to_subunit(order.amount),
+            reference=reference,
+            callback_url=f"{PUBLIC_URL}/verify-payment",
+        )
+    except PaystackUnavailable as e:
+        logger.warning(f"Payment initialization for order {order.id} unavailable: {e}")
+        return "Payment service is temporarily unavailable, please try again shortly", 503
+    except PaystackError as e:
+        logger.error(f"Payment initialization for order {order.id} failed: {e}")
+        return "Payment initialization failed", 500
+
+    order.payment_reference = reference
+    db.session.commit()
+    remember_checkout(reference)
 
-    return "Payment initialization failed", 500
\ No newline at end of file
+    return redirect(transaction["authorization_url"])
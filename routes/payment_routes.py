@@ -1,5 +1,5 @@
-from flask import Blueprint, request, redirect, jsonify, render_template
-import requests
+from flask import Blueprint, request, redirect, jsonify, render_template, make_response
+import logging
 import os
 import hmac
 import hashlib
@@ -7,6 +7,14 @@ import hashlib
 from extensions import db
 from models import Order, UserAccess
 from flask_mail import Message
+from sqlalchemy.orm import joinedload
+from services.email_service import send_order_confirmation
+from services.fulfillment import accept_payment, fulfill_order, transition_order
+from services.payment_verification_service import is_buyer, verify_reference
+from services.paystack_client import PaystackError, PaystackUnavailable
+from services.webhook_inbox_service import enqueue
+
+logger = logging.getLogger(__name__)
 
 from flask import Blueprint, request, redirect, jsonify
 payment_bp = Blueprint("payment_bp", __name__)
@@ -31,24 +39,65 @@ def paystack_webhook():
     payload = request.get_data()
     signature = request.headers.get("x-paystack-signature")
 
-    if not verify_paystack_signature(payload, signature):
+    if not signature or not verify_paystack_signature(payload, signature):
         return "Invalid signature", 400
 
-    event = request.json
+    # Acknowledge at once; the inbox workers apply the event (flask process-webhooks).
+    # Redeliveries are dropped by enqueue but still get a 200 so Paystack stops sending them.
+    try:
+        enqueue(payload)
+    except ValueError:
+        return "Invalid payload", 400
+
+    return "OK", 200
+
+
+def _confirmation(order):
+    # References travel in URLs and emails: only the browser that checked
+    # out sees the resource here; the buyer also gets it by email
+    if not is_buyer(order.payment_reference):
+        return "Payment confirmed. Your access details have been sent to your email address."
+
+    template = "service_confirmation.html" if order.product.product_type == "service" else "course_access.html"
+    response = make_response(render_template(template, product=order.product, order=order))
+    response.headers["Cache-Control"] = "private, no-store"
+    return response
+
 
-    if event.get("event") == "charge.success":
+def _find_order(reference):
+    return (
+        Order.query.options(joinedload(Order.product))
+        .filter_by(payment_reference=reference)
+        .first_or_404()
+    )
 
-        reference = event["data"]["reference"]
 
-        order = Order.query.filter_by(
-            payment_reference=reference
-        ).first()
+def _settle(order):
+    """
+    Bring an open order in line with Paystack and return its status.
+    Raises PaystackError / PaystackUnavailable if Paystack can't say.
+    """
+    # Usually the webhook got there first: no upstream call at all
+    if order.status == "paid":
+        return order.status
 
-        if order and order.status != "paid":
-            order.status = "paid"
+    transaction = verify_reference(order.payment_reference)
+    status = transaction.get("status")
+
+    if status == "success":
+        if not accept_payment(order, transaction):
+            db.session.commit()
+        elif transition_order(order, "paid"):
+            fulfill_order(order)
+            db.session.commit()
+            send_order_confirmation(order)
+    elif status in ("failed", "reversed"):
+        if transition_order(order, "failed", from_statuses=("pending",)):
             db.session.commit()
 
-    return "OK", 200
+    return order.status
+
+
 @payment_bp.route("/verify-payment")
 def verify_payment():
 
@@ -57,6 +106,46 @@ def verify_payment():
     if not reference:
         return "Reference not provided", 400
 
-    headers = {
-        "Authorization": f"Bearer {PAYSTACK_SECRET_KEY}"
-    }
+    order = _find_order(reference)
+
+    try:
+        status = _settle(order)
+    except PaystackUnavailable as e:
+        # The webhook may still confirm it; the pending page polls for that
+        logger.warning(f"Payment verification for {reference} unavailable: {e}")
+        return render_template("payment_pending.html", reference=reference)
+    except PaystackError as e:
+        logger.error(f"Payment verification for {reference} failed: {e}")
+        return "Payment verification failed", 400
+
+    if status == "paid":
+        return _confirmation(order)
+
+    if status == "failed":
+        return "Payment failed", 402
+
+    return render_template("payment_pending.html", reference=reference)
+
+
+@payment_bp.route("/api/order-status/<reference>")
+def order_status(reference):
+    """Polled by the pending page; answers from the order, then the verification cache"""
+    order = _find_order(reference)
+
+    try:
+        status = _settle(order)
+    except PaystackError as e:
+        logger.warning(f"Status check for {reference} could not reach Paystack: {e}")
+        status = order.status
+
+    return jsonify({"status": status})
+
+
+@payment_bp.route("/access/<reference>")
+def order_access(reference):
+    order = _find_order(reference)
+
+    if order.status != "paid":
+        return redirect(f"/verify-payment?reference={reference}")
+
+    return _confirmation(order)
@@ -1,8 +1,19 @@
-from flask import Blueprint, render_template, Response
+from flask import Blueprint, abort, render_template, request, send_file
 from models.content import Content
+from utils.pagination import keyset_paginate
+from services.page_cache import (
+    page_cache, content_index_cursor, content_index_tag, content_page_tag,
+    content_index_validators, content_page_validators,
+)
+from services.http_cache import BROWSER_MAX_AGE, SHARED_MAX_AGE
+from services.feed_service import feed_response
+from services.related_content_service import get_related_content
+from services.sitemap_service import get_sitemap_file, shard_name
 
 public_bp = Blueprint("public_bp", __name__)
 
+INDEX_PER_PAGE = 12
+
 # -------------------------------
 # Home / Static Pages
 # -------------------------------
@@ -48,17 +59,30 @@ def terms_conditions():
 # -------------------------------
 @public_bp.route("/blog")
 def blog_index():
-    # Fetch only published blog posts
-    posts = Content.query.filter_by(content_type="blog", status="published")\
-                         .order_by(Content.created_at.desc()).all()
-    return render_template("blog/index.html", posts=posts)
+    cursor, cacheable = content_index_cursor("blog", request.args.get("cursor"))
+
+    def render():
+        # One page of published blog posts, without the body columns
+        posts = keyset_paginate(Content.published_listing("blog"), Content, cursor, per_page=INDEX_PER_PAGE)
+        return render_template("blog/index.html", posts=posts)
+
+    return page_cache.cached(
+        ("blog_index", cursor) if cacheable else None, [content_index_tag("blog")], render,
+        validate=lambda: content_index_validators("blog", cursor),
+    )
 
 
 @public_bp.route("/blog/<slug>")
 def blog_post(slug):
-    # Fetch single blog post by slug
-    post = Content.query.filter_by(slug=slug, content_type="blog", status="published").first_or_404()
-    return render_template("blog/post.html", post=post)
+    def render():
+        # Fetch single blog post by slug
+        post = Content.query.filter_by(slug=slug, content_type="blog", status="published").first_or_404()
+        return render_template("blog/post.html", post=post, related=get_related_content(post.id))
+
+    return page_cache.cached(
+        ("blog_post", slug), [content_page_tag("blog", slug)], render,
+        validate=lambda: content_page_validators("blog", slug),
+    )
 
 
 # -------------------------------
@@ -66,17 +90,43 @@ def blog_post(slug):
 # -------------------------------
 @public_bp.route("/news")
 def news_index():
-    # Fetch only published news articles
-    articles = Content.query.filter_by(content_type="news", status="published")\
-                            .order_by(Content.created_at.desc()).all()
-    return render_template("news/index.html", articles=articles)
+    cursor, cacheable = content_index_cursor("news", request.args.get("cursor"))
+
+    def render():
+        # One page of published news articles, without the body columns
+        articles = keyset_paginate(Content.published_listing("news"), Content, cursor, per_page=INDEX_PER_PAGE)
+        return render_template("news/index.html", articles=articles)
+
+    return page_cache.cached(
+        ("news_index", cursor) if cacheable else None, [content_index_tag("news")], render,
+        validate=lambda: content_index_validators("news", cursor),
+    )
 
 
 @public_bp.route("/news/<slug>")
 def news_post(slug):
-    # Fetch single news article by slug
-    article = Content.query.filter_by(slug=slug, content_type="news", status="published").first_or_404()
-    return render_template("news/post.html", article=article)
+    def render():
+        # Fetch single news article by slug
+        article = Content.query.filter_by(slug=slug, content_type="news", status="published").first_or_404()
+        return render_template("news/post.html", article=article, related=get_related_content(article.id))
+
+    return page_cache.cached(
+        ("news_post", slug), [content_page_tag("news", slug)], render,
+        validate=lambda: content_page_validators("news", slug),
+    )
+
+
+# -------------------------------
+# Feeds
+# -------------------------------
+@public_bp.route("/blog/feed.xml")
+def blog_feed():
+    return feed_response("blog")
+
+
+@public_bp.route("/news/feed.xml")
+def news_feed():
+    return feed_response("news")
 
 
 # -------------------------------
@@ -84,24 +134,20 @@ def news_post(slug):
 # -------------------------------
 @public_bp.route("/sitemap.xml")
 def sitemap():
-    pages = [
-        "https://https-smartsortaisolutions.onrender.com/",
-        "https://https-smartsortaisolutions.onrender.com/services",
-        "https://https-smartsortaisolutions.onrender.com/courses",
-        "https://https-smartsortaisolutions.onrender.com/contact",
-        "https://https-smartsortaisolutions.onrender.com/blog",
-        "https://https-smartsortaisolutions.onrender.com/news",
-        "https://https-smartsortaisolutions.onrender.com/about"
-    ]
-
-    sitemap_xml = """<?xml version="1.0" encoding="UTF-8"?>
-<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
-"""
-    for page in pages:
-        sitemap_xml += f"""
-<url>
-<loc>{page}</loc>
-</url>
-"""
-    sitemap_xml += "</urlset>"
-    return Response(sitemap_xml, mimetype="application/xml")
\ No newline at end of file
+    # Sitemap index pointing at the shards; regenerated only when stale
+    return _send_sitemap("sitemap.xml")
+
+
+@public_bp.route("/sitemap-<int:number>.xml")
+def sitemap_shard(number):
+    return _send_sitemap(shard_name(number))
+
+
+def _send_sitemap(name):
+    path = get_sitemap_file(name)
+    if path is None:
+        abort(404)
+
+    response = send_file(path, mimetype="application/xml", conditional=True)
+    response.headers["Cache-Control"] = f"public, max-age={BROWSER_MAX_AGE}, s-maxage={SHARED_MAX_AGE}"
+    return response
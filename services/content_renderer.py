@@ -0,0 +1,146 @@
+"""
+Save-time rendering
+Converts Markdown (or editor HTML) to sanitized HTML once, when an admin
+saves, and derives the table of contents, reading time and excerpt, so
+public page views do no text processing.
+"""
+
+import json
+import logging
+import math
+import re
+from html import unescape
+
+import bleach
+import markdown
+
+from extensions import db
+from models.content import Content
+from models.course_content import CourseLesson
+
+logger = logging.getLogger(__name__)
+
+WORDS_PER_MINUTE = 200
+EXCERPT_LENGTH = 280
+
+MARKDOWN_EXTENSIONS = ["extra", "sane_lists", "toc"]
+MARKDOWN_EXTENSION_CONFIGS = {"toc": {"permalink": False, "toc_depth": "2-4"}}
+
+ALLOWED_TAGS = {
+    "a", "abbr", "b", "blockquote", "br", "code", "dd", "del", "div", "dl", "dt",
+    "em", "figcaption", "figure", "h1", "h2", "h3", "h4", "h5", "h6", "hr", "i",
+    "img", "ins", "kbd", "li", "mark", "ol", "p", "pre", "s", "small", "span",
+    "strong", "sub", "sup", "table", "tbody", "td", "tfoot", "th", "thead", "tr",
+    "u", "ul",
+}
+
+ALLOWED_ATTRIBUTES = {
+    "*": ["class", "id"],
+    "a": ["href", "title", "rel", "target"],
+    "abbr": ["title"],
+    "img": ["src", "alt", "title", "width", "height", "loading"],
+    "td": ["colspan", "rowspan", "align"],
+    "th": ["colspan", "rowspan", "align", "scope"],
+}
+
+ALLOWED_PROTOCOLS = {"http", "https", "mailto"}
+
+_WHITESPACE_RE = re.compile(r"\s+")
+# bleach strips disallowed tags but keeps their text; these have none worth keeping
+_SCRIPT_STYLE_RE = re.compile(r"<(script|style)\b[^>]*>.*?</\1\s*>", re.IGNORECASE | re.DOTALL)
+
+
+class RenderedContent:
+    """Sanitized HTML plus the data derived from it"""
+
+    def __init__(self, html, toc, reading_time, excerpt):
+        self.html = html
+        self.toc = toc
+        self.reading_time = reading_time
+        self.excerpt = excerpt
+
+
+def _flatten_toc(tokens, entries=None):
+    entries = [] if entries is None else entries
+    for token in tokens:
+        # toc escapes the name; store plain text like the excerpt
+        entries.append({"id": token["id"], "name": unescape(token["name"]), "level": token["level"]})
+        _flatten_toc(token.get("children", []), entries)
+    return entries
+
+
+def render_markdown(source):
+    """Render `source` to a RenderedContent; safe to call with None"""
+    md = markdown.Markdown(
+        extensions=MARKDOWN_EXTENSIONS,
+        extension_configs=MARKDOWN_EXTENSION_CONFIGS,
+        output_format="html",
+    )
+    raw_html = _SCRIPT_STYLE_RE.sub("", md.convert(source or ""))
+
+    html = bleach.clean(
+        raw_html,
+        tags=ALLOWED_TAGS,
+        attributes=ALLOWED_ATTRIBUTES,
+        protocols=ALLOWED_PROTOCOLS,
+        strip=True,
+    )
+
+    # Plain text, not HTML: templates and the Atom summary escape it themselves
+    text = _WHITESPACE_RE.sub(" ", unescape(bleach.clean(html, tags=set(), strip=True))).strip()
+    words = len(text.split())
+    reading_time = max(1, math.ceil(words / WORDS_PER_MINUTE)) if words else 0
+
+    excerpt = text
+    if len(excerpt) > EXCERPT_LENGTH:
+        excerpt = excerpt[:EXCERPT_LENGTH].rsplit(" ", 1)[0] + "…"
+
+    return RenderedContent(html, _flatten_toc(getattr(md, "toc_tokens", [])), reading_time, excerpt)
+
+
+def prerender_content(content):
+    """Fill Content's rendered columns from `content.content`; caller commits"""
+    rendered = render_markdown(content.content)
+    content.content_html = rendered.html
+    content.toc = json.dumps(rendered.toc)
+    content.reading_time = rendered.reading_time
+    content.excerpt = rendered.excerpt
+    return content
+
+
+def prerender_lesson(lesson):
+    """Fill CourseLesson's rendered columns from `lesson.content`; caller commits"""
+    rendered = render_markdown(lesson.content)
+    lesson.content_html = rendered.html
+    lesson.toc = json.dumps(rendered.toc)
+    lesson.reading_time = rendered.reading_time
+    return lesson
+
+
+def prerender_all(batch_size=200):
+    """
+    Backfill rendered columns for every Content and CourseLesson row.
+    Returns (contents, lessons) counts.
+    """
+    counts = []
+    for model, prerender in ((Content, prerender_content), (CourseLesson, prerender_lesson)):
+        count = 0
+        last_id = 0
+        while True:
+            rows = (
+                model.query.filter(model.id > last_id)
+                .order_by(model.id)
+                .limit(batch_size)
+                .all()
+            )
+            if not rows:
+                break
+            for row in rows:
+                prerender(row)
+            db.session.commit()
+            count += len(rows)
+            last_id = rows[-1].id
+        counts.append(count)
+
+    logger.info(f"Pre-rendered {counts[0]} content rows and {counts[1]} lessons")
+    return tuple(counts)
@@ -0,0 +1,80 @@
+"""
+Content statistics
+Counts by status and content type from a single GROUP BY, cached in-process.
+"""
+
+import threading
+import time
+
+from sqlalchemy import func
+
+from extensions import db
+from models.content import Content
+from services.page_cache import page_cache
+
+
+# Admin writes invalidate the cache directly. Other processes (gunicorn
+# workers, the publishing runner) invalidate content pages, which every
+# worker reads from the page-cache journal; a new cache generation drops
+# the counts too. The TTL bounds staleness from writes that do neither.
+CACHE_TTL_SECONDS = 60
+
+_cache = {"stats": None, "expires": 0.0, "generation": None}
+_lock = threading.Lock()
+
+
+def _compute_content_stats():
+    rows = (
+        db.session.query(Content.content_type, Content.status, func.count(Content.id))
+        .group_by(Content.content_type, Content.status)
+        .all()
+    )
+
+    stats = {"total": 0, "published": 0, "draft": 0, "by_status": {}, "by_type": {}}
+
+    for content_type, status, count in rows:
+        status = status or "draft"
+        stats["total"] += count
+        stats["by_status"][status] = stats["by_status"].get(status, 0) + count
+
+        bucket = stats["by_type"].setdefault(
+            content_type, {"total": 0, "published": 0, "draft": 0}
+        )
+        bucket["total"] += count
+        bucket[status] = bucket.get(status, 0) + count
+
+    stats["published"] = stats["by_status"].get("published", 0)
+    stats["draft"] = stats["by_status"].get("draft", 0)
+    return stats
+
+
+def get_content_stats():
+    """
+    Return content counts:
+        {"total", "published", "draft",
+         "by_status": {status: n},
+         "by_type": {content_type: {"total", "published", "draft", ...}}}
+    """
+    now = time.monotonic()
+    page_cache._sync()
+    generation = page_cache._generation
+
+    with _lock:
+        if _cache["stats"] is not None and _cache["expires"] > now and _cache["generation"] == generation:
+            return _cache["stats"]
+
+    stats = _compute_content_stats()
+
+    with _lock:
+        _cache["stats"] = stats
+        _cache["expires"] = now + CACHE_TTL_SECONDS
+        _cache["generation"] = generation
+
+    return stats
+
+
+def invalidate_content_stats():
+    """Drop cached counts; call after any Content insert, update or delete"""
+    with _lock:
+        _cache["stats"] = None
+        _cache["expires"] = 0.0
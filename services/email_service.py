@@ -0,0 +1,40 @@
+"""
+Transactional email
+Sent through the Flask-Mail instance registered on the app. Failures are
+logged and reported to the caller, never raised: an order is already paid
+and fulfilled by the time its confirmation goes out.
+"""
+
+import logging
+
+from flask import current_app
+from flask_mail import Message
+
+logger = logging.getLogger(__name__)
+
+
+def send_email(to, subject, body):
+    """Send a plain-text email; returns True if it was handed to the mail server"""
+    mail = current_app.extensions.get("mail")
+    if mail is None:
+        logger.warning(f"Mail is not configured; not sending '{subject}' to {to}")
+        return False
+
+    try:
+        mail.send(Message(subject=subject, recipients=[to], body=body,
+                          sender=current_app.config.get("MAIL_DEFAULT_SENDER") or "no-reply@smartsort.ai"))
+    except Exception as e:
+        logger.error(f"Sending '{subject}' to {to} failed: {e}")
+        return False
+    return True
+
+
+def send_order_confirmation(order):
+    product = order.product
+    body = (
+        f"Thank you for your purchase of {product.title}.\n\n"
+        f"Your payment (reference {order.payment_reference}) has been confirmed"
+        + (f" and your access is ready: {product.resource_link}\n" if product.resource_link else ".\n")
+        + "\nSmartSort AI Solutions"
+    )
+    return send_email(order.customer_email, f"Order confirmed: {product.title}", body)
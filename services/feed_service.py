@@ -0,0 +1,241 @@
+"""
+Atom feeds
+Blog, news and job feeds kept as pre-rendered <entry> fragments per
+worker. A refresh only renders rows modified since the last one and
+re-checks that the entries already held are still published; the full
+query runs on first use or when an entry disappears.
+
+The routes serve feeds through page_cache.cached, so a refresh only
+happens after a publish or edit invalidates the listing tag.
+"""
+
+import logging
+import threading
+from datetime import datetime
+from urllib.parse import urlparse
+from xml.sax.saxutils import escape, quoteattr
+
+from flask import Response
+from sqlalchemy import func
+from sqlalchemy.orm import load_only
+
+from extensions import db
+from models.content import Content
+from models.job import Job
+from services.page_cache import (
+    page_cache, content_index_tag, content_index_validators, JOBS_INDEX_TAG,
+    job_index_validators,
+)
+from services.sitemap_service import SITE_URL
+
+logger = logging.getLogger(__name__)
+
+FEED_SIZE = 50
+SUMMARY_LENGTH = 400
+
+_TAG_AUTHORITY = urlparse(SITE_URL).hostname
+
+
+def _atom_date(value):
+    # Timestamps are stored as naive UTC
+    return (value or datetime.utcnow()).replace(microsecond=0).isoformat() + "Z"
+
+
+def _truncate(text):
+    text = " ".join((text or "").split())
+    if len(text) > SUMMARY_LENGTH:
+        text = text[:SUMMARY_LENGTH].rsplit(" ", 1)[0] + "…"
+    return text
+
+
+class FeedEntry:
+    """One rendered <entry> and the values used to order and refresh it"""
+
+    __slots__ = ("id", "published", "updated", "xml")
+
+    def __init__(self, id, published, updated, xml):
+        self.id = id
+        self.published = published
+        self.updated = updated
+        self.xml = xml
+
+
+class Feed:
+    """
+    Incrementally maintained Atom document for one listing.
+
+    Args:
+        name: Short name used in entry ids (e.g. "blog")
+        title: Feed title
+        path: Site path of the HTML listing (e.g. "/blog")
+        model: Mapped class the entries come from
+        criteria: Filter expressions selecting published rows
+        published: Column expression for an entry's publish time
+        updated: Column expression for an entry's last modification
+        columns: Column names to load for rendering
+        render: Function(row) -> dict(title, link, summary)
+        tag: Page-cache tag invalidated when the listing changes
+        validators: Function() -> http_cache.Validators for the listing
+    """
+
+    def __init__(self, name, title, path, model, criteria, published, updated, columns, render,
+                 tag, validators):
+        self.name = name
+        self.title = title
+        self.path = path
+        self.model = model
+        self.criteria = criteria
+        self.published = published
+        self.updated = updated
+        self.columns = columns
+        self.render = render
+        self.tag = tag
+        self.validators = validators
+        self._entries = None
+        self._watermark = None
+        self._lock = threading.Lock()
+
+    @property
+    def url(self):
+        return f"{SITE_URL}{self.path.rstrip('/')}/feed.xml"
+
+    def _query(self):
+        return (
+            db.session.query(self.model, self.published, self.updated)
+            .filter(*self.criteria)
+            .options(load_only(*[getattr(self.model, name) for name in self.columns]))
+        )
+
+    def _entry(self, row, published, updated):
+        fields = self.render(row)
+        xml = (
+            "  <entry>\n"
+            f"    <id>tag:{_TAG_AUTHORITY},2026:{self.name}:{row.id}</id>\n"
+            f"    <title>{escape(fields['title'] or '')}</title>\n"
+            f"    <link rel=\"alternate\" href={quoteattr(fields['link'])}/>\n"
+            f"    <published>{_atom_date(published)}</published>\n"
+            f"    <updated>{_atom_date(updated)}</updated>\n"
+            f"    <summary>{escape(_truncate(fields['summary']))}</summary>\n"
+            "  </entry>\n"
+        )
+        return FeedEntry(row.id, published, updated, xml)
+
+    def _latest(self, query):
+        rows = query.order_by(self.published.desc(), self.model.id.desc()).limit(FEED_SIZE).all()
+        return [self._entry(*row) for row in rows]
+
+    def _rebuild(self):
+        self._entries = self._latest(self._query())
+
+    def _apply_changes(self):
+        """Merge rows modified since the last refresh; False if a full rebuild is needed"""
+        held = {entry.id: entry for entry in self._entries}
+
+        if held:
+            live = {
+                row_id for (row_id,) in
+                db.session.query(self.model.id).filter(*self.criteria, self.model.id.in_(list(held)))
+            }
+            if len(live) < len(held):
+                # Unpublished or deleted: an older row may now belong in the feed
+                return False
+
+        # >= so rows sharing the watermark's timestamp aren't missed
+        for entry in self._latest(self._query().filter(self.updated >= self._watermark)):
+            held[entry.id] = entry
+
+        entries = sorted(held.values(), key=lambda e: (e.published, e.id), reverse=True)
+        self._entries = entries[:FEED_SIZE]
+        return True
+
+    def refresh(self):
+        """Bring the held entries up to date; returns the number held"""
+        with self._lock:
+            if self._entries is None or self._watermark is None or not self._apply_changes():
+                self._rebuild()
+            self._watermark = max((e.updated for e in self._entries), default=datetime.min)
+            return len(self._entries)
+
+    def document(self):
+        """The complete Atom document, refreshed first"""
+        self.refresh()
+        with self._lock:
+            entries = list(self._entries)
+            updated = self._watermark if entries else None
+
+        return (
+            '<?xml version="1.0" encoding="utf-8"?>\n'
+            '<feed xmlns="http://www.w3.org/2005/Atom">\n'
+            f"  <id>{escape(self.url)}</id>\n"
+            f"  <title>{escape(self.title)}</title>\n"
+            f"  <link rel=\"self\" href={quoteattr(self.url)}/>\n"
+            f"  <link rel=\"alternate\" href={quoteattr(SITE_URL + self.path)}/>\n"
+            f"  <updated>{_atom_date(updated)}</updated>\n"
+            + "".join(entry.xml for entry in entries)
+            + "</feed>\n"
+        )
+
+
+# =============================
+# Feeds
+# =============================
+
+def _content_feed(content_type, title):
+    return Feed(
+        name=content_type,
+        title=title,
+        path=f"/{content_type}",
+        model=Content,
+        criteria=[Content.content_type == content_type, Content.status == "published"],
+        published=Content.created_at,
+        updated=func.coalesce(Content.updated_at, Content.created_at),
+        columns=["id", "title", "slug", "summary", "excerpt"],
+        render=lambda row: {
+            "title": row.title,
+            "link": f"{SITE_URL}/{content_type}/{row.slug}",
+            "summary": row.summary or row.excerpt,
+        },
+        tag=content_index_tag(content_type),
+        validators=lambda: content_index_validators(content_type, "feed"),
+    )
+
+
+FEEDS = {
+    "blog": _content_feed("blog", "SmartSort AI Solutions Blog"),
+    "news": _content_feed("news", "SmartSort AI Solutions News"),
+    "jobs": Feed(
+        name="jobs",
+        title="SmartSort AI Jobs",
+        path="/jobs/",
+        model=Job,
+        criteria=[Job.status == "published", Job.slug.isnot(None)],
+        published=func.coalesce(Job.published_at, Job.created_at),
+        updated=Job.updated_at,
+        columns=["id", "title", "company", "location", "slug", "description"],
+        render=lambda row: {
+            "title": f"{row.title} at {row.company}",
+            "link": f"{SITE_URL}/jobs/{row.slug}",
+            "summary": " - ".join(filter(None, [row.location, row.description])),
+        },
+        tag=JOBS_INDEX_TAG,
+        validators=lambda: job_index_validators("feed"),
+    ),
+}
+
+
+def get_feed(name):
+    """Factory function to get a feed by name"""
+    feed = FEEDS.get(name)
+    if feed is None:
+        raise ValueError(f"Unknown feed: {name}")
+    return feed
+
+
+def feed_response(name):
+    """Serve a feed from the page cache, refreshing it after listing changes"""
+    feed = get_feed(name)
+    return page_cache.cached(
+        ("feed", name), [feed.tag],
+        lambda: Response(feed.document(), mimetype="application/atom+xml"),
+        validate=feed.validators,
+    )
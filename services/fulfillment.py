@@ -1,5 +1,73 @@
+import logging
+
+from sqlalchemy import update
+from sqlalchemy.orm.attributes import set_committed_value
+
 from extensions import db
-from models import UserAccess
+from models import Order, UserAccess
+from models.revenue import apply_status_transition
+from services.paystack_client import CURRENCY, to_subunit
+
+logger = logging.getLogger(__name__)
+
+
+def payment_matches(transaction, amount):
+    """
+    True if a Paystack transaction paid `amount` (the order's, in major
+    units) in our currency. A successful charge for anything else, e.g. a
+    checkout whose amount was tampered with, must not fulfil the order.
+    """
+    return (
+        transaction.get("amount") == to_subunit(amount)
+        and (transaction.get("currency") or "").upper() == CURRENCY.upper()
+    )
+
+
+def transition_order(order, new_status, from_statuses=None):
+    """
+    Move `order` to new_status if it is in one of from_statuses (default:
+    any other status). The UPDATE is conditional on the status read, so
+    when /verify-payment and the webhook worker settle the same order at
+    once only one of them applies it. Returns True if this call did; the
+    caller commits.
+    """
+    old_status = order.status
+    if old_status == new_status or (from_statuses is not None and old_status not in from_statuses):
+        return False
+
+    row = db.session.execute(
+        update(Order)
+        .where(Order.id == order.id, Order.status == old_status)
+        .values(status=new_status)
+        .returning(Order.id, Order.product_id, Order.amount, Order.product_type, Order.created_at)
+        .execution_options(synchronize_session=False)
+    ).first()
+
+    if row is None:
+        db.session.refresh(order)
+        return False
+
+    # A core UPDATE: the rollup listeners don't see it
+    apply_status_transition(db.session.connection(), [row], old_status, new_status)
+    set_committed_value(order, "status", new_status)
+    return True
+
+
+def accept_payment(order, transaction):
+    """
+    True if a successful Paystack `transaction` may fulfil `order`.
+    Otherwise it is logged and the order, if still pending, marked
+    failed; the caller commits.
+    """
+    if payment_matches(transaction, order.amount):
+        return True
+
+    logger.error(
+        f"Order {order.payment_reference} expects {to_subunit(order.amount)} {CURRENCY}, "
+        f"Paystack reports {transaction.get('amount')} {transaction.get('currency')}"
+    )
+    transition_order(order, "failed", from_statuses=("pending",))
+    return False
 
 
 def fulfill_order(order):
@@ -22,4 +90,4 @@ def fulfill_order(order):
     db.session.add(access)
     db.session.commit()
 
-    print(f"✅ Access granted: {order.customer_email}")
\ No newline at end of file
+    logger.info(f"Access granted: {order.customer_email} (order {order.id})")
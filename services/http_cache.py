@@ -0,0 +1,143 @@
+"""
+HTTP caching for public pages
+ETag / Last-Modified validators, 304 handling, Cache-Control and
+Surrogate-Key headers, plus purging of caching proxies on admin edits.
+"""
+
+import hashlib
+import logging
+import os
+import threading
+from datetime import timezone
+
+import requests
+from flask import Response, request
+
+logger = logging.getLogger(__name__)
+
+# Browsers revalidate quickly; shared caches keep pages until purged
+BROWSER_MAX_AGE = int(os.getenv("HTTP_CACHE_MAX_AGE", 60))
+SHARED_MAX_AGE = int(os.getenv("HTTP_CACHE_S_MAXAGE", 86400))
+
+# Space-separated base URLs of caching proxies to PURGE (e.g. Varnish with xkey)
+PURGE_URLS = os.getenv("CACHE_PURGE_URLS", "").split()
+PURGE_TIMEOUT_SECONDS = 2
+
+
+class Validators:
+    """ETag and Last-Modified for one representation of a page"""
+
+    __slots__ = ("etag", "last_modified")
+
+    def __init__(self, etag, last_modified=None):
+        self.etag = etag
+        self.last_modified = last_modified
+
+
+def make_validators(*parts, last_modified=None):
+    """
+    Build weak validators from the values a page depends on, e.g.
+    make_validators("blog", post.id, post.updated_at, last_modified=post.updated_at)
+    """
+    digest = hashlib.sha1("|".join(str(p) for p in parts).encode()).hexdigest()[:20]
+
+    if last_modified is not None:
+        # HTTP dates have second precision; drop microseconds so
+        # If-Modified-Since round-trips compare equal
+        last_modified = last_modified.replace(microsecond=0)
+        if last_modified.tzinfo is None:
+            last_modified = last_modified.replace(tzinfo=timezone.utc)
+
+    return Validators(digest, last_modified)
+
+
+def is_not_modified(validators):
+    """True when the request's If-None-Match / If-Modified-Since still match"""
+    if validators is None:
+        return False
+
+    # If-None-Match takes precedence over If-Modified-Since (RFC 9110 13.2.2)
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(validators.etag)
+
+    since = request.if_modified_since
+    if since is not None and validators.last_modified is not None:
+        return validators.last_modified <= since
+
+    return False
+
+
+def apply_cache_headers(response, validators=None, surrogate_keys=(), public=True):
+    """Attach validators, Cache-Control and Surrogate-Key to `response`"""
+    if validators is not None:
+        response.set_etag(validators.etag, weak=True)
+        if validators.last_modified is not None:
+            response.last_modified = validators.last_modified
+
+    if public:
+        response.headers["Cache-Control"] = (
+            f"public, max-age={BROWSER_MAX_AGE}, s-maxage={SHARED_MAX_AGE}"
+        )
+        if surrogate_keys:
+            response.headers["Surrogate-Key"] = " ".join(surrogate_keys)
+    else:
+        # Session-dependent layout: never let a shared cache store it
+        response.headers["Cache-Control"] = "private, no-cache"
+
+    return response
+
+
+def not_modified_response(validators, surrogate_keys=(), public=True):
+    """A body-less 304 carrying the same caching headers as a full response"""
+    return apply_cache_headers(Response(status=304), validators, surrogate_keys, public)
+
+
+def conditional(validators, surrogate_keys, render, public=True):
+    """
+    Answer with 304 before rendering when the client's copy is current,
+    otherwise render and attach caching headers.
+    """
+    if is_not_modified(validators):
+        return not_modified_response(validators, surrogate_keys, public)
+
+    rendered = render()
+    response = rendered if isinstance(rendered, Response) else Response(rendered, mimetype="text/html")
+    return apply_cache_headers(response, validators, surrogate_keys, public)
+
+
+# =============================
+# Proxy purging
+# =============================
+
+def _send_purge(keys):
+    for base_url in PURGE_URLS:
+        try:
+            response = requests.request(
+                "PURGE",
+                base_url,
+                headers={"Surrogate-Key": " ".join(keys), "xkey-purge": " ".join(keys)},
+                timeout=PURGE_TIMEOUT_SECONDS,
+            )
+            if response.status_code >= 400:
+                logger.warning(f"Purge of {keys} at {base_url} returned {response.status_code}")
+        except requests.RequestException as e:
+            logger.error(f"Purge of {keys} at {base_url} failed: {e}")
+
+
+def purge_surrogate_keys(keys, wait=False):
+    """
+    Ask every configured caching proxy to drop responses tagged with `keys`.
+
+    Runs in a background thread so admin saves don't wait on the proxy;
+    pass wait=True to block (CLI, tests).
+    """
+    keys = sorted({key for key in keys if key})
+    if not keys or not PURGE_URLS:
+        return
+
+    if wait:
+        _send_purge(keys)
+        return
+
+    threading.Thread(target=_send_purge, args=(keys,), daemon=True).start()
+
@@ -0,0 +1,229 @@
+"""
+Near-duplicate jobs
+The same job is often posted on several boards. Each job's title, company
+and description are shingled into word 3-grams and reduced to a MinHash
+signature; the signature is split into LSH bands and each band is stored
+as a hashed bucket in job_lsh_buckets. Jobs sharing any bucket are
+candidates, and only candidates are compared, so checking a new job costs
+one indexed lookup however many jobs exist.
+
+Ingested jobs whose estimated Jaccard similarity with an older job reaches
+DUPLICATE_SIMILARITY get status "duplicate" and point at the older job
+through duplicate_of_id, which hides them everywhere "published" is
+required. Manually created jobs are indexed but never suppressed.
+"""
+
+import hashlib
+import logging
+import re
+import zlib
+from collections import defaultdict
+
+import numpy as np
+from sqlalchemy import delete, insert, select, update
+
+from extensions import db
+from models.job import Job
+from models.job_dedup import JobSignature, JobLshBucket
+
+logger = logging.getLogger(__name__)
+
+BANDS = 20
+ROWS_PER_BAND = 6
+NUM_PERM = BANDS * ROWS_PER_BAND
+# With 20 bands of 6 rows, pairs at 0.8 similarity share a bucket >99% of
+# the time and pairs at 0.3 under 2%; candidates are then checked exactly
+DUPLICATE_SIMILARITY = 0.8
+SHINGLE_SIZE = 3
+DUPLICATE = "duplicate"
+# Older jobs in these states no longer hide a repost
+INACTIVE_STATUSES = ("archived",)
+REBUILD_BATCH_SIZE = 500
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64(0xFFFFFFFF)
+# Fixed seed: signatures must stay comparable across processes and deploys
+_rng = np.random.default_rng(20261017)
+_PERM_A = _rng.integers(1, 1 << 32, size=NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.integers(0, 1 << 32, size=NUM_PERM, dtype=np.uint64)
+
+_TAG_RE = re.compile(r"<[^>]+>")
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+# =============================
+# Signatures
+# =============================
+
+def shingles(title, company, description):
+    """Hashed word 3-grams of the job text, as a uint64 array"""
+    text = " ".join(_TAG_RE.sub(" ", value or "") for value in (title, company, description))
+    tokens = _TOKEN_RE.findall(text.lower())
+    if len(tokens) < SHINGLE_SIZE:
+        grams = tokens
+    else:
+        grams = [" ".join(tokens[i:i + SHINGLE_SIZE]) for i in range(len(tokens) - SHINGLE_SIZE + 1)]
+    return np.unique(np.fromiter((zlib.crc32(gram.encode()) for gram in grams), dtype=np.uint64, count=len(grams)))
+
+
+def minhash(hashes):
+    """NUM_PERM minimums of (a*x + b) mod p over the shingle hashes"""
+    if not len(hashes):
+        return np.full(NUM_PERM, _MAX_HASH, dtype=np.uint32)
+    # x < 2**32 and a < 2**32, so a*x + b never overflows uint64
+    values = (np.outer(hashes, _PERM_A) + _PERM_B) % _MERSENNE_PRIME & _MAX_HASH
+    return values.min(axis=0).astype(np.uint32)
+
+
+def band_buckets(signature):
+    """One signed 64-bit bucket per band; the band number is hashed in so bands never collide"""
+    buckets = []
+    for band in range(BANDS):
+        rows = signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND]
+        digest = hashlib.blake2b(band.to_bytes(2, "little") + rows.tobytes(), digest_size=8).digest()
+        buckets.append(int.from_bytes(digest, "little", signed=True))
+    return buckets
+
+
+def similarity(a, b):
+    """Estimated Jaccard similarity of two signatures"""
+    return float(np.count_nonzero(a == b)) / NUM_PERM
+
+
+def _encode(signature):
+    return signature.astype("<u4").tobytes()
+
+
+def _decode(data):
+    return np.frombuffer(data, dtype="<u4")
+
+
+# =============================
+# Index
+# =============================
+
+def _load_candidates(buckets):
+    """{bucket: {job_id}} for jobs already stored under any of `buckets`"""
+    by_bucket = defaultdict(set)
+    if buckets:
+        rows = db.session.execute(
+            select(JobLshBucket.bucket, JobLshBucket.job_id).where(JobLshBucket.bucket.in_(list(buckets)))
+        )
+        for bucket, job_id in rows:
+            by_bucket[bucket].add(job_id)
+    return by_bucket
+
+
+def index_jobs(job_ids, suppress=True):
+    """
+    (Re)compute signatures and buckets for `job_ids` and, when `suppress`
+    is set, mark ingested ones that duplicate an older job.
+
+    Jobs are processed oldest first, so copies within one batch resolve to
+    the earliest. Returns {job_id: canonical_id} for the jobs marked; the
+    caller commits and invalidates pages.
+    """
+    if not job_ids:
+        return {}
+
+    jobs = db.session.execute(
+        select(Job.id, Job.title, Job.company, Job.description, Job.external_id, Job.status, Job.duplicate_of_id)
+        .where(Job.id.in_(list(job_ids)))
+        .order_by(Job.id)
+    ).all()
+    ids = [job.id for job in jobs]
+    signatures = {job.id: minhash(shingles(job.title, job.company, job.description)) for job in jobs}
+    buckets = {job_id: band_buckets(signature) for job_id, signature in signatures.items()}
+
+    db.session.execute(delete(JobLshBucket).where(JobLshBucket.job_id.in_(ids)))
+    db.session.execute(delete(JobSignature).where(JobSignature.job_id.in_(ids)))
+
+    by_bucket = _load_candidates({bucket for job_buckets in buckets.values() for bucket in job_buckets})
+    stored = {candidate for members in by_bucket.values() for candidate in members}
+
+    # Signatures and canonical pointers of the stored candidates, in one query
+    known = {}
+    if stored:
+        rows = db.session.execute(
+            select(JobSignature.job_id, JobSignature.signature, Job.duplicate_of_id)
+            .join(Job, Job.id == JobSignature.job_id)
+            .where(JobSignature.job_id.in_(list(stored)), Job.status.notin_(INACTIVE_STATUSES))
+        )
+        known = {job_id: (_decode(signature), parent) for job_id, signature, parent in rows}
+
+    marked = {}
+    for job in jobs:
+        signature = signatures[job.id]
+        if suppress and job.external_id is not None:
+            candidates = {
+                candidate for bucket in buckets[job.id] for candidate in by_bucket[bucket]
+                if candidate < job.id and candidate in known
+            }
+            scored = [(similarity(signature, known[candidate][0]), candidate) for candidate in candidates]
+            score, best = max(scored, default=(0.0, None))
+            if best is not None and score >= DUPLICATE_SIMILARITY:
+                marked[job.id] = known[best][1] or best
+
+        # Later jobs in this batch can match this one
+        known[job.id] = (signature, marked.get(job.id, job.duplicate_of_id))
+        for bucket in buckets[job.id]:
+            by_bucket[bucket].add(job.id)
+
+    db.session.execute(insert(JobSignature), [
+        {"job_id": job_id, "signature": _encode(signature)} for job_id, signature in signatures.items()
+    ])
+    db.session.execute(insert(JobLshBucket), [
+        {"bucket": bucket, "job_id": job_id} for job_id, job_buckets in buckets.items() for bucket in job_buckets
+    ])
+
+    groups = defaultdict(list)
+    for job_id, canonical in marked.items():
+        groups[canonical].append(job_id)
+    for canonical, duplicates in groups.items():
+        db.session.execute(
+            update(Job).where(Job.id.in_(duplicates)).values(status=DUPLICATE, duplicate_of_id=canonical)
+        )
+        # Copies of a job that is now itself a copy point at the original
+        db.session.execute(
+            update(Job).where(Job.duplicate_of_id.in_(duplicates)).values(duplicate_of_id=canonical)
+        )
+
+    if marked:
+        logger.info(f"Suppressed {len(marked)} duplicate jobs")
+    return marked
+
+
+def remove_job(job):
+    """
+    Drop `job` from the index before it is deleted. If it was the original
+    of suppressed copies, the oldest copy takes its place; returns that job
+    or None. The caller commits.
+    """
+    db.session.execute(delete(JobLshBucket).where(JobLshBucket.job_id == job.id))
+    db.session.execute(delete(JobSignature).where(JobSignature.job_id == job.id))
+
+    duplicates = Job.query.filter_by(duplicate_of_id=job.id).order_by(Job.id).all()
+    if not duplicates:
+        return None
+
+    promoted = duplicates[0]
+    promoted.status = "published" if job.status == "published" else "draft"
+    promoted.duplicate_of_id = None
+    for duplicate in duplicates[1:]:
+        duplicate.duplicate_of_id = promoted.id
+    return promoted
+
+
+def rebuild_dedup_index():
+    """Re-index every job, oldest first; returns (jobs indexed, duplicates marked)"""
+    db.session.execute(delete(JobLshBucket))
+    db.session.execute(delete(JobSignature))
+
+    job_ids = db.session.execute(select(Job.id).order_by(Job.id)).scalars().all()
+    marked = 0
+    for start in range(0, len(job_ids), REBUILD_BATCH_SIZE):
+        marked += len(index_jobs(job_ids[start:start + REBUILD_BATCH_SIZE]))
+        db.session.commit()
+
+    logger.info(f"Rebuilt job dedup index: {len(job_ids)} jobs, {marked} duplicates")
+    return len(job_ids), marked
@@ -0,0 +1,99 @@
+"""
+Job expiry
+Published jobs get an `expires_at` when they go live: published_at plus
+their source's ttl_days (JobSource), or DEFAULT_TTL_DAYS for manual jobs
+and sources without one. `flask expire-jobs` archives the expired ones.
+
+The sweeper works in batches of SWEEP_BATCH_SIZE, each claimed with FOR
+UPDATE SKIP LOCKED and committed on its own, so no lock is held for more
+than one short UPDATE and admin edits or ingestion never wait on a sweep.
+Archived rows drop out of the partial indexes on status = 'published'
+that the listings read.
+"""
+
+import logging
+import os
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import update
+
+from extensions import db
+from models.job import Job, JobSource
+from services.page_cache import page_cache, JOBS_INDEX_TAG, job_page_tag
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL_DAYS = int(os.getenv("JOB_TTL_DAYS", 60))
+PUBLISHED = "published"
+ARCHIVED = "archived"
+SWEEP_BATCH_SIZE = 500
+# Breathing room between batches for other writers on the table
+SWEEP_PAUSE_SECONDS = 0.05
+
+
+def ttl_days(source_name):
+    """Lifetime in days of jobs from `source_name`"""
+    ttl = None
+    if source_name:
+        ttl = db.session.query(JobSource.ttl_days).filter_by(name=source_name).scalar()
+    return ttl or DEFAULT_TTL_DAYS
+
+
+def expiry_for(published_at, ttl):
+    return (published_at or datetime.utcnow()) + timedelta(days=ttl)
+
+
+def set_expiry(job):
+    """Give a job going live an expiry, unless it already has one in the future; caller commits"""
+    now = datetime.utcnow()
+    if job.expires_at is None or job.expires_at <= now:
+        job.expires_at = expiry_for(job.published_at or now, ttl_days(job.source))
+    return job
+
+
+def _archive_batch(now, batch_size):
+    # SKIP LOCKED lets a sweep pass rows an admin is editing (ignored on SQLite)
+    due = (
+        db.session.query(Job.id, Job.slug)
+        .filter(Job.status == PUBLISHED, Job.expires_at <= now)
+        .order_by(Job.expires_at)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+    if not due:
+        db.session.rollback()
+        return []
+
+    db.session.execute(
+        update(Job)
+        .where(Job.id.in_([job_id for job_id, _ in due]))
+        .values(status=ARCHIVED, updated_at=now)
+    )
+    db.session.commit()
+    return [slug for _, slug in due]
+
+
+def sweep_expired(now=None, batch_size=SWEEP_BATCH_SIZE, pause=SWEEP_PAUSE_SECONDS):
+    """Archive every published job past its expiry, one batch at a time; returns the number archived"""
+    now = now or datetime.utcnow()
+    total = 0
+
+    while True:
+        slugs = _archive_batch(now, batch_size)
+        if not slugs:
+            break
+        total += len(slugs)
+
+        # Pages drop as each batch lands, not after the whole sweep
+        page_cache.invalidate(JOBS_INDEX_TAG, *[job_page_tag(slug) for slug in slugs if slug])
+
+        if len(slugs) < batch_size:
+            break
+        if pause:
+            time.sleep(pause)
+
+    if total:
+        logger.info(f"Archived {total} expired jobs")
+    return total
@@ -0,0 +1,133 @@
+"""
+Job facets
+Counts per job_type, remote, location and source for the jobs page, from
+one grouped query over the current search result, cached in-process per
+normalised filter set.
+
+Counts are disjunctive: each facet is counted with every filter applied
+except its own, so a selected job type still shows how many jobs the
+other types would give. That is done with one conditional SUM per facet
+in the same query. Postgres groups by GROUPING SETS (one set per facet);
+other databases group by all four columns and the sets are folded here.
+"""
+
+import threading
+import time
+
+from sqlalchemy import and_, case, false, func, select, true
+
+from extensions import db
+from models.job import Job
+from services.page_cache import page_cache, JOBS_INDEX_TAG
+from services.search_service import job_matches
+
+FACETS = ("job_type", "remote", "location", "source")
+# location and source are open-ended; show the most common values only
+MAX_FACET_VALUES = 20
+
+# Dropped whenever the jobs index tag is invalidated (see the hook below);
+# the TTL bounds staleness in the other gunicorn workers, which never see
+# that invalidation.
+CACHE_TTL_SECONDS = 60
+CACHE_MAX_ENTRIES = 512
+
+_cache = {}
+_lock = threading.Lock()
+
+
+def normalize_filters(job_type=None, remote_only=False, location=None, source=None, search=""):
+    """Active filters as a hashable, order-independent key"""
+    filters = {
+        "job_type": (job_type or "").strip().lower() or None,
+        "remote": True if remote_only else None,
+        "location": (location or "").strip() or None,
+        "source": (source or "").strip() or None,
+        "search": " ".join((search or "").lower().split()) or None,
+    }
+    return tuple(sorted((name, value) for name, value in filters.items() if value is not None))
+
+
+def _compute_facets(key):
+    filters = dict(key)
+    search = filters.pop("search", None)
+    columns = {name: getattr(Job, name) for name in FACETS}
+
+    criteria = [Job.status == "published"]
+    if search:
+        matches = job_matches(search)
+        criteria.append(Job.id.in_(select(matches.c.id)) if matches is not None else false())
+
+    # One count per facet, each ignoring that facet's own filter
+    counts = [
+        func.sum(case(
+            (and_(true(), *[columns[other] == value for other, value in filters.items() if other != name]), 1),
+            else_=0,
+        )).label(f"n_{name}")
+        for name in FACETS
+    ]
+
+    statement = select(*columns.values(), *counts).where(*criteria)
+    grouping_sets = db.session.connection().dialect.name == "postgresql"
+    if grouping_sets:
+        statement = statement.add_columns(func.grouping(*columns.values()).label("grouping"))
+        statement = statement.group_by(func.grouping_sets(*columns.values()))
+    else:
+        statement = statement.group_by(*columns.values())
+
+    totals = {name: {} for name in FACETS}
+    for row in db.session.execute(statement):
+        for position, name in enumerate(FACETS):
+            # grouping() sets a bit, leftmost column highest, for each column not grouped
+            if grouping_sets and row.grouping & (1 << (len(FACETS) - 1 - position)):
+                continue
+            value = getattr(row, name)
+            if name == "remote":
+                value = bool(value)
+            elif value is None:
+                continue
+            count = getattr(row, f"n_{name}") or 0
+            totals[name][value] = totals[name].get(value, 0) + count
+
+    facets = {}
+    for name in FACETS:
+        values = sorted(totals[name].items(), key=lambda item: (-item[1], str(item[0])))
+        # Zero counts are combinations the other filters exclude; keep the selected one
+        values = [(value, count) for value, count in values if count or value == filters.get(name)]
+        facets[name] = values[:MAX_FACET_VALUES]
+    return facets
+
+
+def get_job_facets(job_type=None, remote_only=False, location=None, source=None, search=""):
+    """
+    Return {"job_type" | "remote" | "location" | "source": [(value, count), ...]}
+    for published jobs matching the search, most common first.
+    """
+    key = normalize_filters(job_type, remote_only, location, source, search)
+    now = time.monotonic()
+
+    with _lock:
+        entry = _cache.get(key)
+        if entry and entry[1] > now:
+            return entry[0]
+
+    facets = _compute_facets(key)
+
+    with _lock:
+        if len(_cache) >= CACHE_MAX_ENTRIES:
+            _cache.clear()
+        _cache[key] = (facets, now + CACHE_TTL_SECONDS)
+
+    return facets
+
+
+def invalidate_job_facets():
+    """Drop cached facets"""
+    with _lock:
+        _cache.clear()
+
+
+@page_cache.on_invalidate
+def _drop_cached_facets(tags):
+    # Every job write invalidates the listing tag, like the pagination counts
+    if JOBS_INDEX_TAG in tags:
+        invalidate_job_facets()
@@ -0,0 +1,522 @@
+"""
+Job ingestion
+Pulls JobSource feeds (JSON, JSON Lines, RSS/Atom, CSV) concurrently and
+upserts them into `jobs` keyed on (source, external_id).
+
+Fetchers run in a bounded thread pool. Each streams its response through a
+parser and normaliser and hands batches of rows to the calling thread
+through a bounded queue, so memory stays flat however large a feed is and
+every write happens on one connection. Feeds are requested with the ETag /
+Last-Modified saved by the previous run, so an unchanged feed costs one
+304 round trip.
+"""
+
+import csv
+import html
+import json
+import logging
+import os
+import queue
+import re
+import threading
+import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
+
+from extensions import db
+from models.job import Job, JobSource
+from services.job_dedup_service import index_jobs
+from services.job_expiry_service import DEFAULT_TTL_DAYS, expiry_for
+from services.page_cache import page_cache, JOBS_INDEX_TAG, job_page_tag
+from services.search_service import JOB_INDEX, index_rows
+from utils.db import dialect_insert, supports_on_conflict
+from utils.slug import slug_candidates, generate_slug, stable_slug
+
+logger = logging.getLogger(__name__)
+
+INGEST_WORKERS = int(os.getenv("JOB_INGEST_WORKERS", 4))
+BATCH_SIZE = 200
+QUEUE_BATCHES = 16  # batches buffered between fetchers and the writer
+FETCH_TIMEOUT = (5, 30)  # connect, read
+CHUNK_SIZE = 64 * 1024
+USER_AGENT = "SmartSortJobIngest/1.0"
+
+FORMATS = ("json", "jsonl", "rss", "csv")
+JOB_TYPES = ("fulltime", "parttime", "internship", "freelance", "remote")
+
+# Columns an upsert may change on an existing job. slug, status and
+# created_at are left alone so URLs and admin decisions survive re-imports.
+UPSERT_FIELDS = ("title", "company", "location", "job_type", "remote", "description", "application_link")
+
+FIELD_ALIASES = {
+    "external_id": ("external_id", "id", "guid", "job_id", "uuid"),
+    "title": ("title", "position", "job_title", "name"),
+    "company": ("company", "company_name", "organization", "employer", "author"),
+    "location": ("location", "city", "candidate_required_location"),
+    "job_type": ("job_type", "type", "employment_type"),
+    "remote": ("remote", "is_remote"),
+    "description": ("description", "summary", "content", "body"),
+    "application_link": ("application_link", "apply_url", "url", "link"),
+    "published": ("published_at", "published", "pubDate", "date", "updated", "created_at"),
+}
+
+_TAG_RE = re.compile(r"<[^>]+>")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+class FeedError(Exception):
+    """A feed could not be fetched or parsed"""
+    pass
+
+
+class _Cancelled(Exception):
+    pass
+
+
+class SourceSnapshot:
+    """The JobSource fields a fetcher thread needs, detached from the session"""
+
+    def __init__(self, source):
+        self.id = source.id
+        self.name = source.name
+        self.url = source.url
+        self.format = source.format
+        self.items_key = source.items_key
+        self.auto_publish = source.auto_publish
+        self.ttl_days = source.ttl_days or DEFAULT_TTL_DAYS
+        self.etag = source.etag
+        self.last_modified = source.last_modified
+
+
+class IngestReport:
+    """Outcome of one source in one run"""
+
+    def __init__(self, source):
+        self.source = source
+        self.status = "pending"
+        self.fetched = 0
+        self.skipped = 0
+        self.upserted = 0
+        self.duplicates = 0
+        self.error = None
+        self.seconds = 0.0
+
+    def as_dict(self):
+        return {
+            "source": self.source,
+            "status": self.status,
+            "fetched": self.fetched,
+            "skipped": self.skipped,
+            "upserted": self.upserted,
+            "duplicates": self.duplicates,
+            "error": self.error,
+            "seconds": round(self.seconds, 3),
+        }
+
+
+# =============================
+# Parsing (streaming)
+# =============================
+
+def _iter_json(response, items_key=None):
+    """Decode the objects of a JSON array one at a time as chunks arrive"""
+    decoder = json.JSONDecoder()
+    chunks = response.iter_content(chunk_size=CHUNK_SIZE, decode_unicode=True)
+    buffer = ""
+
+    # Skip ahead to the job array: the top-level array, or the one under items_key
+    start = -1
+    while start < 0:
+        chunk = next(chunks, None)
+        if chunk is None:
+            raise FeedError("No job array found")
+        buffer += chunk
+        if items_key:
+            key_at = buffer.find(f'"{items_key}"')
+            start = buffer.find("[", key_at) if key_at >= 0 else -1
+        else:
+            start = buffer.find("[")
+    buffer = buffer[start + 1:]
+
+    while True:
+        buffer = buffer.lstrip(" \t\r\n,")
+        if buffer.startswith("]"):
+            return
+        try:
+            record, end = decoder.raw_decode(buffer)
+        except json.JSONDecodeError:
+            chunk = next(chunks, None)
+            if chunk is None:
+                raise FeedError("Truncated JSON feed")
+            buffer += chunk
+            continue
+        yield record
+        buffer = buffer[end:]
+
+
+def _iter_json_lines(response, items_key=None):
+    for line in response.iter_lines(decode_unicode=True):
+        if line.strip():
+            yield json.loads(line)
+
+
+def _iter_rss(response, items_key=None):
+    """RSS <item>s or Atom <entry>s, cleared from memory once read"""
+    response.raw.decode_content = True
+    for _, element in ET.iterparse(response.raw, events=("end",)):
+        if element.tag.rsplit("}", 1)[-1] not in ("item", "entry"):
+            continue
+
+        record = {}
+        for child in element:
+            name = child.tag.rsplit("}", 1)[-1]
+            if name == "link" and child.get("href"):
+                record.setdefault("link", child.get("href"))
+            elif child.text and child.text.strip():
+                record.setdefault(name, child.text.strip())
+        yield record
+        element.clear()
+
+
+def _iter_csv(response, items_key=None):
+    yield from csv.DictReader(response.iter_lines(decode_unicode=True))
+
+
+PARSERS = {
+    "json": _iter_json,
+    "jsonl": _iter_json_lines,
+    "rss": _iter_rss,
+    "csv": _iter_csv,
+}
+
+
+# =============================
+# Normalisation
+# =============================
+
+def _first(record, field):
+    for name in FIELD_ALIASES[field]:
+        value = record.get(name)
+        if isinstance(value, dict):
+            value = value.get("name") or value.get("title")
+        if value not in (None, ""):
+            return value
+    return None
+
+
+def _text(value, max_length=None):
+    if value is None:
+        return None
+    text = _WHITESPACE_RE.sub(" ", html.unescape(_TAG_RE.sub(" ", str(value)))).strip()
+    return text[:max_length] if max_length else text
+
+
+def _job_type(value):
+    normalized = re.sub(r"[^a-z]", "", str(value or "").lower())
+    if normalized in JOB_TYPES:
+        return normalized
+    if "part" in normalized:
+        return "parttime"
+    if "intern" in normalized:
+        return "internship"
+    if normalized in ("contract", "contractor", "freelancer", "temporary"):
+        return "freelance"
+    return "fulltime"
+
+
+def _is_remote(value, location, job_type):
+    if isinstance(value, bool):
+        return value
+    if str(value or "").strip().lower() in ("1", "true", "yes", "remote"):
+        return True
+    return job_type == "remote" or "remote" in (location or "").lower()
+
+
+def _timestamp(value):
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        try:
+            parsed = parsedate_to_datetime(str(value))
+        except (TypeError, ValueError):
+            return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def normalize(record, source):
+    """A `jobs` row for one feed record, or None if it can't be used"""
+    title = _text(_first(record, "title"), 255)
+    link = _text(_first(record, "application_link"), 500)
+    external_id = _text(_first(record, "external_id") or link, 255)
+    if not title or not external_id:
+        return None
+
+    company = _text(_first(record, "company"), 255)
+    if not company and " at " in title:
+        # Common in RSS job boards: "Senior Engineer at Acme"
+        title, company = title.rsplit(" at ", 1)
+    location = _text(_first(record, "location"), 255)
+    job_type = _job_type(_first(record, "job_type"))
+    now = datetime.utcnow()
+    published_at = _timestamp(_first(record, "published")) or now
+
+    return {
+        "source": source.name,
+        "external_id": external_id,
+        "title": title,
+        "company": company or source.name,
+        "location": location,
+        "job_type": job_type,
+        "remote": _is_remote(_first(record, "remote"), location, job_type),
+        "description": _text(_first(record, "description")),
+        "application_link": link,
+        "slug": stable_slug(title, f"{source.name}:{external_id}"),
+        "status": "published" if source.auto_publish else "draft",
+        "published_at": published_at,
+        # From the feed's own date: a job the board posted months ago is already stale
+        "expires_at": expiry_for(published_at, source.ttl_days),
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+# =============================
+# Fetching
+# =============================
+
+def _http_session(workers):
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers["User-Agent"] = USER_AGENT
+    return session
+
+
+def _fetch(http, source, emit):
+    """
+    Stream one source into emit(kind, payload) calls: ("rows", (rows, fetched,
+    skipped)) per batch, then ("done", validators) or ("not_modified", None).
+    """
+    if source.format not in PARSERS:
+        raise FeedError(f"Unsupported format: {source.format}")
+
+    headers = {}
+    if source.etag:
+        headers["If-None-Match"] = source.etag
+    if source.last_modified:
+        headers["If-Modified-Since"] = source.last_modified
+
+    with http.get(source.url, headers=headers, timeout=FETCH_TIMEOUT, stream=True) as response:
+        if response.status_code == 304:
+            emit("not_modified", None)
+            return
+        if response.status_code != 200:
+            raise FeedError(f"HTTP {response.status_code}")
+
+        # Feeds without a charset are UTF-8 in practice; None would yield bytes
+        response.encoding = response.encoding or "utf-8"
+
+        rows, fetched, skipped = {}, 0, 0
+        for record in PARSERS[source.format](response, source.items_key):
+            fetched += 1
+            row = normalize(record, source) if isinstance(record, dict) else None
+            if row is None:
+                skipped += 1
+                continue
+            # Last occurrence wins; ON CONFLICT can't touch a row twice in one statement
+            rows[row["external_id"]] = row
+            if len(rows) >= BATCH_SIZE:
+                emit("rows", (list(rows.values()), fetched, skipped))
+                rows, fetched, skipped = {}, 0, 0
+
+        if rows or fetched:
+            emit("rows", (list(rows.values()), fetched, skipped))
+
+        emit("done", (response.headers.get("ETag"), response.headers.get("Last-Modified")))
+
+
+# =============================
+# Writing
+# =============================
+
+def _upsert_statement(connection, rows):
+    table = Job.__table__
+    statement = dialect_insert(connection, table).values(rows)
+    excluded = statement.excluded
+    return statement.on_conflict_do_update(
+        index_elements=["source", "external_id"],
+        set_={
+            **{field: excluded[field] for field in UPSERT_FIELDS},
+            "expires_at": excluded.expires_at,
+            "updated_at": excluded.updated_at,
+        },
+        # Unchanged jobs keep their updated_at, so caches and ETags stay valid
+        where=or_(*[table.c[field].is_distinct_from(excluded[field]) for field in UPSERT_FIELDS]),
+    ).returning(table.c.id, table.c.slug, table.c.title, table.c.company, table.c.description)
+
+
+def _upsert_row_by_row(connection, rows):
+    # Only reached on a slug collision; walk each row's further slug candidates
+    written = []
+    for row in rows:
+        base = generate_slug(row["title"]) or "job"
+        candidates = slug_candidates(base, f"{row['source']}:{row['external_id']}", attempts=12)
+        next(candidates)
+        for slug in candidates:
+            try:
+                with db.session.begin_nested():
+                    written.extend(connection.execute(_upsert_statement(connection, [{**row, "slug": slug}])).all())
+                break
+            except IntegrityError as e:
+                if "slug" not in str(e.orig).lower():
+                    raise
+    return written
+
+
+def upsert_jobs(rows):
+    """
+    INSERT ... ON CONFLICT (source, external_id) DO UPDATE for one batch,
+    keeping the job search index in step. Returns [(id, slug)] of inserted
+    or changed jobs; the caller commits.
+    """
+    if not rows:
+        return []
+
+    connection = db.session.connection()
+    if not supports_on_conflict(connection):
+        raise ValueError(f"Job ingestion needs ON CONFLICT support, not available on {connection.dialect.name}")
+
+    try:
+        with db.session.begin_nested():
+            written = connection.execute(_upsert_statement(connection, rows)).all()
+    except IntegrityError as e:
+        if "slug" not in str(e.orig).lower():
+            raise
+        written = _upsert_row_by_row(connection, rows)
+
+    # Core upserts bypass the ORM listeners that normally maintain the index
+    index_rows(JOB_INDEX, [
+        (row.id, {"title": row.title, "company": row.company, "description": row.description})
+        for row in written
+    ])
+    return [(row.id, row.slug) for row in written]
+
+
+def _record_outcome(report, status, validators=None, error=None):
+    source = db.session.get(JobSource, report.source_id)
+    source.last_fetched_at = datetime.utcnow()
+    source.last_status = status
+    source.last_error = error
+    if validators is not None:
+        source.etag, source.last_modified = validators
+    db.session.commit()
+
+
+# =============================
+# Runner
+# =============================
+
+def ingest_sources(sources=None, workers=INGEST_WORKERS):
+    """
+    Fetch `sources` (default: every enabled JobSource) concurrently and
+    upsert their jobs. Returns one IngestReport.as_dict() per source.
+    """
+    if sources is None:
+        sources = JobSource.query.filter_by(enabled=True).order_by(JobSource.id).all()
+    snapshots = [SourceSnapshot(source) for source in sources]
+    if not snapshots:
+        return []
+
+    reports = {}
+    for snapshot in snapshots:
+        reports[snapshot.name] = IngestReport(snapshot.name)
+        reports[snapshot.name].source_id = snapshot.id
+
+    inbox = queue.Queue(maxsize=QUEUE_BATCHES)
+    cancelled = threading.Event()
+    http = _http_session(workers)
+
+    def run(snapshot):
+        started = time.monotonic()
+
+        def emit(kind, payload):
+            # Block while the writer is behind, but give up if the run was aborted
+            while True:
+                if cancelled.is_set():
+                    raise _Cancelled()
+                try:
+                    inbox.put((snapshot.name, kind, payload), timeout=1)
+                    return
+                except queue.Full:
+                    continue
+
+        try:
+            _fetch(http, snapshot, emit)
+        except _Cancelled:
+            return
+        except Exception as e:
+            try:
+                emit("error", str(e) or e.__class__.__name__)
+            except _Cancelled:
+                return
+        finally:
+            reports[snapshot.name].seconds = time.monotonic() - started
+
+    changed_slugs = []
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="job-ingest") as pool:
+        for snapshot in snapshots:
+            pool.submit(run, snapshot)
+
+        remaining = len(snapshots)
+        try:
+            while remaining:
+                name, kind, payload = inbox.get()
+                report = reports[name]
+
+                if kind == "rows":
+                    rows, fetched, skipped = payload
+                    written = upsert_jobs(rows)
+                    # Same transaction: a copy is never visible as published
+                    duplicates = index_jobs([job_id for job_id, _ in written])
+                    db.session.commit()
+                    report.fetched += fetched
+                    report.skipped += skipped
+                    report.upserted += len(written)
+                    report.duplicates += len(duplicates)
+                    changed_slugs.extend(slug for _, slug in written)
+                    continue
+
+                remaining -= 1
+                if kind == "error":
+                    report.status, report.error = "error", payload
+                    _record_outcome(report, "error", error=payload)
+                    logger.error(f"Job source {name} failed: {payload}")
+                else:
+                    report.status = "ok" if kind == "done" else "not_modified"
+                    # Validators are saved only after the whole feed is in
+                    _record_outcome(report, report.status, validators=payload)
+        except BaseException:
+            cancelled.set()
+            db.session.rollback()
+            raise
+        finally:
+            http.close()
+
+    if changed_slugs:
+        page_cache.invalidate(JOBS_INDEX_TAG, *[job_page_tag(slug) for slug in changed_slugs])
+
+    results = [reports[snapshot.name].as_dict() for snapshot in snapshots]
+    logger.info(f"Job ingestion: {sum(r['upserted'] for r in results)} jobs upserted from {len(results)} sources")
+    return results
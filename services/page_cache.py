@@ -0,0 +1,557 @@
+"""
+Rendered-page cache
+Keeps fully rendered public pages in memory, bounded by a byte budget with
+LRU eviction, and drops them by tag when an admin saves content.
+
+Each gunicorn worker has its own cache. Invalidations are appended to a
+small journal file that every worker checks (one os.stat) before serving
+from cache, so an edit handled by one worker is seen by all of them.
+
+Pages rendered ahead of time (e.g. by the publishing runner) travel the
+same way: replace() writes them to a staging directory next to the
+journal and appends their file names after the tags they replace, so
+each worker drops the old pages and installs the new ones in one sync.
+"""
+
+import base64
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime
+
+from flask import Response, abort, request, session
+from sqlalchemy import func, select
+
+from extensions import db
+from models.content import Content
+from models.job import Job
+from models.related_content import RelatedContent
+from utils.pagination import decode_cursor, encode_cursor
+from services.http_cache import (
+    Validators, apply_cache_headers, is_not_modified, make_validators, not_modified_response,
+    purge_surrogate_keys,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024  # 32MB per worker
+JOURNAL_MAX_BYTES = 256 * 1024
+# Staged pages only need to outlive the gap until every worker syncs
+STAGED_MAX_AGE_SECONDS = 3600
+STAGED_PREFIX = "+"
+
+
+class CachedPage:
+    """A rendered body plus its HTTP validators and the tags that invalidate it"""
+
+    __slots__ = ("body", "mimetype", "tags", "validators", "size")
+
+    def __init__(self, body, mimetype, tags, validators=None):
+        self.body = body
+        self.mimetype = mimetype
+        self.tags = frozenset(tags)
+        self.validators = validators
+        self.size = len(body)
+
+
+class PageCache:
+    """Byte-bounded LRU of rendered pages with tag invalidation"""
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, journal_path=None):
+        self.max_bytes = max_bytes
+        self.journal_path = journal_path
+        self.enabled = True
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._journal_lock = threading.Lock()
+        self._journal_offset = 0
+        self._journal_mtime = None
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self._invalidation_hooks = []
+        self._staging = threading.local()
+
+    def init_app(self, app):
+        self.enabled = app.config.get("PAGE_CACHE_ENABLED", True)
+        self.max_bytes = app.config.get("PAGE_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES)
+        self.journal_path = app.config.get(
+            "PAGE_CACHE_JOURNAL",
+            os.path.join(app.instance_path, "page_cache.journal"),
+        )
+        os.makedirs(os.path.dirname(self.journal_path), exist_ok=True)
+
+        # Start reading from the current end: this process has nothing cached yet
+        if os.path.exists(self.journal_path):
+            stat = os.stat(self.journal_path)
+            self._journal_offset = stat.st_size
+            self._journal_mtime = stat.st_mtime
+
+        app.extensions["page_cache"] = self
+
+    # -----------------------------
+    # Cross-worker invalidation
+    # -----------------------------
+
+    def _sync(self):
+        """Apply invalidations other workers wrote since we last looked"""
+        if not self.journal_path:
+            return
+
+        with self._journal_lock:
+            self._read_journal()
+
+    def _read_journal(self):
+        try:
+            stat = os.stat(self.journal_path)
+        except FileNotFoundError:
+            return
+
+        if stat.st_mtime == self._journal_mtime and stat.st_size == self._journal_offset:
+            return
+
+        if stat.st_size < self._journal_offset:
+            # Journal was compacted; we may have missed lines, so start over
+            self.clear(local_only=True)
+            self._journal_offset = 0
+
+        with open(self.journal_path, "r", encoding="utf-8") as f:
+            f.seek(self._journal_offset)
+            lines = f.read().splitlines()
+            self._journal_offset = f.tell()
+        self._journal_mtime = stat.st_mtime
+
+        # In order: a page staged after a drop must survive it, and one
+        # staged before a later drop must not
+        tags = set()
+        for line in (line.strip() for line in lines):
+            if line.startswith(STAGED_PREFIX):
+                self._apply_drops(tags)
+                tags = set()
+                self._install_staged(line[len(STAGED_PREFIX):])
+            elif line:
+                tags.add(line)
+        self._apply_drops(tags)
+
+    def _apply_drops(self, tags):
+        if "*" in tags:
+            self.clear(local_only=True)
+        elif tags:
+            self._drop_tags(tags)
+
+    def _publish(self, tags):
+        if not self.journal_path:
+            return
+
+        try:
+            if os.path.exists(self.journal_path) and os.path.getsize(self.journal_path) > JOURNAL_MAX_BYTES:
+                # Compact: readers notice the shrink and clear their caches
+                open(self.journal_path, "w").close()
+
+            with open(self.journal_path, "a", encoding="utf-8") as f:
+                f.write("".join(f"{tag}\n" for tag in tags))
+        except OSError as e:
+            logger.error(f"Page cache journal write failed: {e}")
+
+    # -----------------------------
+    # Cache operations
+    # -----------------------------
+
+    def get(self, key):
+        self._sync()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def set(self, key, body, mimetype="text/html", tags=(), validators=None):
+        entry = CachedPage(body, mimetype, tags, validators)
+        if entry.size > self.max_bytes:
+            return
+
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old.size
+
+            self._entries[key] = entry
+            self._bytes += entry.size
+
+            while self._bytes > self.max_bytes and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.size
+
+    def _drop_tags(self, tags):
+        tags = set(tags)
+        with self._lock:
+            doomed = [key for key, entry in self._entries.items() if entry.tags & tags]
+            for key in doomed:
+                self._bytes -= self._entries.pop(key).size
+            self._generation += 1
+        return len(doomed)
+
+    def invalidate(self, *tags):
+        """Drop every page carrying any of `tags`, in every worker"""
+        tags = {tag for tag in tags if tag}
+        if not tags:
+            return 0
+
+        dropped = self._drop_tags(tags)
+        self._publish(tags)
+        for hook in self._invalidation_hooks:
+            hook(tags)
+        logger.info(f"Page cache invalidated {sorted(tags)} ({dropped} local pages)")
+        return dropped
+
+    # -----------------------------
+    # Staged pages
+    # -----------------------------
+
+    @property
+    def staging_dir(self):
+        return os.path.join(os.path.dirname(self.journal_path), "page_cache_staged")
+
+    @contextmanager
+    def staging(self):
+        """
+        Collect the pages cached() renders in this thread instead of
+        serving or storing them; yields the list to pass to replace().
+        """
+        pages = []
+        self._staging.pages = pages
+        try:
+            yield pages
+        finally:
+            self._staging.pages = None
+
+    def _write_staged(self, page):
+        key, body, mimetype, tags, validators = page
+        record = {
+            "key": list(key),
+            "body": base64.b64encode(body).decode("ascii"),
+            "mimetype": mimetype,
+            "tags": sorted(tags),
+            "etag": validators.etag if validators else None,
+            "last_modified": validators.last_modified.isoformat()
+            if validators and validators.last_modified else None,
+        }
+        digest = hashlib.sha1(repr(key).encode()).hexdigest()[:16]
+        name = f"{digest}-{time.time_ns()}.json"
+        path = os.path.join(self.staging_dir, name)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(record, f)
+        os.replace(path + ".tmp", path)
+        return name
+
+    def _install_staged(self, name):
+        try:
+            with open(os.path.join(self.staging_dir, os.path.basename(name)), encoding="utf-8") as f:
+                record = json.load(f)
+        except (OSError, ValueError):
+            # Expired or unreadable: the page just renders on its next request
+            return
+
+        validators = None
+        if record["etag"]:
+            last_modified = record["last_modified"]
+            validators = Validators(
+                record["etag"], datetime.fromisoformat(last_modified) if last_modified else None
+            )
+        self.set(
+            tuple(record["key"]), base64.b64decode(record["body"]), record["mimetype"],
+            record["tags"], validators,
+        )
+
+    def _expire_staged(self):
+        cutoff = time.time() - STAGED_MAX_AGE_SECONDS
+        for name in os.listdir(self.staging_dir):
+            path = os.path.join(self.staging_dir, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+            except OSError:
+                pass
+
+    def replace(self, tags, pages):
+        """
+        Invalidate `tags` and install `pages` (from staging()) in their
+        place, in every worker. Readers apply both in one sync, so there is
+        no window in which the pages are uncached.
+        """
+        tags = {tag for tag in tags if tag}
+        names = []
+        if self.journal_path and pages:
+            try:
+                os.makedirs(self.staging_dir, exist_ok=True)
+                self._expire_staged()
+                names = [self._write_staged(page) for page in pages]
+            except OSError as e:
+                logger.error(f"Page cache staging failed: {e}")
+                names = []
+
+        self._drop_tags(tags)
+        for key, body, mimetype, page_tags, validators in pages:
+            self.set(key, body, mimetype, page_tags, validators)
+        self._publish(sorted(tags) + [STAGED_PREFIX + name for name in names])
+        for hook in self._invalidation_hooks:
+            hook(tags)
+        logger.info(f"Page cache replaced {sorted(tags)} with {len(pages)} staged pages")
+        return len(pages)
+
+    def on_invalidate(self, hook):
+        """Register `hook(tags)` to run after every invalidate() call"""
+        self._invalidation_hooks.append(hook)
+        return hook
+
+    def clear(self, local_only=False):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self._generation += 1
+        if not local_only:
+            self._publish(["*"])
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    # -----------------------------
+    # View helper
+    # -----------------------------
+
+    @staticmethod
+    def request_is_cacheable():
+        """
+        Only anonymous, flash-free GETs are served from cache: base.html
+        renders admin links and flashed messages from the session.
+        """
+        if request.method != "GET":
+            return False
+        if session.get("_flashes") or session.get("is_admin") or session.get("admin_logged_in"):
+            return False
+        return True
+
+    def cached(self, key, tags, render, validate=None):
+        """
+        Serve the page for `key` from cache, or call `render()` (which may
+        query the database and raise 404) and cache its result. A None key
+        renders the page without caching it.
+
+        `validate()` should cheaply return the page's http_cache.Validators
+        (or raise 404); it only runs on a cache miss, and a matching
+        If-None-Match / If-Modified-Since is answered with 304 before
+        `render()` is called. `tags` double as Surrogate-Key values.
+        """
+        public = self.enabled and self.request_is_cacheable()
+        # Rendering ahead for replace(): always render, and collect instead of storing
+        staged = getattr(self._staging, "pages", None)
+        entry = self.get(key) if public and key is not None and staged is None else None
+
+        if entry is None:
+            validators = validate() if validate else None
+            if staged is None and is_not_modified(validators):
+                return not_modified_response(validators, tags, public)
+
+            generation = self._generation
+            rendered = render()
+            if isinstance(rendered, Response):
+                if rendered.status_code != 200:
+                    return rendered
+                body = rendered.get_data()
+                mimetype = rendered.mimetype
+            else:
+                body = rendered.encode("utf-8")
+                mimetype = "text/html"
+
+            entry = CachedPage(body, mimetype, tags, validators)
+
+            if staged is not None:
+                if public and key is not None:
+                    staged.append((key, body, mimetype, entry.tags, validators))
+            else:
+                # Don't store a page rendered from data an admin changed mid-render
+                self._sync()
+                if public and key is not None and self._generation == generation:
+                    self.set(key, body, mimetype, tags, validators)
+
+        elif is_not_modified(entry.validators):
+            return not_modified_response(entry.validators, sorted(entry.tags), public)
+
+        response = Response(entry.body, mimetype=entry.mimetype)
+        return apply_cache_headers(response, entry.validators, sorted(entry.tags), public)
+
+
+page_cache = PageCache()
+
+# Tags double as Surrogate-Keys, so dropping a page locally also purges
+# it from any caching proxy in front of the app
+page_cache.on_invalidate(purge_surrogate_keys)
+
+
+# =============================
+# Content tags and validators
+# =============================
+
+def content_index_tag(content_type):
+    return f"{content_type}:index"
+
+
+def content_page_tag(content_type, slug):
+    return f"{content_type}:post:{slug}"
+
+
+def invalidate_content(content_type, slug):
+    """Drop the article page and the listing pages it appears on"""
+    return page_cache.invalidate(
+        content_index_tag(content_type),
+        content_page_tag(content_type, slug),
+    )
+
+
+def content_page_validators(content_type, slug):
+    """
+    Validators for a published article, or 404; one indexed lookup. The
+    page also shows the article's related posts, so a rewrite of that
+    list counts as a modification.
+    """
+    related_at = (
+        select(func.max(RelatedContent.computed_at))
+        .where(RelatedContent.content_id == Content.id)
+        .scalar_subquery()
+    )
+    row = (
+        db.session.query(Content.id, Content.created_at, Content.updated_at, related_at.label("related_at"))
+        .filter_by(slug=slug, content_type=content_type, status="published")
+        .first()
+    )
+    if row is None:
+        abort(404)
+
+    modified = max(filter(None, (row.updated_at or row.created_at, row.related_at)), default=None)
+    return make_validators(content_type, row.id, modified, last_modified=modified)
+
+
+def content_index_cursor(content_type, cursor):
+    """
+    (cursor, cacheable) for a listing's ?cursor= value: the cursor in its
+    canonical encoding, and whether the page may be cached. A garbled
+    cursor aborts with 400. Only cursors at a published row of
+    `content_type`, which is where next-page links point, are cacheable,
+    so made-up positions can't push real pages out of the cache.
+    """
+    if not cursor:
+        return None, True
+
+    position = decode_cursor(cursor)
+    if position is None:
+        abort(400)
+
+    created_at, row_id = position
+    linked = db.session.query(
+        db.session.query(Content.id)
+        .filter_by(id=row_id, content_type=content_type, status="published", created_at=created_at)
+        .exists()
+    ).scalar()
+    return encode_cursor(created_at, row_id), linked
+
+
+def content_index_validators(content_type, *variant):
+    """
+    Validators for a listing page. The count catches deletes and
+    unpublishes that don't move the newest modification time.
+    """
+    count, modified = (
+        db.session.query(
+            func.count(Content.id),
+            func.max(func.coalesce(Content.updated_at, Content.created_at)),
+        )
+        .filter_by(content_type=content_type, status="published")
+        .one()
+    )
+    return make_validators(content_type, "index", count, modified, *variant, last_modified=modified)
+
+
+# =============================
+# Job tags and validators
+# =============================
+
+JOBS_INDEX_TAG = "jobs:index"
+
+
+def job_page_tag(slug):
+    return f"jobs:post:{slug}"
+
+
+def invalidate_job(slug):
+    """Drop a job page and the job listings, locally and at the proxy"""
+    return page_cache.invalidate(JOBS_INDEX_TAG, job_page_tag(slug))
+
+
+def job_page_validators(slug):
+    row = (
+        db.session.query(Job.id, Job.updated_at)
+        .filter_by(slug=slug, status="published")
+        .first()
+    )
+    if row is None:
+        abort(404)
+
+    return make_validators("job", row.id, row.updated_at, last_modified=row.updated_at)
+
+
+# COUNT + MAX over every published job, kept until the next jobs
+# invalidation: on_invalidate in the worker that saved, the cache
+# generation (bumped by journal reads) in the others
+JOB_INDEX_STATE_TTL_SECONDS = 30
+_job_index_state = None
+_job_index_lock = threading.Lock()
+
+
+@page_cache.on_invalidate
+def _drop_job_index_state(tags):
+    global _job_index_state
+    if JOBS_INDEX_TAG in tags:
+        with _job_index_lock:
+            _job_index_state = None
+
+
+def job_index_validators(*variant):
+    """
+    Validators for the job listings. ETag only: a Last-Modified of the
+    newest update would let If-Modified-Since clients miss deletions.
+    """
+    global _job_index_state
+    page_cache._sync()
+    generation = page_cache._generation
+    now = time.monotonic()
+
+    with _job_index_lock:
+        state = _job_index_state
+    if state is None or state[2] != generation or state[3] <= now:
+        count, modified = (
+            db.session.query(func.count(Job.id), func.max(Job.updated_at))
+            .filter_by(status="published")
+            .one()
+        )
+        state = (count, modified, generation, now + JOB_INDEX_STATE_TTL_SECONDS)
+        with _job_index_lock:
+            _job_index_state = state
+
+    count, modified = state[:2]
+    return make_validators("jobs", "index", count, modified, *variant)
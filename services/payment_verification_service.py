@@ -0,0 +1,109 @@
+"""
+Payment verification
+/verify-payment and the pending page's status poll ask Paystack about a
+reference through verify_reference(). Answers are cached per reference:
+briefly while the payment is still open, longer once Paystack has
+settled it, so a customer refreshing the page costs one upstream call per
+TTL rather than one per request. Concurrent checks of the same reference
+share one call (single flight): the first caller asks Paystack and the
+others wait for its answer.
+
+The cache is per process. Callers return early for orders already paid,
+so it only ever holds references that were still open when asked.
+
+A paid order's resource is only shown to the browser that checked out:
+create_order records the reference in the signed session cookie. Anyone
+else holding the reference gets a confirmation without the resource; the
+buyer also has it by email.
+"""
+
+import threading
+import time
+
+from flask import session
+
+from services.paystack_client import PaystackUnavailable, get_paystack_client
+
+# Customer-facing: give up sooner than the client's default and show the
+# pending page, which keeps polling
+VERIFY_DEADLINE_SECONDS = 8
+OPEN_TTL_SECONDS = 5
+SETTLED_TTL_SECONDS = 300
+SETTLED_STATUSES = ("success", "failed", "reversed")
+CACHE_MAX_ENTRIES = 4096
+
+_cache = {}
+_flights = {}
+_lock = threading.Lock()
+
+
+class _Flight:
+    """One upstream verification that other callers can wait on"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+def verify_reference(reference, client=None):
+    """
+    Paystack's transaction data for `reference`, from the cache when fresh.
+    Raises PaystackError / PaystackUnavailable like the client.
+    """
+    now = time.monotonic()
+    with _lock:
+        entry = _cache.get(reference)
+        if entry and entry[1] > now:
+            return entry[0]
+        flight = _flights.get(reference)
+        leader = flight is None
+        if leader:
+            flight = _flights[reference] = _Flight()
+
+    if not leader:
+        if not flight.done.wait(VERIFY_DEADLINE_SECONDS + 1):
+            raise PaystackUnavailable(f"Timed out waiting for verification of {reference}")
+        if flight.error is not None:
+            raise flight.error
+        return flight.result
+
+    try:
+        transaction = (client or get_paystack_client()).verify_transaction(
+            reference, deadline=VERIFY_DEADLINE_SECONDS
+        )
+    except Exception as e:
+        flight.error = e
+        raise
+    else:
+        flight.result = transaction
+        ttl = SETTLED_TTL_SECONDS if transaction.get("status") in SETTLED_STATUSES else OPEN_TTL_SECONDS
+        with _lock:
+            if len(_cache) >= CACHE_MAX_ENTRIES:
+                _cache.clear()
+            _cache[reference] = (transaction, time.monotonic() + ttl)
+        return transaction
+    finally:
+        with _lock:
+            _flights.pop(reference, None)
+        flight.done.set()
+
+
+# =============================
+# Buyer session
+# =============================
+
+CHECKOUT_SESSION_KEY = "checkout_references"
+MAX_CHECKOUT_REFERENCES = 20
+
+
+def remember_checkout(reference):
+    """Mark this browser as the buyer of `reference`"""
+    references = [ref for ref in session.get(CHECKOUT_SESSION_KEY, []) if ref != reference]
+    references.append(reference)
+    session[CHECKOUT_SESSION_KEY] = references[-MAX_CHECKOUT_REFERENCES:]
+
+
+def is_buyer(reference):
+    """True if this browser started the checkout for `reference`"""
+    return reference in session.get(CHECKOUT_SESSION_KEY, [])
@@ -0,0 +1,277 @@
+"""
+Paystack API client
+One pooled keep-alive session per worker process, shared by every
+request, so checkouts reuse TLS connections instead of opening one each.
+
+Every call has a deadline that covers all of its attempts. Idempotent
+calls (GETs) are retried on connection errors, timeouts, 429 and 5xx,
+with full-jitter exponential backoff that never sleeps past the deadline.
+A circuit breaker stops calling Paystack for a while after repeated
+failures, so an outage costs each request one fast PaystackUnavailable
+instead of a blocked gunicorn worker.
+
+PAYSTACK_BASE_URL points the client at tools/fake_paystack.py for local
+runs and tests.
+"""
+
+import logging
+import os
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+BASE_URL = os.getenv("PAYSTACK_BASE_URL", "https://api.paystack.co").rstrip("/")
+CONNECT_TIMEOUT = 3.05
+READ_TIMEOUT = 10
+DEADLINE_SECONDS = 15
+MAX_RETRIES = 3
+BACKOFF_BASE_SECONDS = 0.2
+BACKOFF_MAX_SECONDS = 2.0
+POOL_SIZE = int(os.getenv("PAYSTACK_POOL_SIZE", 10))
+CURRENCY = os.getenv("PAYSTACK_CURRENCY", "NGN")
+
+FAILURE_THRESHOLD = 5
+RESET_TIMEOUT_SECONDS = 30
+
+RETRYABLE_STATUS = frozenset({429, 500, 502, 503, 504})
+
+
+class PaystackError(Exception):
+    """Paystack rejected the call (bad reference, invalid key, ...)"""
+
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class PaystackUnavailable(PaystackError):
+    """Paystack could not be reached in time, or the circuit is open"""
+    pass
+
+
+class CircuitBreaker:
+    """
+    Closed -> open after `failure_threshold` consecutive failures; open
+    rejects calls for `reset_timeout` seconds, then lets a single trial
+    call through (half-open). Its success closes the circuit again.
+    """
+
+    def __init__(self, failure_threshold=FAILURE_THRESHOLD, reset_timeout=RESET_TIMEOUT_SECONDS):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at >= self.reset_timeout:
+                return "half-open"
+            return "open"
+
+    def before_call(self):
+        """
+        Raise PaystackUnavailable unless a call may go out now. Returns True
+        if this call is the half-open trial; its caller must end_trial().
+        """
+        with self._lock:
+            if self._opened_at is None:
+                return False
+            if time.monotonic() - self._opened_at < self.reset_timeout or self._trial_in_flight:
+                raise PaystackUnavailable("Paystack circuit is open")
+            self._trial_in_flight = True
+            return True
+
+    def end_trial(self):
+        """Let the next call be a trial if this one ended without an outcome"""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._trial_in_flight or self._failures >= self.failure_threshold:
+                if self._opened_at is None:
+                    logger.warning(f"Paystack circuit opened after {self._failures} failures")
+                self._opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+
+class PaystackClient:
+    """
+    Thin client for the Paystack endpoints we use.
+
+    Args:
+        secret_key: Secret API key (default: PAYSTACK_SECRET_KEY)
+        base_url: API root (default: PAYSTACK_BASE_URL or api.paystack.co)
+        deadline: Seconds a call may take across all its attempts
+        max_retries: Extra attempts for idempotent calls
+        pool_size: Keep-alive connections kept per worker
+        breaker: CircuitBreaker shared by every call of this client
+    """
+
+    def __init__(self, secret_key=None, base_url=None, deadline=DEADLINE_SECONDS, max_retries=MAX_RETRIES,
+                 pool_size=POOL_SIZE, breaker=None):
+        self.base_url = (base_url or BASE_URL).rstrip("/")
+        self.deadline = deadline
+        self.max_retries = max_retries
+        self.breaker = breaker or CircuitBreaker()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({
+            "Authorization": f"Bearer {secret_key or os.getenv('PAYSTACK_SECRET_KEY')}",
+            "Content-Type": "application/json",
+        })
+
+    @staticmethod
+    def _retry_after_seconds(value):
+        """Seconds from a Retry-After header (delta-seconds or HTTP-date), or None"""
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            when = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=timezone.utc)
+        return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+    def _backoff(self, attempt, retry_after=None):
+        seconds = self._retry_after_seconds(retry_after)
+        if seconds is not None:
+            return min(seconds, BACKOFF_MAX_SECONDS)
+        return random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt))
+
+    def _request(self, method, path, idempotent, deadline=None, **kwargs):
+        """Response JSON of one call; PaystackError / PaystackUnavailable on failure"""
+        trial = self.breaker.before_call()
+        try:
+            expires = time.monotonic() + (deadline or self.deadline)
+            attempts = 1 + (self.max_retries if idempotent else 0)
+            error = None
+
+            for attempt in range(attempts):
+                remaining = expires - time.monotonic()
+                if remaining <= 0:
+                    break
+
+                retry_after = None
+                try:
+                    response = self.session.request(
+                        method, self.base_url + path,
+                        timeout=(min(CONNECT_TIMEOUT, remaining), min(READ_TIMEOUT, remaining)),
+                        **kwargs,
+                    )
+                except requests.RequestException as e:
+                    # Connection errors, timeouts, truncated bodies (ChunkedEncodingError), ...
+                    error = f"{e.__class__.__name__}: {e}"
+                else:
+                    if response.status_code not in RETRYABLE_STATUS:
+                        self.breaker.record_success()
+                        try:
+                            body = response.json()
+                        except ValueError:
+                            raise PaystackError(f"Invalid response from Paystack (HTTP {response.status_code})",
+                                                response.status_code)
+                        if response.status_code >= 400 or not body.get("status"):
+                            raise PaystackError(body.get("message") or f"HTTP {response.status_code}",
+                                                response.status_code)
+                        return body
+                    error = f"HTTP {response.status_code}"
+                    retry_after = response.headers.get("Retry-After")
+
+                self.breaker.record_failure()
+                logger.warning(f"Paystack {method} {path} failed (attempt {attempt + 1}/{attempts}): {error}")
+
+                if attempt + 1 < attempts:
+                    pause = self._backoff(attempt, retry_after)
+                    if time.monotonic() + pause >= expires:
+                        break
+                    time.sleep(pause)
+                    try:
+                        # A retry must respect the circuit too, if this call tripped it
+                        trial = self.breaker.before_call() or trial
+                    except PaystackUnavailable:
+                        break
+
+            raise PaystackUnavailable(f"Paystack {method} {path} failed: {error or 'deadline exceeded'}")
+        finally:
+            # However the call ended, a half-open circuit must allow the next trial
+            if trial:
+                self.breaker.end_trial()
+
+    # =============================
+    # Endpoints
+    # =============================
+
+    def initialize_transaction(self, email, amount, reference, callback_url, metadata=None):
+        """Start a checkout; returns data with authorization_url. Not retried: it creates state."""
+        payload = {
+            "email": email, "amount": amount, "currency": CURRENCY,
+            "reference": reference, "callback_url": callback_url,
+        }
+        if metadata:
+            payload["metadata"] = metadata
+        return self._request("POST", "/transaction/initialize", idempotent=False, json=payload)["data"]
+
+    def verify_transaction(self, reference, deadline=None):
+        """Transaction data for `reference` (status: success, failed, abandoned, ...)"""
+        return self._request("GET", f"/transaction/verify/{reference}", idempotent=True, deadline=deadline)["data"]
+
+    def list_transactions(self, page=1, per_page=100, status=None, start=None, end=None, deadline=None):
+        """(transactions, meta) for one page of the transaction list, newest first"""
+        params = {"page": page, "perPage": per_page}
+        if status:
+            params["status"] = status
+        if start:
+            params["from"] = start.isoformat()
+        if end:
+            params["to"] = end.isoformat()
+        body = self._request("GET", "/transaction", idempotent=True, deadline=deadline, params=params)
+        return body["data"], body.get("meta", {})
+
+    def close(self):
+        self.session.close()
+
+
+def to_subunit(amount):
+    """Paystack amounts are integers in the currency's subunit (kobo, cents)"""
+    return int(round((amount or 0) * 100))
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_paystack_client():
+    """This process's shared client, created on first use (after any fork)"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = PaystackClient()
+    return _client
@@ -0,0 +1,205 @@
+"""
+Scheduled publishing
+Content and Job rows with status "scheduled" go live at `publish_at`.
+`flask publish-scheduled` runs publish_due() once, or every --interval
+seconds as a background runner.
+
+Each batch is prepared so that nothing is cold once it is visible:
+  1. Due rows are claimed with FOR UPDATE SKIP LOCKED (concurrent runners
+     never double-publish), pre-rendered and flipped to published in one
+     transaction.
+  2. Related-article lists are refreshed. Every worker keeps serving the
+     cached listings and feeds, so the new items aren't linked anywhere yet.
+  3. The new pages, listings and feeds are rendered through their views
+     and handed to page_cache.replace(): through the cache journal, every
+     web worker drops the old pages and installs these in the same sync,
+     so no visitor meets a cold cache. Dependent caches (content stats)
+     follow the same journal.
+  4. The sitemap is regenerated and, with PUBLISH_WARM_URL, the pages are
+     requested through the proxy in front of the app, which the
+     replacement purged. Job pages aren't page-cached, so for them that
+     proxy is the only cache to warm.
+"""
+
+import logging
+import os
+from datetime import datetime, timezone
+
+import requests
+from flask import current_app
+
+from extensions import db
+from models.content import Content
+from models.job import Job
+from services.content_renderer import prerender_content
+from services.job_expiry_service import set_expiry
+from services.page_cache import JOBS_INDEX_TAG, content_index_tag, content_page_tag, job_page_tag, page_cache
+from services.related_content_service import refresh_related_content
+from services.sitemap_service import generate_sitemaps
+
+logger = logging.getLogger(__name__)
+
+SCHEDULED = "scheduled"
+PUBLISHED = "published"
+BATCH_SIZE = 50
+
+# Base URL to warm pages through (e.g. the caching proxy in front of the
+# app, or a gunicorn bind address). Without it pages aren't warmed.
+WARM_BASE_URL = os.getenv("PUBLISH_WARM_URL", "").rstrip("/")
+WARM_TIMEOUT_SECONDS = 10
+
+
+class Publishable:
+    """How to prepare, invalidate and warm one publishable model"""
+
+    def __init__(self, model, prepare, tags, paths):
+        self.model = model
+        self.prepare = prepare
+        self.tags = tags
+        self.paths = paths
+
+
+def _prepare_job(job):
+    job.published_at = datetime.utcnow()
+    set_expiry(job)
+
+
+PUBLISHABLES = [
+    Publishable(
+        model=Content,
+        prepare=prerender_content,
+        tags=lambda c: [content_index_tag(c.content_type), content_page_tag(c.content_type, c.slug)],
+        paths=lambda c: [
+            f"/{c.content_type}/{c.slug}", f"/{c.content_type}", f"/{c.content_type}/",
+            f"/{c.content_type}/feed.xml",
+        ],
+    ),
+    Publishable(
+        model=Job,
+        prepare=_prepare_job,
+        tags=lambda j: [JOBS_INDEX_TAG, job_page_tag(j.slug)],
+        paths=lambda j: [f"/jobs/{j.slug}", "/jobs/", "/jobs/feed.xml"],
+    ),
+]
+
+
+# =============================
+# Scheduling
+# =============================
+
+def parse_publish_at(value):
+    """Parse an ISO / datetime-local string (UTC); ValueError if invalid"""
+    if not value:
+        raise ValueError("A publish time is required to schedule")
+    publish_at = datetime.fromisoformat(value)
+    if publish_at.tzinfo is not None:
+        publish_at = publish_at.astimezone(timezone.utc).replace(tzinfo=None)
+    return publish_at.replace(microsecond=0)
+
+
+def schedule(item, publish_at):
+    """Mark `item` to go live at `publish_at`; caller commits"""
+    item.status = SCHEDULED
+    item.publish_at = publish_at
+    return item
+
+
+# =============================
+# Runner
+# =============================
+
+def _claim_due(model, now, batch_size):
+    # SKIP LOCKED lets several runners split the due rows (ignored on SQLite)
+    return (
+        model.query
+        .filter(model.status == SCHEDULED, model.publish_at <= now)
+        .order_by(model.publish_at, model.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+
+
+def render_pages(paths):
+    """
+    Render `paths` through their views, in this app context, and return
+    the page-cache pages they produce for page_cache.replace(). Views that
+    aren't page-cached (jobs) render nothing to stage.
+    """
+    app = current_app._get_current_object()
+    with page_cache.staging() as pages:
+        for path in paths:
+            try:
+                with app.test_request_context(path):
+                    response = app.full_dispatch_request()
+            except Exception as e:
+                logger.warning(f"Rendering {path} failed: {e}")
+                continue
+            if response.status_code != 200:
+                logger.warning(f"Rendering {path} returned {response.status_code}")
+    return pages
+
+
+def warm_pages(paths):
+    """
+    Request `paths` through PUBLISH_WARM_URL (the caching proxy in front of
+    the app) so it holds them before visitors arrive; skipped without it.
+    """
+    if not WARM_BASE_URL:
+        return
+
+    for path in paths:
+        try:
+            response = requests.get(WARM_BASE_URL + path, timeout=WARM_TIMEOUT_SECONDS)
+        except requests.RequestException as e:
+            # Already published; a page that fails to load must not stop the batch
+            logger.warning(f"Warming {path} failed: {e}")
+            continue
+        if response.status_code != 200:
+            logger.warning(f"Warming {path} returned {response.status_code}")
+
+
+def publish_batch(now=None, batch_size=BATCH_SIZE):
+    """Publish up to `batch_size` due rows per model; returns the number published"""
+    now = now or datetime.utcnow()
+
+    batch = []
+    for publishable in PUBLISHABLES:
+        for item in _claim_due(publishable.model, now, batch_size):
+            publishable.prepare(item)
+            item.status = PUBLISHED
+            batch.append((publishable, item))
+
+    if not batch:
+        db.session.rollback()
+        return 0
+
+    db.session.commit()
+
+    # Rebuild derived artifacts before anything cached is dropped
+    if any(publishable.model is Content for publishable, _ in batch):
+        refresh_related_content()
+
+    tags, paths = set(), []
+    for publishable, item in batch:
+        tags.update(publishable.tags(item))
+        paths.extend(path for path in publishable.paths(item) if path not in paths)
+
+    page_cache.replace(tags, render_pages(paths))
+
+    # The replacement marked the sitemap stale; rebuild it now rather than on a crawler hit
+    generate_sitemaps()
+    warm_pages(paths)
+
+    logger.info(f"Published {len(batch)} scheduled items")
+    return len(batch)
+
+
+def publish_due(now=None, batch_size=BATCH_SIZE):
+    """Publish every due row, one batch at a time; returns the number published"""
+    total = 0
+    while True:
+        count = publish_batch(now, batch_size)
+        total += count
+        if count == 0:
+            return total
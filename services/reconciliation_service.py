@@ -0,0 +1,294 @@
+"""
+Payment reconciliation
+Cross-checks `orders` against Paystack's transaction list, so an order
+whose webhook was lost still ends up paid (or failed) and fulfilled.
+
+Pages of the list are fetched by a bounded thread pool through the shared
+PaystackClient; the window's end is fixed when the run starts, so
+transactions arriving meanwhile can't shift the pages under it. The
+calling thread diffs each page against `orders` with one query and
+applies the changes in batches of APPLY_BATCH_SIZE: one UPDATE per old
+status, one INSERT for the access grants, one commit.
+
+Bulk UPDATEs bypass the ORM, so the revenue rollup listeners on
+Order.status don't fire; the rollup deltas are applied here, in the same
+transaction, grouped per bucket.
+"""
+
+import logging
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import joinedload
+
+from extensions import db
+from models.order import Order
+from models.product import Product
+from models.revenue import apply_status_transition
+from models.user_access import UserAccess
+from services.email_service import send_order_confirmation
+from services.fulfillment import payment_matches
+from services.paystack_client import CURRENCY, PaystackError, get_paystack_client, to_subunit
+from utils.db import dialect_insert, supports_on_conflict
+
+logger = logging.getLogger(__name__)
+
+RECONCILE_WORKERS = int(os.getenv("RECONCILE_WORKERS", 4))
+PAGE_SIZE = 100
+APPLY_BATCH_SIZE = 500
+DEFAULT_WINDOW_DAYS = 7
+
+# Paystack transaction status -> (order statuses it may replace, new status).
+# A paid order is never downgraded here; refunds are handled by hand. A
+# success only pays an order if its amount and currency match the order's.
+TRANSITIONS = {
+    "success": (("pending", "failed"), "paid"),
+    "failed": (("pending",), "failed"),
+    "reversed": (("pending",), "failed"),
+}
+
+
+class ReconcileReport:
+    """Outcome of one reconciliation run"""
+
+    def __init__(self, start, end):
+        self.start = start
+        self.end = end
+        self.pages = 0
+        self.transactions = 0
+        self.matched = 0
+        self.unknown = 0
+        self.mismatched = 0
+        self.paid = 0
+        self.failed = 0
+        self.granted = 0
+        self.emailed = 0
+        self.errors = []
+        self.seconds = 0.0
+
+    def as_dict(self):
+        return {
+            "start": self.start.isoformat(),
+            "end": self.end.isoformat(),
+            "pages": self.pages,
+            "transactions": self.transactions,
+            "matched": self.matched,
+            "unknown": self.unknown,
+            "mismatched": self.mismatched,
+            "paid": self.paid,
+            "failed": self.failed,
+            "granted": self.granted,
+            "emailed": self.emailed,
+            "errors": self.errors,
+            "seconds": round(self.seconds, 3),
+            "per_second": round(self.transactions / self.seconds, 1) if self.seconds else 0.0,
+        }
+
+
+# =============================
+# Fetching
+# =============================
+
+def _pages(client, start, end, workers, per_page):
+    """Yield (page, transactions, error) for every page of the window, in completion order"""
+    try:
+        first, meta = client.list_transactions(1, per_page, start=start, end=end)
+    except PaystackError as e:
+        yield 1, [], str(e)
+        return
+    yield 1, first, None
+
+    page_count = int(meta.get("pageCount") or 1)
+    pending = iter(range(2, page_count + 1))
+
+    def fetch(page):
+        try:
+            return page, client.list_transactions(page, per_page, start=start, end=end)[0], None
+        except PaystackError as e:
+            return page, [], str(e)
+
+    # Sliding window: never more than `workers` pages in flight or waiting
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="reconcile") as pool:
+        in_flight = set()
+        for page in pending:
+            in_flight.add(pool.submit(fetch, page))
+            if len(in_flight) >= workers:
+                break
+        while in_flight:
+            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+                page = next(pending, None)
+                if page is not None:
+                    in_flight.add(pool.submit(fetch, page))
+
+
+# =============================
+# Diffing
+# =============================
+
+def _diff(transactions, report, changes, dry_run=False):
+    """Queue the order transitions one page of transactions implies into `changes`"""
+    by_reference = {t["reference"]: t for t in transactions if t.get("reference")}
+    if not by_reference:
+        return
+
+    orders = db.session.execute(
+        select(Order.payment_reference, Order.status, Order.amount)
+        .where(Order.payment_reference.in_(list(by_reference)))
+    ).all()
+    report.unknown += len(by_reference) - len(orders)
+    report.matched += len(orders)
+
+    for reference, order_status, amount in orders:
+        transaction = by_reference[reference]
+        transition = TRANSITIONS.get(transaction.get("status"))
+        if transition is None:
+            continue
+        old_statuses, new_status = transition
+        if order_status in old_statuses and new_status == "paid" and not payment_matches(transaction, amount):
+            report.mismatched += 1
+            logger.warning(
+                f"Order {reference} expects {to_subunit(amount)} {CURRENCY}, "
+                f"Paystack reports {transaction.get('amount')} {transaction.get('currency')}"
+            )
+        elif order_status in old_statuses:
+            changes.setdefault((order_status, new_status), []).append(reference)
+            if dry_run:
+                setattr(report, new_status, getattr(report, new_status) + 1)
+        elif order_status != new_status:
+            report.mismatched += 1
+            logger.warning(f"Order {reference} is {order_status} but Paystack says {transaction.get('status')}")
+
+
+# =============================
+# Applying
+# =============================
+
+def _grant_access(connection, rows):
+    """Bulk version of fulfill_order; returns the number of grants made"""
+    access_types = dict(db.session.execute(
+        select(Product.id, Product.product_type).where(Product.id.in_({row.product_id for row in rows}))
+    ).all())
+
+    grants = {}
+    for row in rows:
+        grants.setdefault((row.customer_email, row.product_id), {
+            "customer_email": row.customer_email,
+            "product_id": row.product_id,
+            "order_id": row.id,
+            "access_type": access_types.get(row.product_id),
+        })
+    if not grants:
+        return 0
+
+    table = UserAccess.__table__
+    if supports_on_conflict(connection):
+        stmt = dialect_insert(connection, table).on_conflict_do_nothing(
+            index_elements=["customer_email", "product_id"]
+        ).returning(table.c.id)
+        return len(db.session.execute(stmt, list(grants.values())).all())
+
+    existing = set(db.session.execute(
+        select(UserAccess.customer_email, UserAccess.product_id)
+        .where(UserAccess.customer_email.in_({email for email, _ in grants}))
+    ).all())
+    rows = [grant for key, grant in grants.items() if key not in existing]
+    if rows:
+        db.session.execute(table.insert(), rows)
+    return len(rows)
+
+
+def apply_changes(changes, report):
+    """
+    Apply {(old_status, new_status): [reference, ...]} in one transaction;
+    returns the ids of orders that became paid.
+    """
+    connection = db.session.connection()
+    paid_ids = []
+
+    for (old_status, new_status), references in changes.items():
+        # The status guard makes a concurrent webhook or a second run a no-op
+        rows = db.session.execute(
+            update(Order)
+            .where(Order.payment_reference.in_(references), Order.status == old_status)
+            .values(status=new_status)
+            .returning(
+                Order.id, Order.product_id, Order.customer_email,
+                Order.amount, Order.product_type, Order.created_at,
+            )
+            .execution_options(synchronize_session=False)
+        ).all()
+        if not rows:
+            continue
+
+        apply_status_transition(connection, rows, old_status, new_status)
+        setattr(report, new_status, getattr(report, new_status) + len(rows))
+        if new_status == "paid":
+            report.granted += _grant_access(connection, rows)
+            paid_ids.extend(row.id for row in rows)
+
+    db.session.commit()
+    return paid_ids
+
+
+def _notify(order_ids):
+    sent = 0
+    for start in range(0, len(order_ids), APPLY_BATCH_SIZE):
+        orders = (
+            Order.query.options(joinedload(Order.product))
+            .filter(Order.id.in_(order_ids[start:start + APPLY_BATCH_SIZE]))
+            .all()
+        )
+        sent += sum(1 for order in orders if send_order_confirmation(order))
+    return sent
+
+
+def reconcile_payments(start=None, end=None, workers=RECONCILE_WORKERS, per_page=PAGE_SIZE,
+                       notify=True, dry_run=False, client=None):
+    """
+    Reconcile orders against Paystack transactions created between `start`
+    (default DEFAULT_WINDOW_DAYS ago) and `end` (default now). With
+    notify, customers whose orders became paid get their confirmation
+    email. A dry run only counts what would change. Returns the report
+    as a dict.
+    """
+    end = end or datetime.utcnow()
+    start = start or end - timedelta(days=DEFAULT_WINDOW_DAYS)
+    client = client or get_paystack_client()
+    report = ReconcileReport(start, end)
+    started = time.monotonic()
+
+    changes = {}
+    paid_ids = []
+
+    for page, transactions, error in _pages(client, start, end, workers, per_page):
+        if error:
+            report.errors.append(f"page {page}: {error}")
+            logger.error(f"Reconciliation could not fetch page {page}: {error}")
+            continue
+        report.pages += 1
+        report.transactions += len(transactions)
+
+        _diff(transactions, report, changes, dry_run)
+        queued = sum(len(references) for references in changes.values())
+        if dry_run:
+            changes.clear()
+        elif queued >= APPLY_BATCH_SIZE:
+            paid_ids.extend(apply_changes(changes, report))
+            changes.clear()
+
+    if changes:
+        paid_ids.extend(apply_changes(changes, report))
+    # Ends the read transaction a dry run (or a run with nothing to change) leaves open
+    db.session.rollback()
+
+    if notify and paid_ids:
+        report.emailed = _notify(paid_ids)
+
+    report.seconds = time.monotonic() - started
+    logger.info(f"Reconciled {report.transactions} transactions: {report.paid} paid, {report.failed} failed")
+    return report.as_dict()
@@ -0,0 +1,379 @@
+"""
+Related articles
+TF-IDF vectors over published blog and news posts, compared with sparse
+NumPy math. The top RELATED_COUNT neighbours of each article are stored
+in related_content, so a post page needs one indexed lookup.
+
+Each worker keeps the tokenized corpus in memory and, like the feeds,
+only re-reads articles modified since its last sync. After an admin save,
+refresh_related_content() recomputes the lists of the changed articles,
+plus every list the change pushes an article into or out of. IDF weights
+drift slowly as the corpus grows; `flask rebuild-related-content`
+recomputes everything from scratch.
+"""
+
+import logging
+import re
+import threading
+from collections import Counter
+from datetime import datetime
+
+import numpy as np
+from sqlalchemy import delete, func, insert, select, union
+from sqlalchemy.orm import load_only
+
+from extensions import db
+from models.content import Content
+from models.related_content import RelatedContent
+from services.page_cache import page_cache, content_page_tag
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPES = ("blog", "news")
+RELATED_COUNT = 5
+MIN_SCORE = 0.05
+TITLE_WEIGHT = 3  # title terms count this many times over body terms
+
+_TAG_RE = re.compile(r"<[^>]+>")
+_TOKEN_RE = re.compile(r"[a-z][a-z0-9]{2,}")
+
+STOP_WORDS = frozenset("""
+    about above after again against all also and any are because been before being
+    below between both but can could did does doing down during each few for from
+    further had has have having her here hers herself him himself his how into its
+    itself just more most not now off once only other our ours out over own same she
+    should some such than that the their theirs them then there these they this those
+    through too under until very was were what when where which while who whom why
+    will with would you your yours yourself
+""".split())
+
+
+def tokenize(title, summary, body):
+    """Term counts for one article; title terms are weighted up"""
+    terms = Counter()
+    for text, weight in ((title, TITLE_WEIGHT), (summary, 1), (body, 1)):
+        for token in _TOKEN_RE.findall(_TAG_RE.sub(" ", text or "").lower()):
+            if token not in STOP_WORDS:
+                terms[token] += weight
+    return terms
+
+
+# =============================
+# Vector math
+# =============================
+
+class TfidfMatrix:
+    """
+    L2-normalized TF-IDF rows in CSR form (row_ptr/row_cols/row_data) and
+    the same values term-major (col_ptr/col_rows/col_data), so one row's
+    similarity to every other row is a gather over its terms' postings
+    and a bincount.
+    """
+
+    def __init__(self, ids, types, term_counts):
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.types = np.asarray(types)
+        self.position = {row_id: i for i, row_id in enumerate(ids)}
+        n = len(ids)
+
+        vocabulary = {}
+        cols, counts = [], []
+        row_ptr = np.zeros(n + 1, dtype=np.int64)
+        for i, terms in enumerate(term_counts):
+            cols.extend(vocabulary.setdefault(term, len(vocabulary)) for term in terms)
+            counts.extend(terms.values())
+            row_ptr[i + 1] = len(cols)
+
+        row_cols = np.asarray(cols, dtype=np.int64)
+        row_of = np.repeat(np.arange(n), np.diff(row_ptr))
+
+        df = np.bincount(row_cols, minlength=len(vocabulary))
+        idf = np.log((1.0 + n) / (1.0 + df)) + 1.0
+        row_data = (1.0 + np.log(np.asarray(counts, dtype=np.float64))) * idf[row_cols]
+
+        norms = np.sqrt(np.bincount(row_of, weights=row_data * row_data, minlength=n))
+        norms[norms == 0] = 1.0
+        row_data /= norms[row_of]
+
+        order = np.argsort(row_cols, kind="stable")
+        col_ptr = np.zeros(len(vocabulary) + 1, dtype=np.int64)
+        np.cumsum(df, out=col_ptr[1:])
+
+        self.row_ptr, self.row_cols, self.row_data = row_ptr, row_cols, row_data
+        self.col_ptr, self.col_rows, self.col_data = col_ptr, row_of[order], row_data[order]
+
+    def __len__(self):
+        return len(self.ids)
+
+    def similarities(self, i):
+        """Cosine similarity of row i to every row (same type only; 0 for itself)"""
+        start, end = self.row_ptr[i], self.row_ptr[i + 1]
+        terms, weights = self.row_cols[start:end], self.row_data[start:end]
+
+        starts = self.col_ptr[terms]
+        lengths = self.col_ptr[terms + 1] - starts
+        # Flat positions of every posting of every term in row i
+        offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+
+        scores = np.bincount(
+            self.col_rows[offsets],
+            weights=self.col_data[offsets] * np.repeat(weights, lengths),
+            minlength=len(self),
+        )
+        scores[self.types != self.types[i]] = 0.0
+        scores[i] = 0.0
+        return scores
+
+    def top_related(self, i, k=RELATED_COUNT):
+        """[(content_id, score)] for row i, best first"""
+        scores = self.similarities(i)
+        if len(scores) > k:
+            candidates = np.argpartition(-scores, k)[:k]
+        else:
+            candidates = np.arange(len(scores))
+        candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return [
+            (int(self.ids[j]), float(scores[j]))
+            for j in candidates if scores[j] >= MIN_SCORE
+        ]
+
+
+# =============================
+# Corpus
+# =============================
+
+class _Article:
+    __slots__ = ("content_type", "slug", "terms")
+
+    def __init__(self, content_type, slug, terms):
+        self.content_type = content_type
+        self.slug = slug
+        self.terms = terms
+
+
+class RelatedIndex:
+    """Per-worker tokenized copy of the published articles"""
+
+    def __init__(self):
+        self.articles = None
+        self.watermark = None
+        self._matrix = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _published():
+        return (Content.status == "published", Content.content_type.in_(CONTENT_TYPES))
+
+    def _load(self, since=None):
+        modified = func.coalesce(Content.updated_at, Content.created_at)
+        query = (
+            db.session.query(Content, modified)
+            .filter(*self._published())
+            .options(load_only(
+                Content.id, Content.content_type, Content.slug,
+                Content.title, Content.summary, Content.content,
+            ))
+        )
+        if since is not None:
+            # >= so rows sharing the watermark's timestamp aren't missed
+            query = query.filter(modified >= since)
+        return query.yield_per(500)
+
+    def sync(self):
+        """Apply article changes since the last sync; returns (changed ids, removed ids)"""
+        with self._lock:
+            first_load = self.articles is None
+            if first_load:
+                self.articles = {}
+
+            published = {row_id for (row_id,) in db.session.query(Content.id).filter(*self._published())}
+            removed = set(self.articles) - published
+            for row_id in removed:
+                del self.articles[row_id]
+
+            changed = set()
+            for content, modified in self._load(self.watermark):
+                terms = tokenize(content.title, content.summary, content.content)
+                old = self.articles.get(content.id)
+                if old is None or old.terms != terms or old.content_type != content.content_type:
+                    changed.add(content.id)
+                self.articles[content.id] = _Article(content.content_type, content.slug, terms)
+                self.watermark = max(self.watermark or modified, modified)
+
+            if first_load:
+                changed, removed = self._changes_since_last_write(published)
+
+            if changed or removed:
+                self._matrix = None
+            return changed, removed
+
+    def _changes_since_last_write(self, published):
+        # A fresh worker can't diff against its own state; compare with what
+        # the table was last computed from instead
+        last_write = db.session.query(func.max(RelatedContent.computed_at)).scalar()
+        if last_write is None:
+            return set(published), set()
+
+        modified = func.coalesce(Content.updated_at, Content.created_at)
+        changed = {
+            row_id for (row_id,) in
+            db.session.query(Content.id).filter(*self._published(), modified >= last_write)
+        }
+        referenced = union(
+            select(RelatedContent.content_id),
+            select(RelatedContent.related_id),
+        )
+        removed = {row_id for (row_id,) in db.session.execute(referenced)} - published
+        return changed, removed
+
+    def matrix(self):
+        with self._lock:
+            if self._matrix is None:
+                ids = sorted(self.articles)
+                self._matrix = TfidfMatrix(
+                    ids,
+                    [self.articles[i].content_type for i in ids],
+                    [self.articles[i].terms for i in ids],
+                )
+            return self._matrix
+
+    def reset(self):
+        with self._lock:
+            self.articles = None
+            self.watermark = None
+            self._matrix = None
+
+
+_index = RelatedIndex()
+
+
+# =============================
+# Table maintenance
+# =============================
+
+def _current_lists(content_ids=None):
+    query = db.session.query(RelatedContent.content_id, RelatedContent.related_id, RelatedContent.score)
+    if content_ids is not None:
+        query = query.filter(RelatedContent.content_id.in_(list(content_ids)))
+
+    lists = {}
+    for content_id, related_id, score in query.order_by(RelatedContent.content_id, RelatedContent.rank):
+        lists.setdefault(content_id, []).append((related_id, score))
+    return lists
+
+
+def _write_lists(matrix, content_ids, removed=()):
+    """Recompute and store the lists of `content_ids`; returns the ids whose list changed"""
+    content_ids = [i for i in content_ids if i in matrix.position]
+    old = _current_lists(content_ids)
+
+    new = {i: matrix.top_related(matrix.position[i]) for i in content_ids}
+    changed = [i for i in content_ids if [r for r, _ in new[i]] != [r for r, _ in old.get(i, [])]]
+
+    now = datetime.utcnow()
+    doomed = list(removed) + content_ids
+    for chunk_start in range(0, len(doomed), 500):
+        db.session.execute(
+            delete(RelatedContent).where(RelatedContent.content_id.in_(doomed[chunk_start:chunk_start + 500]))
+        )
+
+    rows = [
+        {"content_id": i, "rank": rank, "related_id": related_id, "score": score, "computed_at": now}
+        for i in content_ids
+        for rank, (related_id, score) in enumerate(new[i])
+    ]
+    if rows:
+        db.session.execute(insert(RelatedContent), rows)
+    db.session.commit()
+    return changed
+
+
+def _invalidate_pages(content_ids):
+    tags = []
+    for content_id in content_ids:
+        article = _index.articles.get(content_id)
+        if article is not None:
+            tags.append(content_page_tag(article.content_type, article.slug))
+    if tags:
+        page_cache.invalidate(*tags)
+
+
+def refresh_related_content():
+    """
+    Bring related_content up to date after articles were published, edited
+    or removed. Returns the number of lists rewritten. Errors are logged,
+    not raised: a stale recommendation must never fail an admin save.
+    """
+    try:
+        changed, removed = _index.sync()
+        if not changed and not removed:
+            return 0
+
+        matrix = _index.matrix()
+        affected = {i for i in changed if i in matrix.position}
+
+        # Lists that point at a changed or removed article: scores moved or the target is gone
+        touched = changed | removed
+        if touched:
+            affected.update(
+                row_id for (row_id,) in
+                db.session.query(RelatedContent.content_id)
+                .filter(RelatedContent.related_id.in_(list(touched)))
+                .distinct()
+            )
+
+        # Lists a changed article now outranks the weakest entry of (similarity is symmetric)
+        thresholds = np.full(len(matrix), MIN_SCORE)
+        for content_id, count, weakest in (
+            db.session.query(RelatedContent.content_id, func.count(), func.min(RelatedContent.score))
+            .group_by(RelatedContent.content_id)
+        ):
+            if count >= RELATED_COUNT and content_id in matrix.position:
+                thresholds[matrix.position[content_id]] = weakest
+
+        for content_id in changed:
+            if content_id in matrix.position:
+                scores = matrix.similarities(matrix.position[content_id])
+                affected.update(int(i) for i in matrix.ids[scores > thresholds])
+
+        affected -= removed
+        rewritten = _write_lists(matrix, sorted(affected), removed)
+        _invalidate_pages(rewritten)
+
+        logger.info(
+            f"Related content refreshed: {len(changed)} changed, {len(removed)} removed, "
+            f"{len(affected)} lists recomputed"
+        )
+        return len(affected)
+    except Exception as e:
+        db.session.rollback()
+        # Resync from scratch next time rather than trust a half-applied state
+        _index.reset()
+        logger.error(f"Related content refresh failed: {e}")
+        return 0
+
+
+def rebuild_related_content():
+    """Recompute every article's list with fresh IDF weights; returns lists written"""
+    _index.reset()
+    _index.sync()
+    matrix = _index.matrix()
+
+    ids = [int(i) for i in matrix.ids]
+    db.session.execute(delete(RelatedContent).where(RelatedContent.content_id.notin_(ids)))
+    _invalidate_pages(_write_lists(matrix, ids))
+
+    logger.info(f"Rebuilt related content for {len(matrix)} articles")
+    return len(matrix)
+
+
+def get_related_content(content_id):
+    """Published related articles for `content_id`, best first; one indexed lookup"""
+    return (
+        Content.query
+        .join(RelatedContent, RelatedContent.related_id == Content.id)
+        .filter(RelatedContent.content_id == content_id, Content.status == "published")
+        .options(load_only(*[getattr(Content, name) for name in Content.LISTING_COLUMNS]))
+        .order_by(RelatedContent.rank)
+        .all()
+    )
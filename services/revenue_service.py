@@ -0,0 +1,253 @@
+"""
+Revenue rollups
+Dashboard totals and revenue charts are read from the pre-aggregated
+`revenue_rollups` / `revenue_hourly_rollups` tables instead of scanning orders.
+"""
+
+import logging
+import math
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import func, select, literal
+
+from extensions import db
+from models.order import Order
+from models.product import Product
+from models.revenue import RevenueRollup, RevenueHourlyRollup, UNCATEGORIZED
+
+logger = logging.getLogger(__name__)
+
+GRANULARITIES = ("hour", "day", "week", "month")
+DEFAULT_MAX_POINTS = 500
+
+
+def get_revenue_summary():
+    """
+    Lifetime order/revenue totals for the admin dashboard.
+
+    Runs a single grouped query over the rollup table, whose size grows
+    with days x product types x statuses rather than with orders.
+    """
+    rows = db.session.execute(
+        select(
+            RevenueRollup.status,
+            RevenueRollup.product_type,
+            func.sum(RevenueRollup.order_count),
+            func.sum(RevenueRollup.revenue),
+        ).group_by(RevenueRollup.status, RevenueRollup.product_type)
+    ).all()
+
+    summary = {
+        "total_orders": 0,
+        "paid_orders": 0,
+        "pending_orders": 0,
+        "total_revenue": 0.0,
+        "revenue_by_type": {},
+        "revenue_by_status": {},
+    }
+
+    for status, product_type, count, revenue in rows:
+        count = int(count or 0)
+        revenue = float(revenue or 0.0)
+
+        summary["total_orders"] += count
+        if status == "paid":
+            summary["paid_orders"] += count
+            summary["total_revenue"] += revenue
+            by_type = summary["revenue_by_type"]
+            by_type[product_type] = by_type.get(product_type, 0) + revenue
+        elif status == "pending":
+            summary["pending_orders"] += count
+
+        by_status = summary["revenue_by_status"]
+        by_status[status] = by_status.get(status, 0) + revenue
+
+    return summary
+
+
+def _hour_bucket(bind, column):
+    """SQL expression truncating a timestamp to the hour"""
+    if bind.dialect.name == "sqlite":
+        # Match the string format SQLAlchemy's DateTime stores on SQLite,
+        # so rebuilt buckets collide with listener-written ones
+        return func.strftime("%Y-%m-%d %H:00:00.000000", column)
+    return func.date_trunc("hour", column)
+
+
+def rebuild_revenue_rollups():
+    """
+    Recompute every daily and hourly bucket from `orders`, one
+    INSERT ... SELECT per table.
+
+    Use after bulk imports or manual SQL that bypassed the ORM listeners.
+    Returns the number of daily buckets written.
+    """
+    # The order's snapshot, as the listeners use it; the product only for
+    # rows inserted around the ORM
+    product_type = func.coalesce(Order.product_type, Product.product_type, literal(UNCATEGORIZED))
+    amount = func.coalesce(Order.amount, Product.price, 0.0)
+    status = func.coalesce(Order.status, literal("pending"))
+    columns = ["product_type", "status", "order_count", "revenue", "updated_at"]
+
+    written = {}
+    for model, key, bucket in (
+        (RevenueRollup, "day", func.date(Order.created_at)),
+        (RevenueHourlyRollup, "hour", _hour_bucket(db.session.get_bind(), Order.created_at)),
+    ):
+        source = (
+            select(
+                bucket.label(key),
+                product_type.label("product_type"),
+                status.label("status"),
+                func.count(Order.id).label("order_count"),
+                func.sum(amount).label("revenue"),
+                func.now().label("updated_at"),
+            )
+            .select_from(Order)
+            .outerjoin(Product, Product.id == Order.product_id)
+            .group_by(bucket, product_type, status)
+        )
+
+        table = model.__table__
+        db.session.execute(table.delete())
+        result = db.session.execute(table.insert().from_select([key] + columns, source))
+        written[key] = result.rowcount
+
+    db.session.commit()
+
+    logger.info(f"Rebuilt revenue rollups: {written['day']} daily, {written['hour']} hourly buckets")
+    return written["day"]
+
+
+# =============================
+# Time series
+# =============================
+
+def _naive_utc(value):
+    """Orders are stored in naive UTC; convert aware datetimes to match"""
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _bucket_start(value, granularity):
+    """Floor a datetime to the start of its bucket"""
+    if granularity == "hour":
+        return value.replace(minute=0, second=0, microsecond=0)
+
+    day = datetime(value.year, value.month, value.day)
+    if granularity == "day":
+        return day
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    return day.replace(day=1)
+
+
+def _next_bucket(value, granularity):
+    if granularity == "hour":
+        return value + timedelta(hours=1)
+    if granularity == "day":
+        return value + timedelta(days=1)
+    if granularity == "week":
+        return value + timedelta(weeks=1)
+    if value.month == 12:
+        return value.replace(year=value.year + 1, month=1)
+    return value.replace(month=value.month + 1)
+
+
+def _fetch_buckets(granularity, start, end, status, product_type):
+    """
+    Sum rollup rows into {bucket_start: [orders, revenue]}.
+
+    Hourly charts read the hourly table; everything else reads the daily
+    table and folds days into weeks/months in Python, which touches at
+    most a few rows per day regardless of order volume.
+    """
+    if granularity == "hour":
+        model, key = RevenueHourlyRollup, RevenueHourlyRollup.hour
+        lower, upper = start, end
+    else:
+        model, key = RevenueRollup, RevenueRollup.day
+        lower = start.date()
+        upper = end.date() if end == _bucket_start(end, "day") else end.date() + timedelta(days=1)
+
+    query = (
+        db.session.query(key, func.sum(model.order_count), func.sum(model.revenue))
+        .filter(key >= lower, key < upper)
+        .group_by(key)
+    )
+    if status:
+        query = query.filter(model.status == status)
+    if product_type:
+        query = query.filter(model.product_type == product_type)
+
+    buckets = {}
+    for bucket, count, revenue in query.all():
+        if isinstance(bucket, str):
+            bucket = datetime.fromisoformat(bucket)
+        elif not isinstance(bucket, datetime):
+            bucket = datetime(bucket.year, bucket.month, bucket.day)
+
+        totals = buckets.setdefault(_bucket_start(bucket, granularity), [0, 0.0])
+        totals[0] += int(count or 0)
+        totals[1] += float(revenue or 0.0)
+
+    return buckets
+
+
+def get_revenue_series(granularity="day", start=None, end=None, status="paid",
+                       product_type=None, max_points=DEFAULT_MAX_POINTS):
+    """
+    Revenue and order counts per bucket over [start, end). Aware
+    datetimes are converted to UTC; naive ones are taken as UTC.
+
+    Empty buckets are filled with zeros. When the range holds more than
+    `max_points` buckets, consecutive buckets are summed together so the
+    response never exceeds the point budget; sums keep totals exact,
+    unlike sampling. `bucket_size` reports how many base buckets each
+    point covers.
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"granularity must be one of {', '.join(GRANULARITIES)}")
+
+    end = _naive_utc(end) or datetime.utcnow()
+    start = _naive_utc(start) or end - timedelta(days=30)
+    if start >= end:
+        raise ValueError("start must be before end")
+
+    max_points = max(1, max_points or DEFAULT_MAX_POINTS)
+
+    # Hour charts over long ranges would merge whole days anyway, so read
+    # the (24x smaller) daily table instead
+    if granularity == "hour" and (end - start) / timedelta(hours=1) / max_points >= 24:
+        granularity = "day"
+
+    buckets = _fetch_buckets(granularity, start, end, status, product_type)
+
+    series = []
+    cursor = _bucket_start(start, granularity)
+    while cursor < end:
+        orders, revenue = buckets.get(cursor, (0, 0.0))
+        series.append((cursor, orders, revenue))
+        cursor = _next_bucket(cursor, granularity)
+
+    bucket_size = max(1, math.ceil(len(series) / max_points))
+    points = []
+    for i in range(0, len(series), bucket_size):
+        chunk = series[i:i + bucket_size]
+        points.append({
+            "t": chunk[0][0].isoformat(),
+            "orders": sum(c[1] for c in chunk),
+            "revenue": round(sum(c[2] for c in chunk), 2),
+        })
+
+    return {
+        "granularity": granularity,
+        "bucket_size": bucket_size,
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "status": status,
+        "product_type": product_type,
+        "total_orders": sum(p["orders"] for p in points),
+        "total_revenue": round(sum(p["revenue"] for p in points), 2),
+        "points": points,
+    }
@@ -0,0 +1,402 @@
+"""
+Full-text search
+Postgres tsvector + GIN index in production, SQLite FTS5 for local runs.
+
+Each SearchIndex keeps a side table keyed by the source row id. ORM
+events on the source model write to it inside the same flush, so the
+index commits (or rolls back) together with the row it describes.
+"""
+
+import logging
+import re
+
+from markupsafe import Markup, escape
+from sqlalchemy import Float, Integer, event, text
+
+from extensions import db
+from models.content import Content
+from models.job import Job
+
+logger = logging.getLogger(__name__)
+
+# Snippet markers that cannot appear in user text; swapped for <mark>
+# after the snippet has been HTML-escaped
+_HL_START = "\x02"
+_HL_STOP = "\x03"
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+class SearchIndex:
+    """
+    Describes what to index for one model.
+
+    Args:
+        name: Side table name (e.g. "content_search")
+        model: Mapped class being indexed (must have an integer `id`)
+        fields: [(column_name, weight)] with weight "A" (highest) to "D"
+        snippet_fields: Columns used to build result snippets
+    """
+
+    def __init__(self, name, model, fields, snippet_fields):
+        self.name = name
+        self.model = model
+        self.fields = fields
+        self.snippet_fields = snippet_fields
+
+    @property
+    def source_table(self):
+        return self.model.__tablename__
+
+    @property
+    def columns(self):
+        return [column for column, _ in self.fields]
+
+    def values_for(self, target):
+        return {column: getattr(target, column) or "" for column in self.columns}
+
+
+class SearchResult:
+    """A matched row with its rank (higher is better) and an HTML snippet"""
+
+    def __init__(self, id, rank, snippet):
+        self.id = id
+        self.rank = rank
+        self.snippet = snippet
+
+
+def _highlight(snippet):
+    if not snippet:
+        return Markup("")
+    escaped = str(escape(snippet))
+    return Markup(escaped.replace(_HL_START, "<mark>").replace(_HL_STOP, "</mark>"))
+
+
+def _filter_sql(filters, params, alias="src"):
+    clauses = []
+    for i, (column, value) in enumerate((filters or {}).items()):
+        if not re.fullmatch(r"[a-z_]+", column):
+            raise ValueError(f"Invalid filter column: {column}")
+        params[f"f{i}"] = value
+        clauses.append(f"{alias}.{column} = :f{i}")
+    return "".join(f" AND {c}" for c in clauses)
+
+
+class PostgresSearchBackend:
+    """tsvector side table with a GIN index, ranked with ts_rank_cd"""
+
+    config = "english"
+
+    def ensure_schema(self, connection, index):
+        connection.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {index.name} ("
+            f" id INTEGER PRIMARY KEY REFERENCES {index.source_table}(id) ON DELETE CASCADE,"
+            f" document TSVECTOR NOT NULL)"
+        ))
+        connection.execute(text(
+            f"CREATE INDEX IF NOT EXISTS ix_{index.name}_document"
+            f" ON {index.name} USING GIN (document)"
+        ))
+
+    def _document_sql(self, index, prefix=":"):
+        parts = [
+            f"setweight(to_tsvector('{self.config}', coalesce({prefix}{column}, '')), '{weight}')"
+            for column, weight in index.fields
+        ]
+        return " || ".join(parts)
+
+    def upsert(self, connection, index, row_id, values):
+        connection.execute(
+            text(
+                f"INSERT INTO {index.name} (id, document)"
+                f" VALUES (:id, {self._document_sql(index)})"
+                f" ON CONFLICT (id) DO UPDATE SET document = EXCLUDED.document"
+            ),
+            {"id": row_id, **values},
+        )
+
+    def delete(self, connection, index, row_id):
+        connection.execute(text(f"DELETE FROM {index.name} WHERE id = :id"), {"id": row_id})
+
+    def rebuild(self, connection, index):
+        self.ensure_schema(connection, index)
+        connection.execute(text(f"TRUNCATE {index.name}"))
+        result = connection.execute(text(
+            f"INSERT INTO {index.name} (id, document)"
+            f" SELECT src.id, {self._document_sql(index, prefix='src.')}"
+            f" FROM {index.source_table} src"
+        ))
+        return result.rowcount
+
+    def search(self, connection, index, query, filters=None, limit=50):
+        params = {"q": query, "limit": limit}
+        where = _filter_sql(filters, params)
+        snippet_source = " || ' ' || ".join(
+            f"coalesce(src.{column}, '')" for column in index.snippet_fields
+        )
+
+        # Rank inside the subquery and only build headlines for the rows
+        # that survive LIMIT; ts_headline re-parses the whole document.
+        rows = connection.execute(
+            text(
+                f"SELECT ranked.id, ranked.rank,"
+                f" ts_headline('{self.config}', {snippet_source}, ranked.q,"
+                f"  'StartSel=\"{_HL_START}\", StopSel=\"{_HL_STOP}\", MaxFragments=2, MaxWords=30, MinWords=10')"
+                f" FROM ("
+                f"  SELECT s.id, ts_rank_cd(s.document, q) AS rank, q"
+                f"  FROM {index.name} s"
+                f"  JOIN {index.source_table} src ON src.id = s.id,"
+                f"  websearch_to_tsquery('{self.config}', :q) q"
+                f"  WHERE s.document @@ q{where}"
+                f"  ORDER BY rank DESC, s.id DESC"
+                f"  LIMIT :limit"
+                f" ) ranked"
+                f" JOIN {index.source_table} src ON src.id = ranked.id"
+                f" ORDER BY ranked.rank DESC, ranked.id DESC"
+            ),
+            params,
+        ).all()
+
+        return [SearchResult(row[0], float(row[1]), _highlight(row[2])) for row in rows]
+
+    def matches(self, index, query):
+        return text(
+            f"SELECT s.id AS id, ts_rank_cd(s.document, q) AS rank"
+            f" FROM {index.name} s, websearch_to_tsquery('{self.config}', :search_q) q"
+            f" WHERE s.document @@ q"
+        ).bindparams(search_q=query)
+
+
+class SQLiteSearchBackend:
+    """FTS5 virtual table keyed by rowid, ranked with bm25"""
+
+    def ensure_schema(self, connection, index):
+        columns = ", ".join(index.columns)
+        connection.execute(text(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {index.name}"
+            f" USING fts5({columns}, tokenize = 'porter unicode61')"
+        ))
+
+    def upsert(self, connection, index, row_id, values):
+        self.delete(connection, index, row_id)
+        columns = ", ".join(index.columns)
+        placeholders = ", ".join(f":{column}" for column in index.columns)
+        connection.execute(
+            text(f"INSERT INTO {index.name} (rowid, {columns}) VALUES (:id, {placeholders})"),
+            {"id": row_id, **values},
+        )
+
+    def delete(self, connection, index, row_id):
+        connection.execute(text(f"DELETE FROM {index.name} WHERE rowid = :id"), {"id": row_id})
+
+    def rebuild(self, connection, index):
+        self.ensure_schema(connection, index)
+        connection.execute(text(f"DELETE FROM {index.name}"))
+        columns = ", ".join(index.columns)
+        source_columns = ", ".join(f"coalesce(src.{column}, '')" for column in index.columns)
+        result = connection.execute(text(
+            f"INSERT INTO {index.name} (rowid, {columns})"
+            f" SELECT src.id, {source_columns} FROM {index.source_table} src"
+        ))
+        return result.rowcount
+
+    @staticmethod
+    def _match_expression(query):
+        # Quote every term so user input can't inject FTS5 operators;
+        # the last term is a prefix match for search-as-you-type
+        terms = _WORD_RE.findall(query)
+        if not terms:
+            return None
+        quoted = ['"' + term.replace('"', '""') + '"' for term in terms]
+        quoted[-1] += "*"
+        return " ".join(quoted)
+
+    def search(self, connection, index, query, filters=None, limit=50):
+        match = self._match_expression(query)
+        if not match:
+            return []
+
+        params = {"q": match, "limit": limit}
+        where = _filter_sql(filters, params)
+        weights = ", ".join(
+            {"A": "10.0", "B": "4.0", "C": "1.0"}.get(weight, "0.5") for _, weight in index.fields
+        )
+        snippet_column = index.columns.index(index.snippet_fields[-1])
+
+        rows = connection.execute(
+            text(
+                f"SELECT fts.rowid, bm25({index.name}, {weights}) AS rank,"
+                f" snippet({index.name}, {snippet_column}, '{_HL_START}', '{_HL_STOP}', '…', 24)"
+                f" FROM {index.name} fts"
+                f" JOIN {index.source_table} src ON src.id = fts.rowid"
+                f" WHERE {index.name} MATCH :q{where}"
+                f" ORDER BY rank"
+                f" LIMIT :limit"
+            ),
+            params,
+        ).all()
+
+        # bm25 is "lower is better"; flip it so callers can treat rank uniformly
+        return [SearchResult(row[0], -float(row[1]), _highlight(row[2])) for row in rows]
+
+    def matches(self, index, query):
+        match = self._match_expression(query)
+        if not match:
+            return None
+        weights = ", ".join(
+            {"A": "10.0", "B": "4.0", "C": "1.0"}.get(weight, "0.5") for _, weight in index.fields
+        )
+        return text(
+            f"SELECT rowid AS id, -bm25({index.name}, {weights}) AS rank"
+            f" FROM {index.name} WHERE {index.name} MATCH :search_q"
+        ).bindparams(search_q=match)
+
+
+_BACKENDS = {
+    "postgresql": PostgresSearchBackend(),
+    "sqlite": SQLiteSearchBackend(),
+}
+
+# (engine url, index name) pairs whose schema has been checked this process
+_ready = set()
+
+
+def get_search_backend(bind):
+    """Factory function to get the search backend for a connection/engine"""
+    backend = _BACKENDS.get(bind.dialect.name)
+    if backend is None:
+        raise ValueError(f"Full-text search is not supported on {bind.dialect.name}")
+    return backend
+
+
+def _ensure_ready(connection, index):
+    key = (str(connection.engine.url), index.name)
+    if key not in _ready:
+        get_search_backend(connection).ensure_schema(connection, index)
+        _ready.add(key)
+
+
+# =============================
+# Indexes
+# =============================
+
+CONTENT_INDEX = SearchIndex(
+    name="content_search",
+    model=Content,
+    fields=[("title", "A"), ("summary", "B"), ("content", "C")],
+    snippet_fields=["summary", "content"],
+)
+
+JOB_INDEX = SearchIndex(
+    name="job_search",
+    model=Job,
+    fields=[("title", "A"), ("company", "B"), ("description", "C")],
+    snippet_fields=["description"],
+)
+
+
+def register_index(index):
+    """Keep `index` in sync with inserts, updates and deletes of its model"""
+
+    @event.listens_for(index.model, "after_insert")
+    def index_new_row(mapper, connection, target):
+        _ensure_ready(connection, index)
+        get_search_backend(connection).upsert(connection, index, target.id, index.values_for(target))
+
+    @event.listens_for(index.model, "after_update")
+    def reindex_row(mapper, connection, target):
+        state = db.inspect(target)
+        if not any(state.attrs[column].history.has_changes() for column in index.columns):
+            return
+        _ensure_ready(connection, index)
+        get_search_backend(connection).upsert(connection, index, target.id, index.values_for(target))
+
+    @event.listens_for(index.model, "after_delete")
+    def unindex_row(mapper, connection, target):
+        _ensure_ready(connection, index)
+        get_search_backend(connection).delete(connection, index, target.id)
+
+
+SEARCH_INDEXES = {index.name: index for index in (CONTENT_INDEX, JOB_INDEX)}
+
+register_index(CONTENT_INDEX)
+register_index(JOB_INDEX)
+
+
+# =============================
+# Public API
+# =============================
+
+def search(index, query, filters=None, limit=50):
+    """Ranked SearchResults for `query`, best match first"""
+    query = (query or "").strip()
+    if not query:
+        return []
+
+    connection = db.session.connection()
+    _ensure_ready(connection, index)
+    return get_search_backend(connection).search(connection, index, query, filters, limit)
+
+
+def search_content(query, content_type=None, status=None, limit=50):
+    """
+    Search Content title/summary/body.
+
+    Returns [(Content, SearchResult)] in rank order; each result carries a
+    sanitized HTML snippet with matches wrapped in <mark>.
+    """
+    filters = {}
+    if content_type:
+        filters["content_type"] = content_type
+    if status:
+        filters["status"] = status
+
+    results = search(CONTENT_INDEX, query, filters, limit)
+    if not results:
+        return []
+
+    rows = {c.id: c for c in Content.query.filter(Content.id.in_([r.id for r in results]))}
+    return [(rows[r.id], r) for r in results if r.id in rows]
+
+
+def search_matches(index, query):
+    """
+    Every row matching `query` as a subquery of (id, rank), higher rank
+    better, for callers to join, filter, count and paginate in SQL. None
+    when the query has nothing to search for.
+    """
+    query = (query or "").strip()
+    if not query:
+        return None
+
+    connection = db.session.connection()
+    _ensure_ready(connection, index)
+    matches = get_search_backend(connection).matches(index, query)
+    if matches is None:
+        return None
+    return matches.columns(id=Integer, rank=Float).subquery(f"{index.name}_matches")
+
+
+def job_matches(query):
+    """search_matches() over jobs (see job_routes.jobs_list)"""
+    return search_matches(JOB_INDEX, query)
+
+
+def index_rows(index, rows):
+    """Upsert [(id, {column: value})] into `index`, for writes that bypass the ORM"""
+    connection = db.session.connection()
+    _ensure_ready(connection, index)
+    backend = get_search_backend(connection)
+    for row_id, values in rows:
+        backend.upsert(connection, index, row_id, {column: values.get(column) or "" for column in index.columns})
+
+
+def rebuild_search_index(index=CONTENT_INDEX):
+    """Rebuild one index from its source table; returns rows indexed"""
+    connection = db.session.connection()
+    count = get_search_backend(connection).rebuild(connection, index)
+    _ready.add((str(connection.engine.url), index.name))
+    db.session.commit()
+
+    logger.info(f"Rebuilt search index {index.name}: {count} rows")
+    return count
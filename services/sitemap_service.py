@@ -0,0 +1,298 @@
+"""
+Sitemap generation
+Streams every public URL (static pages, blog posts, news articles, jobs)
+from the database with server-side cursors into 50k-URL shard files plus a
+sitemap index, cached on disk under instance/sitemaps.
+
+The files are rebuilt only when they are missing, when an admin change
+marked them stale (via the page-cache invalidation hook), or after
+MAX_AGE_SECONDS as a safety net for writes that bypass the admin.
+"""
+
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from xml.sax.saxutils import escape
+
+from flask import current_app
+from sqlalchemy import func, select
+
+from extensions import db
+from models.content import Content
+from models.job import Job
+from services.page_cache import page_cache
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger(__name__)
+
+SITE_URL = os.getenv("SITE_URL", "https://https-smartsortaisolutions.onrender.com").rstrip("/")
+
+URLS_PER_SHARD = 50000
+STREAM_BATCH_SIZE = 1000
+MAX_AGE_SECONDS = 24 * 60 * 60
+
+MANIFEST = "manifest.json"
+STALE_MARKER = "stale"
+LOCK_FILE = ".lock"
+
+# (path, priority)
+STATIC_PAGES = [
+    ("/", "1.0"),
+    ("/blog", "0.9"),
+    ("/services", "0.8"),
+    ("/courses", "0.8"),
+    ("/about", "0.8"),
+    ("/jobs/", "0.8"),
+    ("/news", "0.7"),
+    ("/contact", "0.6"),
+    ("/free-resources", "0.6"),
+    ("/privacy-policy", "0.4"),
+    ("/terms-and-conditions", "0.4"),
+    ("/refund-policy", "0.4"),
+]
+
+# Content types and the public URL prefix each one is served under
+CONTENT_PREFIXES = {"blog": "/blog/", "news": "/news/"}
+
+
+def sitemap_dir():
+    path = os.path.join(current_app.instance_path, "sitemaps")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def shard_name(number):
+    return f"sitemap-{number}.xml"
+
+
+def _lastmod(value):
+    return value.strftime("%Y-%m-%d") if value else None
+
+
+# =============================
+# URL streams
+# =============================
+
+def _stream(statement):
+    """Yield rows using a server-side cursor, STREAM_BATCH_SIZE at a time"""
+    result = db.session.execute(
+        statement.execution_options(stream_results=True, yield_per=STREAM_BATCH_SIZE)
+    )
+    for row in result:
+        yield row
+
+
+def iter_urls():
+    """Yield (loc, lastmod, priority) for every public URL"""
+    for path, priority in STATIC_PAGES:
+        yield SITE_URL + path, None, priority
+
+    content_rows = _stream(
+        select(
+            Content.content_type,
+            Content.slug,
+            func.coalesce(Content.updated_at, Content.created_at),
+        )
+        .where(Content.status == "published", Content.content_type.in_(list(CONTENT_PREFIXES)))
+        .order_by(Content.id)
+    )
+    for content_type, slug, modified in content_rows:
+        yield f"{SITE_URL}{CONTENT_PREFIXES[content_type]}{slug}", _lastmod(modified), "0.7"
+
+    job_rows = _stream(
+        select(Job.slug, Job.updated_at)
+        .where(Job.status == "published", Job.slug.isnot(None))
+        .order_by(Job.id)
+    )
+    for slug, modified in job_rows:
+        yield f"{SITE_URL}/jobs/{slug}", _lastmod(modified), "0.6"
+
+
+# =============================
+# Generation
+# =============================
+
+class _ShardWriter:
+    def __init__(self, directory, number):
+        self.name = shard_name(number)
+        self.path = os.path.join(directory, self.name)
+        self.tmp_path = self.path + ".tmp"
+        self.count = 0
+        self.lastmod = None
+        self.file = open(self.tmp_path, "w", encoding="utf-8")
+        self.file.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        self.file.write('<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n')
+
+    def add(self, loc, lastmod, priority):
+        entry = f"  <url><loc>{escape(loc)}</loc>"
+        if lastmod:
+            entry += f"<lastmod>{lastmod}</lastmod>"
+            self.lastmod = max(self.lastmod or lastmod, lastmod)
+        if priority:
+            entry += f"<priority>{priority}</priority>"
+        self.file.write(entry + "</url>\n")
+        self.count += 1
+
+    def close(self):
+        self.file.write("</urlset>\n")
+        self.file.close()
+        os.replace(self.tmp_path, self.path)
+
+
+@contextmanager
+def _exclusive_lock(path):
+    """Hold an exclusive lock on `path` across processes, waiting for it"""
+    with open(path, "w") as lock:
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        else:
+            while True:
+                try:
+                    msvcrt.locking(lock.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    # LK_LOCK gives up after ~10s; a build can take longer
+                    continue
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+            else:
+                lock.seek(0)
+                msvcrt.locking(lock.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def generate_sitemaps(force=True):
+    """
+    Rebuild every shard and the index. Returns the manifest:
+        {"generated_at", "urls", "shards": [{"name", "urls", "lastmod"}]}
+    With force=False, a build another process finished while this one
+    waited for the lock is reused instead.
+    """
+    directory = sitemap_dir()
+
+    # One worker regenerates; the others wait and then reuse its output
+    with _exclusive_lock(os.path.join(directory, LOCK_FILE)):
+        if not force and not _needs_regeneration(directory):
+            manifest = _read_manifest(directory)
+            if manifest is not None:
+                return manifest
+
+        # Clear the marker first so a change made mid-build re-marks it
+        _clear_stale(directory)
+
+        shards = []
+        writer = None
+        for loc, lastmod, priority in iter_urls():
+            if writer is None or writer.count >= URLS_PER_SHARD:
+                if writer is not None:
+                    writer.close()
+                    shards.append(writer)
+                writer = _ShardWriter(directory, len(shards) + 1)
+            writer.add(loc, lastmod, priority)
+
+        if writer is not None:
+            writer.close()
+            shards.append(writer)
+
+        # Drop shards left over from a larger previous build
+        keep = {shard.name for shard in shards}
+        for name in os.listdir(directory):
+            if name.startswith("sitemap-") and name.endswith(".xml") and name not in keep:
+                os.remove(os.path.join(directory, name))
+
+        manifest = {
+            "generated_at": datetime.utcnow().isoformat(),
+            "urls": sum(shard.count for shard in shards),
+            "shards": [
+                {"name": shard.name, "urls": shard.count, "lastmod": shard.lastmod}
+                for shard in shards
+            ],
+        }
+        _write_index(directory, manifest)
+
+    logger.info(f"Generated sitemap: {manifest['urls']} URLs in {len(shards)} shards")
+    return manifest
+
+
+def _read_manifest(directory):
+    try:
+        with open(os.path.join(directory, MANIFEST), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_index(directory, manifest):
+    lines = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">',
+    ]
+    for shard in manifest["shards"]:
+        entry = f"  <sitemap><loc>{escape(SITE_URL)}/{shard['name']}</loc>"
+        if shard["lastmod"]:
+            entry += f"<lastmod>{shard['lastmod']}</lastmod>"
+        lines.append(entry + "</sitemap>")
+    lines.append("</sitemapindex>")
+
+    index_path = os.path.join(directory, "sitemap.xml")
+    with open(index_path + ".tmp", "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+    os.replace(index_path + ".tmp", index_path)
+
+    # Manifest last: its presence means a complete, consistent build
+    manifest_path = os.path.join(directory, MANIFEST)
+    with open(manifest_path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    os.replace(manifest_path + ".tmp", manifest_path)
+
+
+# =============================
+# Staleness
+# =============================
+
+def _clear_stale(directory):
+    try:
+        os.remove(os.path.join(directory, STALE_MARKER))
+    except FileNotFoundError:
+        pass
+
+
+def mark_sitemap_stale():
+    """Flag the cached files for regeneration on the next request"""
+    open(os.path.join(sitemap_dir(), STALE_MARKER), "w").close()
+
+
+def _needs_regeneration(directory):
+    manifest_path = os.path.join(directory, MANIFEST)
+    if not os.path.exists(manifest_path):
+        return True
+    if os.path.exists(os.path.join(directory, STALE_MARKER)):
+        return True
+    return time.time() - os.path.getmtime(manifest_path) > MAX_AGE_SECONDS
+
+
+@page_cache.on_invalidate
+def _mark_stale_on_change(tags):
+    # Every content/job save invalidates its listing tag
+    if any(tag.endswith(":index") for tag in tags):
+        mark_sitemap_stale()
+
+
+def get_sitemap_file(name="sitemap.xml"):
+    """Path of an up-to-date sitemap file, or None if `name` doesn't exist"""
+    directory = sitemap_dir()
+    if _needs_regeneration(directory):
+        generate_sitemaps(force=False)
+
+    path = os.path.join(directory, name)
+    return path if os.path.exists(path) else None
@@ -0,0 +1,350 @@
+"""
+Webhook inbox
+The webhook route only verifies the signature, appends the raw event to
+webhook_inbox and answers 200, so Paystack gets its acknowledgement in a
+single INSERT however busy we are. `flask process-webhooks` runs a pool
+of workers that drain the inbox in batches.
+
+Claiming: a worker takes up to BATCH_SIZE due events with FOR UPDATE SKIP
+LOCKED and leases them (status "processing", locked_until) in a short
+transaction, then processes them outside it. Only the oldest unfinished
+event of each payment reference is claimable, so events for one order
+always apply in the order received, whichever worker gets them. A worker
+that dies leaves its lease to expire and the events are claimed again.
+
+Every claim bumps `attempts`, which doubles as the lease's fencing token:
+the lease is renewed right before each event is processed and the outcome
+is only written while the token still matches, so an event whose lease
+ran out during a slow batch is left to the worker that reclaimed it.
+
+Failures are retried with exponential backoff up to MAX_ATTEMPTS, then
+parked as "failed" with the last error for an admin to look at.
+
+Redeliveries: Paystack sends the same event more than once. Each
+(event, reference) is accepted once: a bounded per-process LRU answers
+repeats without a query, and processed_webhook_events, whose unique
+constraint is written in the same transaction as the inbox row, catches
+the ones another worker or node accepted. Duplicates never reach the
+inbox, so the handlers never see them.
+"""
+
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from sqlalchemy import and_, exists, or_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import aliased
+
+from extensions import db
+from models.order import Order
+from models.webhook_event import WebhookEvent, ProcessedWebhookEvent
+from services.email_service import send_order_confirmation
+from services.fulfillment import accept_payment, fulfill_order, transition_order
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+PROCESSING = "processing"
+DONE = "done"
+FAILED = "failed"
+
+WORKERS = int(os.getenv("WEBHOOK_WORKERS", 2))
+BATCH_SIZE = 50
+POLL_SECONDS = 1.0
+LEASE_SECONDS = 120
+MAX_ATTEMPTS = 8
+RETRY_BASE_SECONDS = 10
+RETRY_MAX_SECONDS = 3600
+SEEN_CACHE_SIZE = 10000
+
+HANDLERS = {}
+
+
+def handler(event_name):
+    """Register the function that applies `event_name` events: fn(data)"""
+    def register(fn):
+        HANDLERS[event_name] = fn
+        return fn
+    return register
+
+
+# =============================
+# Receiving
+# =============================
+
+class SeenEvents:
+    """Bounded LRU of idempotency keys this process has already accepted"""
+
+    def __init__(self, maxsize=SEEN_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._keys = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __contains__(self, key):
+        with self._lock:
+            if key not in self._keys:
+                return False
+            self._keys.move_to_end(key)
+            return True
+
+    def add(self, key):
+        with self._lock:
+            self._keys[key] = None
+            self._keys.move_to_end(key)
+            if len(self._keys) > self.maxsize:
+                self._keys.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._keys.clear()
+
+
+seen_events = SeenEvents()
+
+
+def enqueue(payload):
+    """
+    Store a verified webhook body; raises ValueError if it isn't a JSON
+    event. Returns the WebhookEvent, or None if this event was already
+    accepted for the reference (a redelivery).
+    """
+    event = json.loads(payload)
+    if not isinstance(event, dict):
+        raise ValueError("Webhook body is not a JSON object")
+    data = event.get("data") if isinstance(event.get("data"), dict) else {}
+
+    name = str(event.get("event") or "unknown")[:100]
+    reference = str(data["reference"])[:200] if data.get("reference") else None
+    # Events without a reference can't be told apart, so they are all kept
+    key = (name, reference) if reference else None
+
+    if key and key in seen_events:
+        return None
+
+    if key:
+        try:
+            # The savepoint keeps a conflict from discarding the whole session
+            with db.session.begin_nested():
+                db.session.add(ProcessedWebhookEvent(event=name, reference=reference))
+        except IntegrityError:
+            db.session.rollback()
+            seen_events.add(key)
+            return None
+
+    row = WebhookEvent(
+        event=name,
+        reference=reference,
+        payload=payload.decode("utf-8") if isinstance(payload, bytes) else payload,
+    )
+    db.session.add(row)
+    db.session.commit()
+    if key:
+        seen_events.add(key)
+    return row
+
+
+# =============================
+# Handlers
+# =============================
+
+@handler("charge.success")
+def _charge_success(data):
+    order = Order.query.filter_by(payment_reference=data.get("reference")).first()
+    if order is None:
+        logger.warning(f"charge.success for unknown reference {data.get('reference')}")
+        return
+
+    if not accept_payment(order, data):
+        db.session.commit()
+        return
+
+    # Conditional: /verify-payment may be settling the same order
+    transitioned = transition_order(order, "paid")
+    # fulfill_order commits the status change and the access grant together,
+    # and skips the grant if a previous attempt already made it
+    fulfill_order(order)
+    db.session.commit()
+
+    if transitioned:
+        send_order_confirmation(order)
+
+
+@handler("charge.failed")
+def _charge_failed(data):
+    order = Order.query.filter_by(payment_reference=data.get("reference")).first()
+    if order is not None and transition_order(order, "failed", from_statuses=("pending",)):
+        db.session.commit()
+
+
+# =============================
+# Processing
+# =============================
+
+def _retry_delay(attempts):
+    return timedelta(seconds=min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2 ** (attempts - 1)))
+
+
+def claim_batch(batch_size=BATCH_SIZE, now=None):
+    """
+    Lease up to `batch_size` due events, at most one per reference; returns
+    [(id, attempts)], attempts identifying this lease.
+    """
+    now = now or datetime.utcnow()
+    older = aliased(WebhookEvent)
+    blocked = exists().where(
+        older.reference == WebhookEvent.reference,
+        older.id < WebhookEvent.id,
+        older.status.in_((PENDING, PROCESSING)),
+    )
+    claimable = or_(
+        and_(WebhookEvent.status == PENDING, WebhookEvent.available_at <= now),
+        # Lease expired: the worker holding it died
+        and_(WebhookEvent.status == PROCESSING, WebhookEvent.locked_until < now),
+    )
+
+    candidates = [
+        row.id for row in
+        db.session.query(WebhookEvent.id)
+        .filter(claimable, ~blocked)
+        .order_by(WebhookEvent.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+        .all()
+    ]
+    if not candidates:
+        db.session.rollback()
+        return []
+
+    # Re-checked in the UPDATE itself, so where SKIP LOCKED isn't available
+    # (SQLite) two workers still never lease the same event
+    leases = db.session.execute(
+        update(WebhookEvent)
+        .where(WebhookEvent.id.in_(candidates), claimable)
+        .values(
+            status=PROCESSING,
+            locked_until=now + timedelta(seconds=LEASE_SECONDS),
+            attempts=WebhookEvent.attempts + 1,
+        )
+        .returning(WebhookEvent.id, WebhookEvent.attempts)
+    ).all()
+    db.session.commit()
+    return sorted((event_id, attempts) for event_id, attempts in leases)
+
+
+def _update_leased(event_id, attempts, **values):
+    """Write `values` to the event if this worker's lease still holds it; True if it did"""
+    result = db.session.execute(
+        update(WebhookEvent)
+        .where(
+            WebhookEvent.id == event_id,
+            WebhookEvent.status == PROCESSING,
+            WebhookEvent.attempts == attempts,
+        )
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    return result.rowcount == 1
+
+
+def _process(event):
+    fn = HANDLERS.get(event.event)
+    if fn is None:
+        return
+    payload = json.loads(event.payload)
+    fn(payload.get("data") or {})
+
+
+def process_event(event_id, attempts):
+    """
+    Apply one event leased with `attempts` and record the outcome; returns
+    its final status, or None if another worker has taken the lease over.
+    """
+    renewed = _update_leased(
+        event_id, attempts, locked_until=datetime.utcnow() + timedelta(seconds=LEASE_SECONDS)
+    )
+    if not renewed:
+        logger.warning(f"Webhook event {event_id} lease was taken over; skipping it")
+        return None
+
+    event = db.session.get(WebhookEvent, event_id)
+    try:
+        _process(event)
+    except Exception as e:
+        db.session.rollback()
+        event = db.session.get(WebhookEvent, event_id)
+        values = {"last_error": f"{e.__class__.__name__}: {e}"[:2000], "locked_until": None}
+        if attempts >= MAX_ATTEMPTS:
+            values["status"] = FAILED
+            logger.error(f"Webhook event {event.id} ({event.event} {event.reference}) failed permanently: {e}")
+        else:
+            values["status"] = PENDING
+            values["available_at"] = datetime.utcnow() + _retry_delay(attempts)
+            logger.warning(f"Webhook event {event.id} ({event.event} {event.reference}) failed, retrying: {e}")
+        if not _update_leased(event_id, attempts, **values):
+            return None
+        return values["status"]
+
+    finished = _update_leased(
+        event_id, attempts, status=DONE, processed_at=datetime.utcnow(), locked_until=None, last_error=None,
+    )
+    if not finished:
+        # Applied, but the lease ran out meanwhile; the handlers are idempotent
+        logger.warning(f"Webhook event {event_id} lease expired while it was processed")
+        return None
+    return DONE
+
+
+def process_batch(batch_size=BATCH_SIZE):
+    """Claim and process one batch; returns {status: count}"""
+    outcome = {DONE: 0, PENDING: 0, FAILED: 0}
+    for event_id, attempts in claim_batch(batch_size):
+        status = process_event(event_id, attempts)
+        if status is not None:
+            outcome[status] = outcome.get(status, 0) + 1
+    return outcome
+
+
+def run_workers(app, workers=WORKERS, interval=POLL_SECONDS, batch_size=BATCH_SIZE, stop=None):
+    """
+    Drain the inbox with `workers` threads. With interval=0 every worker
+    exits once nothing is due; otherwise they poll until `stop` is set.
+    Returns the combined {status: count}.
+    """
+    stop = stop or threading.Event()
+    totals = {DONE: 0, PENDING: 0, FAILED: 0}
+    lock = threading.Lock()
+
+    def work():
+        with app.app_context():
+            while not stop.is_set():
+                try:
+                    outcome = process_batch(batch_size)
+                except Exception as e:
+                    db.session.rollback()
+                    logger.error(f"Webhook worker batch failed: {e}")
+                    outcome = {}
+                with lock:
+                    for status, count in outcome.items():
+                        totals[status] = totals.get(status, 0) + count
+                if not any(outcome.values()):
+                    if not interval:
+                        return
+                    stop.wait(interval)
+
+    threads = [threading.Thread(target=work, name=f"webhook-worker-{n}", daemon=True) for n in range(workers)]
+    for thread in threads:
+        thread.start()
+    try:
+        for thread in threads:
+            while thread.is_alive():
+                thread.join(0.5)
+    except KeyboardInterrupt:
+        stop.set()
+        for thread in threads:
+            thread.join()
+    return totals
@@ -0,0 +1,57 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ["DATABASE_URL"] = "sqlite://"
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+os.environ.setdefault("PAYSTACK_SECRET_KEY", "sk_test_secret")
+
+from app import app as flask_app  # noqa: E402
+from extensions import db  # noqa: E402
+from models import Product  # noqa: E402
+from services.page_cache import page_cache  # noqa: E402
+
+
+@pytest.fixture
+def app():
+    flask_app.config.update(TESTING=True, MAIL_SUPPRESS_SEND=True)
+    flask_app.instance_path = tempfile.mkdtemp()
+    page_cache.journal_path = os.path.join(flask_app.instance_path, "page_cache.journal")
+    page_cache.clear(local_only=True)
+
+    with flask_app.app_context():
+        db.create_all()
+        yield flask_app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def admin_client(client):
+    with client.session_transaction() as session:
+        session["admin_logged_in"] = True
+        session["admin_id"] = 1
+    return client
+
+
+@pytest.fixture
+def product(app):
+    product = Product(
+        title="Python for Data Analysis",
+        description="Course",
+        price=5000.0,
+        product_type="course",
+        resource_link="https://example.com/course",
+    )
+    db.session.add(product)
+    db.session.commit()
+    return product
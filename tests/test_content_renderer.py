@@ -0,0 +1,50 @@
+from extensions import db
+from models import Content
+from services.content_renderer import prerender_content, render_markdown
+
+SOURCE = """
+## Tom & Jerry
+
+Cats <em>and</em> mice & friends.
+
+<script>alert("x")</script>
+
+### a < b
+
+More text.
+"""
+
+
+def test_toc_names_are_plain_text():
+    rendered = render_markdown(SOURCE)
+
+    assert [entry["name"] for entry in rendered.toc] == ["Tom & Jerry", "a < b"]
+    assert [entry["level"] for entry in rendered.toc] == [2, 3]
+
+
+def test_excerpt_is_plain_text():
+    rendered = render_markdown(SOURCE)
+
+    assert rendered.excerpt.startswith("Tom & Jerry Cats and mice & friends.")
+    assert "alert" not in rendered.excerpt
+    assert "<script" not in rendered.html
+
+
+def test_empty_source():
+    rendered = render_markdown(None)
+
+    assert rendered.toc == []
+    assert rendered.reading_time == 0
+    assert rendered.excerpt == ""
+
+
+def test_post_page_escapes_toc_once(client):
+    post = Content(title="Cartoons", slug="cartoons", content=SOURCE, content_type="blog", status="published")
+    prerender_content(post)
+    db.session.add(post)
+    db.session.commit()
+
+    page = client.get("/blog/cartoons").get_data(as_text=True)
+
+    assert '<a href="#tom-jerry">Tom &amp; Jerry</a>' in page
+    assert "&amp;amp;" not in page
@@ -0,0 +1,78 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from extensions import db
+from models import Content
+from services.page_cache import page_cache
+from utils.pagination import encode_cursor
+
+
+@pytest.fixture
+def posts(app):
+    start = datetime(2026, 1, 1)
+    rows = [
+        Content(title=f"Post {i}", slug=f"post-{i}", content="Body", content_type="blog",
+                status="published", created_at=start + timedelta(hours=i))
+        for i in range(30)
+    ]
+    db.session.add_all(rows)
+    db.session.commit()
+    return rows
+
+
+def _entries():
+    return page_cache.stats()["entries"]
+
+
+@pytest.mark.parametrize("path", ["/blog", "/blog/"])
+def test_first_page_is_cached(client, posts, path):
+    assert client.get(path).status_code == 200
+    assert _entries() == 1
+    hits = page_cache.hits
+    assert client.get(path).status_code == 200
+    assert page_cache.hits == hits + 1
+
+
+def test_linked_cursor_is_cached(client, posts):
+    cursor = encode_cursor(posts[18].created_at, posts[18].id)
+
+    page = client.get(f"/blog?cursor={cursor}").get_data(as_text=True)
+    assert "Post 17" in page and "Post 18" not in page
+    assert _entries() == 1
+
+    # Padded: the same position, so the same entry
+    assert client.get(f"/blog?cursor={cursor}==").status_code == 200
+    assert _entries() == 1
+
+
+def test_made_up_cursor_is_not_cached(client, posts):
+    cursor = encode_cursor(datetime(2026, 1, 1, 12, 30), 99999)
+
+    page = client.get(f"/blog?cursor={cursor}").get_data(as_text=True)
+    assert "Post 12" in page and "Post 13" not in page
+    assert _entries() == 0
+
+
+def test_cursor_of_another_type_is_not_cached(client, posts):
+    news = Content(title="News", slug="news-1", content="Body", content_type="news", status="published")
+    db.session.add(news)
+    db.session.commit()
+
+    assert client.get(f"/blog?cursor={encode_cursor(news.created_at, news.id)}").status_code == 200
+    assert _entries() == 0
+
+
+@pytest.mark.parametrize("cursor", ["garbage", "!!!", "bm90IGEgY3Vyc29y"])
+def test_garbled_cursor_is_rejected(client, posts, cursor):
+    for path in ("/blog", "/blog/", "/news", "/news/"):
+        assert client.get(f"{path}?cursor={cursor}").status_code == 400
+    assert _entries() == 0
+
+
+def test_admin_edit_drops_listing(client, posts):
+    client.get("/blog")
+    assert _entries() == 1
+
+    page_cache.invalidate("blog:index")
+    assert _entries() == 0
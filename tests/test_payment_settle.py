@@ -0,0 +1,121 @@
+import pytest
+
+import routes.order_routes as order_routes
+import services.payment_verification_service as verification
+from extensions import db
+from models import Order, UserAccess
+
+
+class StubPaystack:
+    """Answers verify_transaction from `transactions`, keyed by reference"""
+
+    def __init__(self):
+        self.transactions = {}
+        self.initialized = []
+        self.verifications = 0
+
+    def initialize_transaction(self, email, amount, reference, callback_url, metadata=None):
+        self.initialized.append({"email": email, "amount": amount, "reference": reference})
+        return {"authorization_url": f"https://checkout.example/{reference}", "reference": reference}
+
+    def verify_transaction(self, reference, deadline=None):
+        self.verifications += 1
+        return self.transactions[reference]
+
+    def charge(self, reference, status="success", amount=None, currency="NGN"):
+        initialized = next(t for t in self.initialized if t["reference"] == reference)
+        self.transactions[reference] = {
+            "reference": reference,
+            "status": status,
+            "amount": initialized["amount"] if amount is None else amount,
+            "currency": currency,
+        }
+
+
+@pytest.fixture
+def paystack(app, monkeypatch):
+    stub = StubPaystack()
+    monkeypatch.setattr(order_routes, "get_paystack_client", lambda: stub)
+    monkeypatch.setattr(verification, "get_paystack_client", lambda: stub)
+    monkeypatch.setattr(verification, "_cache", {})
+    return stub
+
+
+def _checkout(client, product, **form):
+    response = client.post(f"/create-order/{product.id}", data={"email": "ada@example.com", **form})
+    assert response.status_code == 302
+    return Order.query.filter_by(product_id=product.id).order_by(Order.id.desc()).first()
+
+
+def test_checkout_charges_the_product_price(client, product, paystack):
+    order = _checkout(client, product, amount="0.01")
+
+    assert order.amount == 5000.0
+    assert paystack.initialized[-1]["amount"] == 500000
+
+
+def test_matching_payment_is_fulfilled(client, product, paystack):
+    order = _checkout(client, product)
+    paystack.charge(order.payment_reference)
+
+    response = client.get(f"/verify-payment?reference={order.payment_reference}")
+
+    assert response.status_code == 200
+    assert product.resource_link in response.get_data(as_text=True)
+    assert response.headers["Cache-Control"] == "private, no-store"
+    db.session.refresh(order)
+    assert order.status == "paid"
+    assert UserAccess.query.filter_by(order_id=order.id).count() == 1
+
+
+@pytest.mark.parametrize("amount, currency", [(1, "NGN"), (500000, "USD")])
+def test_mismatched_payment_is_not_fulfilled(client, product, paystack, amount, currency):
+    order = _checkout(client, product)
+    paystack.charge(order.payment_reference, amount=amount, currency=currency)
+
+    response = client.get(f"/verify-payment?reference={order.payment_reference}")
+
+    assert response.status_code == 402
+    db.session.refresh(order)
+    assert order.status == "failed"
+    assert UserAccess.query.count() == 0
+    assert client.get(f"/api/order-status/{order.payment_reference}").get_json() == {"status": "failed"}
+
+
+def test_status_poll_settles_a_matching_payment(client, product, paystack):
+    order = _checkout(client, product)
+    paystack.charge(order.payment_reference)
+
+    assert client.get(f"/api/order-status/{order.payment_reference}").get_json() == {"status": "paid"}
+    assert UserAccess.query.filter_by(order_id=order.id).count() == 1
+
+
+def test_paid_order_skips_paystack(client, product, paystack):
+    order = _checkout(client, product)
+    paystack.charge(order.payment_reference)
+    client.get(f"/api/order-status/{order.payment_reference}")
+    calls = paystack.verifications
+
+    assert client.get(f"/api/order-status/{order.payment_reference}").get_json() == {"status": "paid"}
+    assert paystack.verifications == calls
+
+
+def test_failed_payment(client, product, paystack):
+    order = _checkout(client, product)
+    paystack.charge(order.payment_reference, status="failed")
+
+    assert client.get(f"/verify-payment?reference={order.payment_reference}").status_code == 402
+    db.session.refresh(order)
+    assert order.status == "failed"
+
+
+def test_only_the_buyer_sees_the_resource(app, client, product, paystack):
+    order = _checkout(client, product)
+    paystack.charge(order.payment_reference)
+    client.get(f"/verify-payment?reference={order.payment_reference}")
+
+    stranger = app.test_client()
+    response = stranger.get(f"/access/{order.payment_reference}")
+
+    assert response.status_code == 200
+    assert product.resource_link not in response.get_data(as_text=True)
@@ -0,0 +1,86 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from extensions import db
+from models import Content
+from services.content_stats_service import get_content_stats
+from services.page_cache import PageCache, page_cache
+from services.publishing_service import SCHEDULED, publish_due
+
+
+@pytest.fixture
+def other_worker(app):
+    """A second worker's cache, reading the same journal"""
+    worker = PageCache(journal_path=page_cache.journal_path)
+    worker._journal_offset = 0
+    return worker
+
+
+def _schedule(slug, minutes=-1):
+    post = Content(
+        title=slug.replace("-", " ").title(), slug=slug, content=f"# {slug}\n\nBody", content_type="blog",
+        status=SCHEDULED, publish_at=datetime.utcnow() + timedelta(minutes=minutes),
+    )
+    db.session.add(post)
+    db.session.commit()
+    return post
+
+
+def test_publishes_due_items_only(app):
+    due = _schedule("due-post")
+    later = _schedule("later-post", minutes=60)
+
+    assert publish_due() == 1
+    db.session.refresh(due)
+    db.session.refresh(later)
+    assert due.status == "published"
+    assert due.content_html
+    assert later.status == SCHEDULED
+    assert publish_due() == 0
+
+
+def test_pages_are_staged_for_every_worker(client, other_worker):
+    _schedule("old-post", minutes=-10)
+    publish_due()
+
+    # Both workers serve the listing from cache before the next publish
+    listing = client.get("/blog").get_data()
+    other_worker.set(("blog_index", None), listing, tags=["blog:index"])
+    assert b"Old Post" in listing
+
+    _schedule("new-post")
+    publish_due()
+
+    for cache in (page_cache, other_worker):
+        index = cache.get(("blog_index", None))
+        assert index is not None and b"New Post" in index.body
+        assert cache.get(("blog_post", "new-post")) is not None
+        assert cache.get(("blog_home", None)) is not None
+        assert cache.get(("feed", "blog")) is not None
+
+    hits = page_cache.hits
+    response = client.get("/blog/new-post")
+    assert response.status_code == 200 and b"New Post" in response.data
+    assert page_cache.hits == hits + 1
+
+
+def test_later_invalidation_wins_over_staged_page(app, other_worker):
+    _schedule("new-post")
+    publish_due()
+    page_cache.invalidate("blog:index")
+
+    assert other_worker.get(("blog_index", None)) is None
+    assert other_worker.get(("blog_post", "new-post")) is not None
+
+
+def test_content_stats_follow_other_workers(app, other_worker):
+    _schedule("new-post")
+    assert get_content_stats()["published"] == 0
+
+    Content.query.update({"status": "published"})
+    db.session.commit()
+    assert get_content_stats()["published"] == 0
+
+    other_worker.invalidate("blog:index")
+    assert get_content_stats()["published"] == 1
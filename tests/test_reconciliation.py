@@ -0,0 +1,85 @@
+from extensions import db
+from models import Order, UserAccess
+from services.reconciliation_service import reconcile_payments
+
+
+class StubPaystack:
+    def __init__(self, transactions):
+        self.transactions = transactions
+
+    def list_transactions(self, page=1, per_page=100, start=None, end=None, **kwargs):
+        offset = (page - 1) * per_page
+        page_count = max(1, -(-len(self.transactions) // per_page))
+        return self.transactions[offset:offset + per_page], {"pageCount": page_count}
+
+
+def _order(product, reference, status="pending"):
+    order = Order(customer_email=f"{reference}@example.com", product_id=product.id,
+                  payment_reference=reference, status=status)
+    db.session.add(order)
+    return order
+
+
+def _transaction(reference, status="success", amount=500000, currency="NGN"):
+    return {"reference": reference, "status": status, "amount": amount, "currency": currency}
+
+
+def test_reconcile_checks_amounts(product):
+    _order(product, "PAID")
+    _order(product, "RETRIED", status="failed")
+    _order(product, "UNDERPAID")
+    _order(product, "OTHER-CURRENCY")
+    _order(product, "DECLINED")
+    db.session.commit()
+
+    client = StubPaystack([
+        _transaction("PAID"),
+        _transaction("RETRIED"),
+        _transaction("UNDERPAID", amount=100),
+        _transaction("OTHER-CURRENCY", currency="USD"),
+        _transaction("DECLINED", status="failed"),
+        _transaction("NOT-OURS"),
+    ])
+
+    report = reconcile_payments(client=client, notify=False, per_page=2, workers=2)
+
+    assert report["errors"] == []
+    assert report["pages"] == 3
+    assert report["unknown"] == 1
+    assert report["paid"] == 2
+    assert report["failed"] == 1
+    assert report["mismatched"] == 2
+    assert report["granted"] == 2
+
+    statuses = dict(db.session.query(Order.payment_reference, Order.status))
+    assert statuses == {
+        "PAID": "paid",
+        "RETRIED": "paid",
+        "UNDERPAID": "pending",
+        "OTHER-CURRENCY": "pending",
+        "DECLINED": "failed",
+    }
+    granted = {access.customer_email for access in UserAccess.query}
+    assert granted == {"PAID@example.com", "RETRIED@example.com"}
+
+
+def test_reconcile_is_idempotent(product):
+    _order(product, "PAID")
+    db.session.commit()
+    client = StubPaystack([_transaction("PAID")])
+
+    assert reconcile_payments(client=client, notify=False)["paid"] == 1
+    second = reconcile_payments(client=client, notify=False)
+    assert second["paid"] == 0
+    assert second["granted"] == 0
+
+
+def test_dry_run_changes_nothing(product):
+    _order(product, "PAID")
+    db.session.commit()
+
+    report = reconcile_payments(client=StubPaystack([_transaction("PAID")]), notify=False, dry_run=True)
+
+    assert report["paid"] == 1
+    assert Order.query.one().status == "pending"
+    assert UserAccess.query.count() == 0
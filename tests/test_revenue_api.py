@@ -0,0 +1,54 @@
+from datetime import datetime, timedelta
+
+from extensions import db
+from models import Order
+
+
+def test_requires_admin(client):
+    assert client.get("/control-panel/api/revenue").status_code == 302
+
+
+def test_daily_series(admin_client, product):
+    db.session.add(Order(customer_email="ada@example.com", product_id=product.id, status="paid"))
+    db.session.commit()
+    today = datetime.utcnow().date()
+
+    response = admin_client.get(
+        f"/control-panel/api/revenue?start={today}&end={today + timedelta(days=1)}"
+    )
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["total_orders"] == 1
+    assert body["total_revenue"] == 5000.0
+    assert len(body["points"]) == 1
+
+
+def test_offset_datetimes_are_taken_as_utc(admin_client):
+    response = admin_client.get(
+        "/control-panel/api/revenue?granularity=hour"
+        "&start=2026-01-01T02:00:00%2B02:00&end=2026-01-01T03:00:00Z"
+    )
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["start"] == "2026-01-01T00:00:00"
+    assert body["end"] == "2026-01-01T03:00:00"
+    assert len(body["points"]) == 3
+
+
+def test_mixed_naive_and_aware(admin_client):
+    response = admin_client.get(
+        "/control-panel/api/revenue?start=2026-01-01T00:00:00%2B00:00&end=2026-01-03"
+    )
+
+    assert response.status_code == 200
+    assert len(response.get_json()["points"]) == 2
+
+
+def test_bad_input_is_a_400(admin_client):
+    assert admin_client.get("/control-panel/api/revenue?start=yesterday").status_code == 400
+    assert admin_client.get("/control-panel/api/revenue?granularity=year").status_code == 400
+    assert admin_client.get(
+        "/control-panel/api/revenue?start=2026-01-02&end=2026-01-01"
+    ).status_code == 400
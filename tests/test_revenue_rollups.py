@@ -0,0 +1,72 @@
+from sqlalchemy import func, select
+
+from extensions import db
+from models import Order, RevenueHourlyRollup, RevenueRollup
+from services.fulfillment import transition_order
+from services.revenue_service import rebuild_revenue_rollups
+
+
+def _buckets():
+    rows = {}
+    for model in (RevenueRollup, RevenueHourlyRollup):
+        rows[model.__tablename__] = sorted(
+            (row.product_type, row.status, row.order_count, round(row.revenue, 2))
+            for row in db.session.execute(select(model)).scalars()
+            if row.order_count or row.revenue
+        )
+    return rows
+
+
+def _revenue(status):
+    return db.session.scalar(
+        select(func.coalesce(func.sum(RevenueRollup.revenue), 0.0)).where(RevenueRollup.status == status)
+    )
+
+
+def test_order_snapshots_product_price_and_type(product):
+    order = Order(customer_email="ada@example.com", product_id=product.id)
+    db.session.add(order)
+    db.session.commit()
+
+    assert order.amount == 5000.0
+    assert order.product_type == "course"
+    assert _revenue("pending") == 5000.0
+
+
+def test_price_change_does_not_skew_status_moves(product):
+    order = Order(customer_email="ada@example.com", product_id=product.id)
+    db.session.add(order)
+    db.session.commit()
+
+    product.price = 7500.0
+    product.product_type = "ebook"
+    db.session.commit()
+
+    order.status = "paid"
+    db.session.commit()
+
+    assert _revenue("pending") == 0.0
+    assert _revenue("paid") == 5000.0
+
+    incremental = _buckets()
+    rebuild_revenue_rollups()
+    assert _buckets() == incremental
+
+
+def test_core_transition_uses_snapshot(product):
+    order = Order(customer_email="ada@example.com", product_id=product.id)
+    db.session.add(order)
+    db.session.commit()
+
+    product.price = 100.0
+    db.session.commit()
+
+    assert transition_order(order, "paid")
+    db.session.commit()
+
+    assert _revenue("pending") == 0.0
+    assert _revenue("paid") == 5000.0
+
+    incremental = _buckets()
+    rebuild_revenue_rollups()
+    assert _buckets() == incremental
@@ -0,0 +1,62 @@
+import threading
+
+from extensions import db
+from models import Content
+from services import sitemap_service
+
+
+class FakeMsvcrt:
+    """msvcrt.locking on top of a process-wide lock, to run the Windows path here"""
+    LK_LOCK = 1
+    LK_UNLCK = 0
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = []
+
+    def locking(self, fd, mode, nbytes):
+        self.calls.append(mode)
+        if mode == self.LK_LOCK:
+            if not self._lock.acquire(timeout=0.01):
+                raise OSError("deadlock avoided")
+        else:
+            self._lock.release()
+
+
+def _publish(slug):
+    db.session.add(Content(title=slug, slug=slug, content="Body", content_type="blog", status="published"))
+    db.session.commit()
+
+
+def test_sitemap_lists_published_content(client):
+    _publish("hello-world")
+
+    response = client.get("/sitemap.xml")
+    assert response.status_code == 200
+    assert b"/sitemap-1.xml" in response.data
+
+    shard = client.get("/sitemap-1.xml").get_data(as_text=True)
+    assert "/blog/hello-world" in shard
+
+
+def test_waiters_reuse_a_fresh_build(app):
+    first = sitemap_service.generate_sitemaps()
+
+    assert sitemap_service.generate_sitemaps(force=False) == first
+
+
+def test_lock_without_fcntl(app, monkeypatch):
+    fake = FakeMsvcrt()
+    monkeypatch.setattr(sitemap_service, "fcntl", None)
+    monkeypatch.setattr(sitemap_service, "msvcrt", fake, raising=False)
+    _publish("hello-world")
+
+    # Held elsewhere for a moment: the first LK_LOCK times out and is retried
+    fake._lock.acquire()
+    threading.Timer(0.05, fake._lock.release).start()
+
+    manifest = sitemap_service.generate_sitemaps()
+
+    assert manifest["urls"] > 1
+    assert fake.calls[-1] == FakeMsvcrt.LK_UNLCK
+    assert fake.calls.count(FakeMsvcrt.LK_LOCK) > 1
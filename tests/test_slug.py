@@ -0,0 +1,96 @@
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from extensions import db
+from models import Content
+from utils.slug import (
+    MAX_ATTEMPTS, SlugAllocationError, allocate_slug, generate_slug, slug_candidates, stable_slug,
+)
+
+
+def _post(title="Weekly roundup", **fields):
+    return Content(title=title, content="Body", content_type="blog", **fields)
+
+
+def test_generate_slug():
+    assert generate_slug("  Hello, World! 2026 ") == "hello-world-2026"
+    assert generate_slug(None) == ""
+
+
+def test_candidates_are_deterministic_and_short():
+    first = list(slug_candidates("roundup", "blog"))
+
+    assert first == list(slug_candidates("roundup", "blog"))
+    assert first != list(slug_candidates("roundup", "news"))
+    assert first[0] == "roundup"
+    assert len(set(first)) == MAX_ATTEMPTS
+    assert all(len(candidate) <= len("roundup") + 8 for candidate in first)
+
+
+def test_stable_slug_is_the_first_suffixed_candidate():
+    candidates = slug_candidates("senior-engineer", "board:42")
+    next(candidates)
+
+    assert stable_slug("Senior Engineer", "board:42") == next(candidates)
+
+
+def test_first_row_gets_the_bare_slug(app):
+    post = _post()
+
+    assert allocate_slug(post, post.title, salt="blog") == "weekly-roundup"
+    db.session.commit()
+    assert Content.query.one().slug == "weekly-roundup"
+
+
+def test_repeated_titles_walk_the_same_suffixes(app):
+    expected = list(slug_candidates("weekly-roundup", "blog"))[:20]
+
+    slugs = []
+    for _ in range(20):
+        post = _post()
+        slugs.append(allocate_slug(post, post.title, salt="blog"))
+        db.session.commit()
+
+    assert slugs == expected
+    assert Content.query.count() == 20
+
+
+def test_conflict_keeps_the_rest_of_the_transaction(app):
+    db.session.add(_post(slug="weekly-roundup"))
+    db.session.commit()
+
+    other = _post("Unrelated", slug="unrelated")
+    db.session.add(other)
+    post = _post()
+    slug = allocate_slug(post, post.title, salt="blog")
+    db.session.commit()
+
+    assert slug != "weekly-roundup"
+    assert {row.slug for row in Content.query} == {"weekly-roundup", "unrelated", slug}
+
+
+def test_exhausted_candidates(app):
+    for candidate in slug_candidates("weekly-roundup", "blog", attempts=3):
+        db.session.add(_post(slug=candidate))
+    db.session.commit()
+
+    post = _post()
+    with pytest.raises(SlugAllocationError):
+        allocate_slug(post, post.title, salt="blog", max_attempts=3)
+    assert post not in db.session
+
+    db.session.rollback()
+    assert Content.query.count() == 3
+
+
+def test_other_integrity_errors_are_raised(app):
+    post = Content(title="No body", content=None, content_type="blog")
+
+    with pytest.raises(IntegrityError):
+        allocate_slug(post, post.title)
+
+
+def test_empty_title_falls_back_to_the_table_name(app):
+    post = _post("!!!")
+
+    assert allocate_slug(post, post.title) == "content"
@@ -0,0 +1,135 @@
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from extensions import db
+from models import Order, UserAccess, WebhookEvent
+from services import webhook_inbox_service as inbox
+
+
+@pytest.fixture(autouse=True)
+def fresh_seen_events():
+    inbox.seen_events.clear()
+    yield
+    inbox.seen_events.clear()
+
+
+@pytest.fixture
+def order(product):
+    order = Order(customer_email="ada@example.com", product_id=product.id, payment_reference="REF-1")
+    db.session.add(order)
+    db.session.commit()
+    return order
+
+
+def _payload(event, reference="REF-1", amount=500000, currency="NGN"):
+    return json.dumps({
+        "event": event,
+        "data": {"reference": reference, "amount": amount, "currency": currency, "status": "success"},
+    })
+
+
+def _lease_expired():
+    return datetime.utcnow() + timedelta(seconds=inbox.LEASE_SECONDS + 1)
+
+
+def test_redelivery_is_dropped(app):
+    assert inbox.enqueue(_payload("charge.success")) is not None
+    assert inbox.enqueue(_payload("charge.success")) is None
+
+    # Another worker: not in this process's LRU, caught by the constraint
+    inbox.seen_events.clear()
+    assert inbox.enqueue(_payload("charge.success")) is None
+    assert WebhookEvent.query.count() == 1
+
+
+def test_invalid_payload(app):
+    with pytest.raises(ValueError):
+        inbox.enqueue("[1, 2]")
+
+
+def test_claim_leases_an_event_once(app):
+    event = inbox.enqueue(_payload("charge.success"))
+
+    assert inbox.claim_batch() == [(event.id, 1)]
+    assert inbox.claim_batch() == []
+
+
+def test_one_event_per_reference_at_a_time(app):
+    first = inbox.enqueue(_payload("charge.failed"))
+    second = inbox.enqueue(_payload("charge.success"))
+    other = inbox.enqueue(_payload("charge.success", reference="REF-2"))
+
+    assert inbox.claim_batch() == [(first.id, 1), (other.id, 1)]
+    assert inbox.process_event(first.id, 1) == inbox.DONE
+    assert inbox.claim_batch() == [(second.id, 1)]
+
+
+def test_expired_lease_is_reclaimed_and_the_old_holder_fenced(order):
+    event = inbox.enqueue(_payload("charge.success"))
+    assert inbox.claim_batch() == [(event.id, 1)]
+    assert inbox.claim_batch(now=_lease_expired()) == [(event.id, 2)]
+
+    assert inbox.process_event(event.id, 1) is None
+    db.session.refresh(order)
+    assert order.status == "pending"
+
+    assert inbox.process_event(event.id, 2) == inbox.DONE
+    db.session.refresh(order)
+    assert order.status == "paid"
+
+
+def test_lease_taken_over_while_processing(app, monkeypatch):
+    event = inbox.enqueue(_payload("test.slow"))
+    monkeypatch.setitem(inbox.HANDLERS, "test.slow", lambda data: inbox.claim_batch(now=_lease_expired()))
+    assert inbox.claim_batch() == [(event.id, 1)]
+
+    assert inbox.process_event(event.id, 1) is None
+
+    db.session.refresh(event)
+    assert event.status == inbox.PROCESSING
+    assert event.attempts == 2
+    assert event.processed_at is None
+
+
+def test_failures_back_off_then_park(app, monkeypatch):
+    def explode(data):
+        raise RuntimeError("boom")
+
+    monkeypatch.setitem(inbox.HANDLERS, "test.broken", explode)
+    event = inbox.enqueue(_payload("test.broken"))
+
+    [(event_id, attempts)] = inbox.claim_batch()
+    assert inbox.process_event(event_id, attempts) == inbox.PENDING
+    db.session.refresh(event)
+    assert event.last_error == "RuntimeError: boom"
+    assert event.available_at > datetime.utcnow()
+    assert inbox.claim_batch() == []
+
+    for attempt in range(2, inbox.MAX_ATTEMPTS + 1):
+        [(event_id, attempts)] = inbox.claim_batch(now=datetime.utcnow() + timedelta(days=1))
+        assert attempts == attempt
+        status = inbox.process_event(event_id, attempts)
+    assert status == inbox.FAILED
+
+
+def test_charge_success_fulfils_the_order(order):
+    event = inbox.enqueue(_payload("charge.success"))
+    [(event_id, attempts)] = inbox.claim_batch()
+
+    assert inbox.process_event(event_id, attempts) == inbox.DONE
+    db.session.refresh(order)
+    assert order.status == "paid"
+    assert UserAccess.query.filter_by(order_id=order.id).count() == 1
+
+
+@pytest.mark.parametrize("amount, currency", [(100, "NGN"), (500000, "GHS")])
+def test_charge_success_for_another_amount_is_not_fulfilled(order, amount, currency):
+    inbox.enqueue(_payload("charge.success", amount=amount, currency=currency))
+    [(event_id, attempts)] = inbox.claim_batch()
+
+    assert inbox.process_event(event_id, attempts) == inbox.DONE
+    db.session.refresh(order)
+    assert order.status == "failed"
+    assert UserAccess.query.count() == 0
@@ -0,0 +1,127 @@
+"""
+Local caching-proxy stand-in
+A tiny shared cache for exercising Cache-Control, conditional GET and
+Surrogate-Key purging without a real CDN or Varnish.
+
+    python -m tools.caching_proxy --upstream http://127.0.0.1:5000 --port 8080
+    CACHE_PURGE_URLS=http://127.0.0.1:8080 flask run
+
+GET responses with `public` Cache-Control are stored for s-maxage seconds
+and tagged with their Surrogate-Key header. Stale entries are revalidated
+upstream with If-None-Match. `PURGE /` with a Surrogate-Key header drops
+every entry carrying one of the keys. Responses carry X-Cache: HIT|MISS|REVALIDATED.
+"""
+
+import argparse
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+HOP_HEADERS = {"connection", "keep-alive", "transfer-encoding", "content-encoding", "content-length"}
+
+
+class ProxyCache:
+    def __init__(self):
+        self.entries = {}
+        self.lock = threading.Lock()
+        self.purges = 0
+
+    def get(self, path):
+        with self.lock:
+            return self.entries.get(path)
+
+    def store(self, path, status, headers, body):
+        cache_control = headers.get("Cache-Control", "")
+        if status != 200 or "public" not in cache_control:
+            return
+
+        match = re.search(r"s-maxage=(\d+)", cache_control) or re.search(r"max-age=(\d+)", cache_control)
+        ttl = int(match.group(1)) if match else 0
+        keys = set(headers.get("Surrogate-Key", "").split())
+
+        with self.lock:
+            self.entries[path] = {
+                "headers": headers,
+                "body": body,
+                "keys": keys,
+                "expires": time.time() + ttl,
+            }
+
+    def purge(self, keys):
+        keys = set(keys)
+        with self.lock:
+            doomed = [path for path, entry in self.entries.items() if entry["keys"] & keys]
+            for path in doomed:
+                del self.entries[path]
+            self.purges += 1
+        return len(doomed)
+
+
+def make_handler(upstream, cache):
+    session = requests.Session()
+
+    class Handler(BaseHTTPRequestHandler):
+        def _reply(self, status, headers, body, cache_state):
+            self.send_response(status)
+            for name, value in headers.items():
+                if name.lower() not in HOP_HEADERS:
+                    self.send_header(name, value)
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("X-Cache", cache_state)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            entry = cache.get(self.path)
+            if entry and entry["expires"] > time.time():
+                return self._reply(200, entry["headers"], entry["body"], "HIT")
+
+            headers = {"Cookie": self.headers.get("Cookie", "")} if self.headers.get("Cookie") else {}
+            if entry and entry["headers"].get("ETag"):
+                headers["If-None-Match"] = entry["headers"]["ETag"]
+
+            response = session.get(upstream + self.path, headers=headers, allow_redirects=False)
+            if response.status_code == 304 and entry:
+                cache.store(self.path, 200, {**entry["headers"], **response.headers}, entry["body"])
+                return self._reply(200, entry["headers"], entry["body"], "REVALIDATED")
+
+            response_headers = dict(response.headers)
+            cache.store(self.path, response.status_code, response_headers, response.content)
+            return self._reply(response.status_code, response_headers, response.content, "MISS")
+
+        def do_PURGE(self):
+            keys = (self.headers.get("Surrogate-Key") or self.headers.get("xkey-purge") or "").split()
+            dropped = cache.purge(keys)
+            body = f"purged {dropped}\n".encode()
+            self._reply(200, {"Content-Type": "text/plain"}, body, "PURGE")
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def serve(upstream, host="127.0.0.1", port=8080):
+    """Start the proxy in a background thread; returns (server, cache)"""
+    cache = ProxyCache()
+    server = ThreadingHTTPServer((host, port), make_handler(upstream.rstrip("/"), cache))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, cache
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--upstream", default="http://127.0.0.1:5000")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    args = parser.parse_args()
+
+    server, _ = serve(args.upstream, args.host, args.port)
+    print(f"Caching proxy on http://{args.host}:{args.port} -> {args.upstream}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,293 @@
+"""
+Local Paystack stand-in
+Implements the transaction endpoints the app uses, with configurable
+latency and faults, for tests and benchmarks without the real API.
+
+    python -m tools.fake_paystack --port 8070 --latency 0.2 --error-rate 0.1
+    PAYSTACK_BASE_URL=http://127.0.0.1:8070 flask run
+
+API (Bearer auth with --secret-key when given):
+    POST /transaction/initialize       start a checkout
+    GET  /transaction/verify/<ref>     transaction status
+    GET  /transaction?page=&perPage=   transaction list, newest first
+Browser:
+    GET  /checkout/<ref>?outcome=success|failed
+        completes the payment, posts a signed charge.* webhook to
+        --webhook-url if set, and redirects to the callback URL
+Control (never faulted):
+    POST /_fake/config        {"latency": 0.5, "error_rate": 0.2, ...}
+    POST /_fake/transactions  [{"reference", "amount", "email", "status"}, ...]
+    GET  /_fake/stats         request counts per endpoint
+"""
+
+import argparse
+import hashlib
+import hmac
+import itertools
+import json
+import random
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs, urlencode
+
+import requests
+
+DEFAULT_CONFIG = {
+    "latency": 0.0,  # seconds added to every API response
+    "jitter": 0.0,  # up to this many extra seconds, uniformly
+    "error_rate": 0.0,  # fraction of API calls answered 503
+    "timeout_rate": 0.0,  # fraction of API calls that stall for `stall_seconds`
+    "stall_seconds": 30.0,
+    "rate_limit_rate": 0.0,  # fraction of API calls answered 429 with Retry-After
+}
+
+
+def sign(payload, secret_key):
+    """x-paystack-signature for a webhook body"""
+    return hmac.new(secret_key.encode(), payload, hashlib.sha512).hexdigest()
+
+
+def _now():
+    return datetime.utcnow().replace(microsecond=0).isoformat() + ".000Z"
+
+
+class FakePaystack:
+    """Transactions and fault settings shared by the handler threads"""
+
+    def __init__(self, secret_key=None, webhook_url=None, base_url="", **config):
+        self.secret_key = secret_key
+        self.webhook_url = webhook_url
+        self.base_url = base_url
+        self.config = {**DEFAULT_CONFIG, **config}
+        self.transactions = {}
+        self.hits = Counter()
+        self.lock = threading.Lock()
+        self._ids = itertools.count(1)
+
+    def configure(self, **config):
+        with self.lock:
+            self.config.update({key: value for key, value in config.items() if key in DEFAULT_CONFIG})
+
+    def add(self, reference, amount, email, status="abandoned", callback_url=None, metadata=None):
+        transaction = {
+            "id": next(self._ids),
+            "reference": reference,
+            "amount": int(amount),
+            "currency": "NGN",
+            "status": status,
+            "gateway_response": "Successful" if status == "success" else "The transaction was not completed",
+            "paid_at": _now() if status == "success" else None,
+            "created_at": _now(),
+            "channel": "card",
+            "customer": {"email": email},
+            "metadata": metadata or {},
+            "callback_url": callback_url,
+        }
+        with self.lock:
+            self.transactions[reference] = transaction
+        return transaction
+
+    def charge(self, reference, status="success"):
+        """Settle a transaction as if the customer paid (or failed); sends the webhook"""
+        with self.lock:
+            transaction = self.transactions[reference]
+            transaction["status"] = status
+            transaction["paid_at"] = _now() if status == "success" else None
+            transaction["gateway_response"] = "Successful" if status == "success" else "Declined"
+        self.send_webhook(reference)
+        return transaction
+
+    def webhook_body(self, reference):
+        transaction = self.transactions[reference]
+        event = "charge.success" if transaction["status"] == "success" else "charge.failed"
+        data = {key: value for key, value in transaction.items() if key != "callback_url"}
+        return json.dumps({"event": event, "data": data}).encode()
+
+    def send_webhook(self, reference):
+        if not self.webhook_url:
+            return None
+        body = self.webhook_body(reference)
+        headers = {"Content-Type": "application/json"}
+        if self.secret_key:
+            headers["x-paystack-signature"] = sign(body, self.secret_key)
+        try:
+            return requests.post(self.webhook_url, data=body, headers=headers, timeout=10).status_code
+        except requests.RequestException:
+            return None
+
+    def listing(self, page, per_page, status=None, start=None, end=None):
+        with self.lock:
+            rows = [t for t in reversed(list(self.transactions.values())) if not status or t["status"] == status]
+        if start:
+            rows = [t for t in rows if t["created_at"] >= start]
+        if end:
+            rows = [t for t in rows if t["created_at"] <= end]
+        total = len(rows)
+        items = rows[(page - 1) * per_page:page * per_page]
+        meta = {
+            "total": total, "skipped": (page - 1) * per_page, "perPage": per_page,
+            "page": page, "pageCount": -(-total // per_page) if per_page else 0,
+        }
+        return [{k: v for k, v in t.items() if k != "callback_url"} for t in items], meta
+
+
+def make_handler(state):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _json(self, status, body, headers=None):
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _body(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            return json.loads(self.rfile.read(length) or b"null") if length else None
+
+        def _fault(self):
+            """Apply configured latency and faults; True if a response was already sent"""
+            config = dict(state.config)
+            time.sleep(config["latency"] + random.uniform(0, config["jitter"]))
+
+            roll = random.random()
+            if roll < config["timeout_rate"]:
+                time.sleep(config["stall_seconds"])
+                return False
+            roll -= config["timeout_rate"]
+            if roll < config["error_rate"]:
+                self._json(503, {"status": False, "message": "Service unavailable"})
+                return True
+            roll -= config["error_rate"]
+            if roll < config["rate_limit_rate"]:
+                self._json(429, {"status": False, "message": "Too many requests"}, {"Retry-After": "1"})
+                return True
+            return False
+
+        def _authorized(self):
+            if state.secret_key and self.headers.get("Authorization") != f"Bearer {state.secret_key}":
+                self._json(401, {"status": False, "message": "Invalid key"})
+                return False
+            return True
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            query = {key: values[0] for key, values in parse_qs(url.query).items()}
+            parts = url.path.strip("/").split("/")
+
+            if url.path == "/_fake/stats":
+                return self._json(200, {"hits": dict(state.hits), "transactions": len(state.transactions)})
+
+            if parts[0] == "checkout" and len(parts) == 2:
+                state.hits["checkout"] += 1
+                reference = parts[1]
+                if reference not in state.transactions:
+                    return self._json(404, {"status": False, "message": "Transaction not found"})
+                transaction = state.charge(reference, query.get("outcome", "success"))
+                location = (transaction["callback_url"] or "/") + "?" + urlencode(
+                    {"trxref": reference, "reference": reference})
+                self.send_response(302)
+                self.send_header("Location", location)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+
+            if parts[:2] == ["transaction", "verify"] and len(parts) == 3:
+                state.hits["verify"] += 1
+                if not self._authorized() or self._fault():
+                    return
+                transaction = state.transactions.get(parts[2])
+                if not transaction:
+                    return self._json(400, {"status": False, "message": "Transaction reference not found"})
+                data = {k: v for k, v in transaction.items() if k != "callback_url"}
+                return self._json(200, {"status": True, "message": "Verification successful", "data": data})
+
+            if parts == ["transaction"]:
+                state.hits["list"] += 1
+                if not self._authorized() or self._fault():
+                    return
+                page = max(1, int(query.get("page", 1)))
+                per_page = max(1, min(int(query.get("perPage", 50)), 1000))
+                data, meta = state.listing(page, per_page, query.get("status"), query.get("from"), query.get("to"))
+                return self._json(200, {"status": True, "message": "Transactions retrieved", "data": data, "meta": meta})
+
+            self._json(404, {"status": False, "message": "Not found"})
+
+        def do_POST(self):
+            url = urlparse(self.path)
+            body = self._body()
+
+            if url.path == "/_fake/config":
+                state.configure(**(body or {}))
+                return self._json(200, {"status": True, "config": state.config})
+
+            if url.path == "/_fake/transactions":
+                for item in body or []:
+                    state.add(item["reference"], item.get("amount", 0), item.get("email", ""), item.get("status", "success"))
+                return self._json(200, {"status": True, "count": len(body or [])})
+
+            if url.path == "/transaction/initialize":
+                state.hits["initialize"] += 1
+                if not self._authorized() or self._fault():
+                    return
+                body = body or {}
+                if not body.get("email") or not body.get("amount"):
+                    return self._json(400, {"status": False, "message": "Email and amount are required"})
+                reference = body.get("reference") or f"T{random.randrange(10 ** 12):012d}"
+                if reference in state.transactions:
+                    return self._json(400, {"status": False, "message": "Duplicate Transaction Reference"})
+                state.add(reference, body["amount"], body["email"], callback_url=body.get("callback_url"),
+                          metadata=body.get("metadata"))
+                return self._json(200, {"status": True, "message": "Authorization URL created", "data": {
+                    "authorization_url": f"{state.base_url}/checkout/{reference}",
+                    "access_code": hashlib.sha1(reference.encode()).hexdigest()[:15],
+                    "reference": reference,
+                }})
+
+            self._json(404, {"status": False, "message": "Not found"})
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def serve(host="127.0.0.1", port=8070, secret_key=None, webhook_url=None, **config):
+    """Start the fake in a background thread; returns (server, state)"""
+    state = FakePaystack(secret_key, webhook_url, base_url=f"http://{host}:{port}", **config)
+    server = ThreadingHTTPServer((host, port), make_handler(state))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, state
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8070)
+    parser.add_argument("--secret-key", default=None)
+    parser.add_argument("--webhook-url", default=None, help="e.g. http://127.0.0.1:5000/webhook")
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--timeout-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server, _ = serve(
+        args.host, args.port, args.secret_key, args.webhook_url,
+        latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+        timeout_rate=args.timeout_rate, rate_limit_rate=args.rate_limit_rate,
+    )
+    print(f"Fake Paystack on http://{args.host}:{args.port}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
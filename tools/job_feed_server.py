@@ -0,0 +1,116 @@
+"""
+Local job-feed stand-in
+Serves the files in tools/fixtures/jobs as job board feeds, with ETag /
+Last-Modified validators and 304s, for exercising `flask ingest-jobs`
+without hitting real boards.
+
+    python -m tools.job_feed_server --port 8090
+    flask add-job-source remote-board http://127.0.0.1:8090/remote.json --format json --items-key jobs
+    flask ingest-jobs
+
+`/generated.jsonl?count=N` streams N synthetic jobs for load testing.
+Responses carry X-Requests: <n> so a test can count hits per path.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import threading
+from collections import Counter
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "jobs")
+
+CONTENT_TYPES = {
+    ".json": "application/json",
+    ".jsonl": "application/x-ndjson",
+    ".rss": "application/rss+xml",
+    ".xml": "application/xml",
+    ".csv": "text/csv",
+}
+
+
+def generated_jobs(count):
+    for n in range(count):
+        yield json.dumps({
+            "id": f"gen-{n}",
+            "title": f"Machine Learning Engineer {n}",
+            "company": f"Generated Co {n % 50}",
+            "location": "Remote" if n % 3 == 0 else "Lagos",
+            "type": "full-time" if n % 4 else "contract",
+            "url": f"https://example.com/jobs/gen-{n}",
+            "description": f"<p>Build models for team {n % 20}.</p>",
+        }) + "\n"
+
+
+def make_handler(directory, hits):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _send(self, status, headers, body=b""):
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("X-Requests", str(hits[self.path]))
+            self.end_headers()
+            if self.command != "HEAD":
+                self.wfile.write(body)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            hits[self.path] += 1
+
+            if url.path == "/generated.jsonl":
+                count = int(parse_qs(url.query).get("count", ["1000"])[0])
+                body = "".join(generated_jobs(count)).encode()
+                return self._send(200, {"Content-Type": CONTENT_TYPES[".jsonl"]}, body)
+
+            path = os.path.join(directory, os.path.basename(url.path))
+            if not url.path.strip("/") or not os.path.isfile(path):
+                return self._send(404, {"Content-Type": "text/plain"}, b"not found\n")
+
+            with open(path, "rb") as f:
+                body = f.read()
+            headers = {
+                "Content-Type": CONTENT_TYPES.get(os.path.splitext(path)[1], "application/octet-stream"),
+                "ETag": '"' + hashlib.sha1(body).hexdigest() + '"',
+                "Last-Modified": formatdate(os.path.getmtime(path), usegmt=True),
+            }
+
+            if self.headers.get("If-None-Match") == headers["ETag"]:
+                return self._send(304, {"ETag": headers["ETag"]})
+            return self._send(200, headers, body)
+
+        do_HEAD = do_GET
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def serve(directory=FIXTURES, host="127.0.0.1", port=8090):
+    """Start the server in a background thread; returns (server, hits)"""
+    hits = Counter()
+    server = ThreadingHTTPServer((host, port), make_handler(directory, hits))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, hits
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--directory", default=FIXTURES)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    args = parser.parse_args()
+
+    server, _ = serve(args.directory, args.host, args.port)
+    print(f"Job feeds on http://{args.host}:{args.port} from {args.directory}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
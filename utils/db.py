@@ -0,0 +1,29 @@
+"""
+Database helpers shared by services that need dialect-specific SQL
+"""
+
+from sqlalchemy import insert
+from sqlalchemy.dialects import postgresql, sqlite
+
+
+def dialect_insert(bind, table):
+    """
+    Return an INSERT construct for `table` that supports ON CONFLICT
+    on the dialects we run on (Postgres in production, SQLite locally).
+
+    Falls back to a plain INSERT for any other dialect, so callers must
+    check `supports_on_conflict(bind)` before using on_conflict_* methods.
+    """
+    name = bind.dialect.name
+
+    if name == "postgresql":
+        return postgresql.insert(table)
+    if name == "sqlite":
+        return sqlite.insert(table)
+
+    return insert(table)
+
+
+def supports_on_conflict(bind):
+    """True when dialect_insert() returns an upsert-capable construct"""
+    return bind.dialect.name in ("postgresql", "sqlite")
@@ -0,0 +1,329 @@
+"""
+Pagination helpers
+
+Keyset (seek) pagination over (created_at, id)
+Offset pagination makes the database walk and discard every skipped row,
+so deep pages get slower as tables grow. Seeking from the last row seen
+keeps every page at O(per_page) using the created_at index.
+
+Numbered pages without a COUNT(*) per view
+For listings that need page numbers, count_paginate() replaces
+Query.paginate(): it fetches per_page + 1 rows to learn whether a next
+page exists, and takes the total from a short-TTL cache, a planner
+estimate for large results, or not at all (probe mode).
+"""
+
+import base64
+import json
+import threading
+import time
+from datetime import datetime
+
+from flask import abort
+from sqlalchemy import and_, or_, func, select
+
+from extensions import db
+
+
+DEFAULT_PER_PAGE = 50
+MAX_PER_PAGE = 200
+
+
+class KeysetPage:
+    """One page of results plus the cursor for the next one"""
+
+    def __init__(self, items, next_cursor, cursor=None, per_page=DEFAULT_PER_PAGE):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.cursor = cursor
+        self.per_page = per_page
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def is_first(self):
+        return self.cursor is None
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+    def __bool__(self):
+        return bool(self.items)
+
+
+def encode_cursor(created_at, row_id):
+    """Opaque, URL-safe cursor for a (created_at, id) position"""
+    raw = f"{created_at.isoformat() if created_at else ''}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """Return (created_at, id) or None for a missing/garbled cursor"""
+    if not cursor:
+        return None
+
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+        created_at, row_id = raw.split("|", 1)
+        return (datetime.fromisoformat(created_at) if created_at else None), int(row_id)
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+def keyset_paginate(query, model, cursor=None, per_page=DEFAULT_PER_PAGE, options=()):
+    """
+    Paginate `query` newest-first by (model.created_at, model.id).
+
+    Args:
+        query: Filtered query (do not apply order_by; it is set here)
+        model: Mapped class with `created_at` and `id` columns
+        cursor: Value of `next_cursor` from the previous page
+        per_page: Page size, clamped to MAX_PER_PAGE
+        options: Loader options, e.g. joinedload(Order.product), so
+                 templates do not lazy-load a relationship per row
+
+    Usage:
+        page = keyset_paginate(Order.query, Order, request.args.get("cursor"),
+                               options=[joinedload(Order.product)])
+    """
+    per_page = max(1, min(per_page or DEFAULT_PER_PAGE, MAX_PER_PAGE))
+    position = decode_cursor(cursor)
+
+    if position:
+        created_at, row_id = position
+        if created_at is None:
+            query = query.filter(model.id < row_id)
+        else:
+            query = query.filter(or_(
+                model.created_at < created_at,
+                and_(model.created_at == created_at, model.id < row_id),
+            ))
+
+    if options:
+        query = query.options(*options)
+
+    rows = (
+        query.order_by(model.created_at.desc(), model.id.desc())
+        .limit(per_page + 1)
+        .all()
+    )
+
+    next_cursor = None
+    if len(rows) > per_page:
+        rows = rows[:per_page]
+        last = rows[-1]
+        next_cursor = encode_cursor(last.created_at, last.id)
+
+    return KeysetPage(rows, next_cursor, cursor=cursor if position else None, per_page=per_page)
+
+
+# =============================
+# Numbered pages
+# =============================
+
+COUNT_TTL_SECONDS = 30
+COUNT_CACHE_MAX_ENTRIES = 1024
+# Past this many rows (by the planner's estimate) the estimate is shown instead of counting
+EXACT_COUNT_LIMIT = 10000
+
+
+class CountCache:
+    """
+    Filtered row counts per worker, keyed by (namespace, filter key).
+
+    Writers call invalidate(namespace) after changing the table; the TTL
+    bounds staleness in the other workers, which never see that call.
+    """
+
+    def __init__(self, ttl=COUNT_TTL_SECONDS, max_entries=COUNT_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, namespace, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get((namespace, key))
+            if entry and entry[2] > now:
+                return entry[0], entry[1]
+        return None
+
+    def set(self, namespace, key, total, estimated):
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                # Expired first, then oldest; dicts keep insertion order
+                now = time.monotonic()
+                for stale in [k for k, entry in self._entries.items() if entry[2] <= now]:
+                    del self._entries[stale]
+                while len(self._entries) >= self.max_entries:
+                    del self._entries[next(iter(self._entries))]
+            self._entries[(namespace, key)] = (total, estimated, time.monotonic() + self.ttl)
+
+    def invalidate(self, namespace):
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == namespace]:
+                del self._entries[key]
+
+
+count_cache = CountCache()
+
+
+def invalidate_counts(namespace):
+    """Drop this worker's cached counts for `namespace` (e.g. "jobs")"""
+    count_cache.invalidate(namespace)
+
+
+def _planner_estimate(query):
+    """Postgres' row estimate for `query` from EXPLAIN, or None elsewhere"""
+    connection = db.session.connection()
+    if connection.dialect.name != "postgresql":
+        return None
+
+    compiled = query.statement.compile(dialect=connection.dialect)
+    plan = connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def _count(query):
+    return db.session.execute(select(func.count()).select_from(query.subquery())).scalar()
+
+
+def cached_count(query, namespace, key):
+    """
+    (total, estimated) for `query`, from the count cache when fresh. Large
+    results on Postgres use the planner's estimate instead of a full count.
+    """
+    cached = count_cache.get(namespace, key)
+    if cached is not None:
+        return cached
+
+    query = query.order_by(None)
+    estimate = _planner_estimate(query)
+    if estimate is not None and estimate > EXACT_COUNT_LIMIT:
+        total, estimated = estimate, True
+    else:
+        total, estimated = _count(query), False
+
+    count_cache.set(namespace, key, total, estimated)
+    return total, estimated
+
+
+class CountedPage:
+    """
+    One numbered page, with the attributes templates use from
+    Flask-SQLAlchemy's Pagination (items, page, pages, has_next,
+    next_num, iter_pages(), ...).
+
+    `total` is None in probe mode, and approximate when `total_estimated`;
+    has_next always comes from the extra row fetched, so "Next" is exact.
+    """
+
+    def __init__(self, items, page, per_page, has_next, total=None, total_estimated=False):
+        self.items = items
+        self.page = page
+        self.per_page = per_page
+        self.has_next = has_next
+        self.total = total
+        self.total_estimated = total_estimated
+
+    @property
+    def pages(self):
+        if not self.items:
+            return 0
+        if not self.has_next:
+            return self.page
+        known = self.page + 1 if self.has_next else self.page
+        if self.total is None:
+            return known
+        # An estimate (or a count gone stale) must not hide a page the probe found
+        return max(-(-self.total // self.per_page), known)
+
+    @property
+    def has_prev(self):
+        return self.page > 1
+
+    @property
+    def prev_num(self):
+        return self.page - 1 if self.has_prev else None
+
+    @property
+    def next_num(self):
+        return self.page + 1 if self.has_next else None
+
+    def iter_pages(self, *, left_edge=2, left_current=2, right_current=4, right_edge=2):
+        """Page numbers for a pagination widget, with None for skipped runs"""
+        pages_end = self.pages + 1
+        if pages_end == 1:
+            return
+
+        left_end = min(1 + left_edge, pages_end)
+        yield from range(1, left_end)
+        if left_end == pages_end:
+            return
+
+        mid_start = max(left_end, self.page - left_current)
+        mid_end = min(self.page + right_current + 1, pages_end)
+        if mid_start - left_end > 0:
+            yield None
+        yield from range(mid_start, mid_end)
+        if mid_end == pages_end:
+            return
+
+        right_start = max(mid_end, pages_end - right_edge)
+        if right_start - mid_end > 0:
+            yield None
+        yield from range(right_start, pages_end)
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+
+def count_paginate(query, page=1, per_page=DEFAULT_PER_PAGE, namespace=None, count_key=None, error_out=True):
+    """
+    Offset-paginate an ordered `query` without a COUNT(*) per request.
+
+    Args:
+        query: Filtered and ordered query
+        page: 1-based page number
+        per_page: Page size, clamped to MAX_PER_PAGE
+        namespace: Count-cache namespace, invalidated by the table's writers
+        count_key: Hashable description of the filters (e.g. a tuple of
+                   request args). Without it the page is probed only: the
+                   total is unknown and page links stop at the next page.
+        error_out: 404 for an empty page past the first, like paginate()
+
+    Usage:
+        jobs = count_paginate(query, page, 20, namespace="jobs",
+                              count_key=("published", job_type, remote_only))
+    """
+    page = max(1, page or 1)
+    per_page = max(1, min(per_page or DEFAULT_PER_PAGE, MAX_PER_PAGE))
+
+    rows = query.limit(per_page + 1).offset((page - 1) * per_page).all()
+    has_next = len(rows) > per_page
+    rows = rows[:per_page]
+    if error_out and not rows and page > 1:
+        abort(404)
+
+    total, estimated = None, False
+    if count_key is not None:
+        if not has_next and (rows or page == 1):
+            # The last page: the total is known without counting
+            total = (page - 1) * per_page + len(rows)
+            count_cache.set(namespace, count_key, total, False)
+        else:
+            total, estimated = cached_count(query, namespace, count_key)
+
+    return CountedPage(rows, page, per_page, has_next, total, estimated)
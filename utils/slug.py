@@ -1,15 +1,110 @@
+"""
+Slug generation and allocation
+One allocator for every model with a unique `slug` column (Content, Job,
+...). It never checks for an existing slug first: it inserts, and if the
+unique index rejects the slug it retries with the next candidate inside
+a savepoint, so concurrent admin and scraper inserts can't both win.
+"""
+
+import hashlib
 import re
-import time
+
+from sqlalchemy.exc import IntegrityError
+
+from extensions import db
+
+# Suffixes are base36 digests: 4 characters give ~1.7M slots per base slug
+SUFFIX_LENGTH = 4
+# Every row with the same title and salt walks the same sequence, so the
+# n-th copy of a title needs n attempts
+MAX_ATTEMPTS = 32
+
+_BASE36 = "0123456789abcdefghijklmnopqrstuvwxyz"
+
+
+class SlugAllocationError(Exception):
+    """No free slug was found within MAX_ATTEMPTS inserts"""
+    pass
 
 
 def generate_slug(title):
-    slug = title.lower()
+    slug = (title or "").lower()
     slug = re.sub(r"[^a-z0-9]+", "-", slug)
     return slug.strip("-")
 
 
-def unique_slug(model, slug):
-    existing = model.query.filter_by(slug=slug).first()
-    if existing:
-        slug = f"{slug}-{int(time.time())}"
-    return slug
\ No newline at end of file
+def _base36(number, length):
+    chars = []
+    for _ in range(length):
+        number, digit = divmod(number, 36)
+        chars.append(_BASE36[digit])
+    return "".join(chars)
+
+
+def slug_candidates(base, salt="", attempts=MAX_ATTEMPTS):
+    """
+    Yield `base`, then `base-xxxx` suffixes derived from (base, salt, attempt).
+
+    The sequence is deterministic, so a retry never depends on the clock,
+    and callers pass a salt (e.g. the company for jobs) so that unrelated
+    rows with the same title don't race through the same suffixes.
+    """
+    yield base
+    for attempt in range(1, attempts):
+        digest = hashlib.sha1(f"{base}|{salt}|{attempt}".encode()).digest()
+        # Lengthen the suffix on later attempts in case a prefix is crowded
+        length = SUFFIX_LENGTH + attempt // 8
+        yield f"{base}-{_base36(int.from_bytes(digest[:8], 'big'), length)}"
+
+
+def stable_slug(source, salt, max_length=255):
+    """
+    The first suffixed candidate for `source`: deterministic per salt, for
+    bulk inserts that can't retry row by row (e.g. job ingestion keyed on
+    the feed's own id). Use slug_candidates() to continue on a conflict.
+    """
+    base = (generate_slug(source) or "item")[:max_length - SUFFIX_LENGTH - 4].rstrip("-")
+    candidates = slug_candidates(base, salt)
+    next(candidates)
+    return next(candidates)
+
+
+def _is_slug_conflict(error):
+    # Postgres: ... unique constraint "ix_content_slug"; SQLite: UNIQUE constraint failed: content.slug
+    return "slug" in str(error.orig).lower()
+
+
+def allocate_slug(obj, source, salt="", max_attempts=MAX_ATTEMPTS):
+    """
+    Give the new (transient or pending) `obj` a unique slug derived from
+    `source` and flush it.
+
+    Each candidate is tried by flushing the INSERT inside a savepoint; on a
+    slug unique-index violation the savepoint is rolled back and the next
+    candidate is tried. The caller commits. Returns the slug, or raises
+    SlugAllocationError.
+    """
+    max_length = type(obj).__table__.c.slug.type.length or 255
+    base = generate_slug(source) or type(obj).__tablename__.rstrip("s")
+    base = base[:max_length - SUFFIX_LENGTH - 4].rstrip("-")
+
+    # begin_nested() flushes pending objects first; keep obj out of that
+    # flush so its INSERT only ever runs inside the savepoint
+    if obj in db.session:
+        db.session.expunge(obj)
+
+    for candidate in slug_candidates(base, salt, max_attempts):
+        obj.slug = candidate
+        try:
+            with db.session.begin_nested():
+                db.session.add(obj)
+        except IntegrityError as e:
+            if not _is_slug_conflict(e):
+                raise
+            continue
+        return candidate
+
+    # The savepoint rollback has usually expunged it already
+    if obj in db.session:
+        db.session.expunge(obj)
+    raise SlugAllocationError(f"No free slug for '{base}' after {max_attempts} attempts")